@@ -1,319 +1,77 @@
+import time
+_import_started = time.perf_counter()
 import streamlit as st
-import os, csv, base64, io, time, json
+import io, json, os, threading
 from dotenv import load_dotenv
 load_dotenv()
-from PIL import Image
 from streamlit_lottie import st_lottie
-import requests
-from io import BytesIO
-from llama_index.core.llms import ChatMessage
-from selenium import webdriver
-from lavague.core import WorldModel, ActionEngine
-from lavague.core.agents import WebAgent
-from lavague.core.context import Context
-from lavague.drivers.selenium import SeleniumDriver
-from llama_index.embeddings.gemini import GeminiEmbedding
-from llama_index.llms.gemini import Gemini
-from llama_index.multi_modal_llms.gemini import GeminiMultiModal
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import List, Tuple, Dict
-from selenium.common.exceptions import NoSuchElementException, WebDriverException
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from pyvirtualdisplay import Display
-
-import nltk
-import os
-
-# Set the NLTK data directory to a directory within your app's writable directory
-nltk_data_dir = os.path.join(os.path.expanduser("~"), "nltk_data")
-if not os.path.exists(nltk_data_dir):
-    os.makedirs(nltk_data_dir)
-
-nltk.data.path.append(nltk_data_dir)
-
-# Download stopwords or any other required NLTK data
-nltk.download("stopwords", download_dir=nltk_data_dir)
-# At the beginning of your script
-display = Display(visible=0, size=(1920, 1080))
-display.start()
-
-# Initialize the LLM and other required components
-llm = Gemini(model_name="models/gemini-1.5-flash-latest", api_key=os.getenv("GOOGLE_API_KEY"))
-mm_llm = GeminiMultiModal(model_name="models/gemini-1.5-pro-latest", api_key=os.getenv("GOOGLE_API_KEY"))
-embedding = GeminiEmbedding(model_name="models/text-embedding-004", api_key=os.getenv("GOOGLE_API_KEY"))
-
-context = Context(llm=llm, mm_llm=mm_llm, embedding=embedding)
-
-def main(url, feature_content, language):
+from codegen import CODE_EXTENSIONS, SCENARIO_WORKERS, TARGETS, generate_test_codes
+from driver_pool import MAX_SESSIONS, get_driver_pool
+from llm_cache import get_llm_cache
+from llm_governor import get_llm_governor
+from locator_store import get_locator_store
+from model_router import get_model_router
+from element_inspector import iter_elements, compare_extraction_timings
+from element_export import EXPORT_FORMATS, MIMETYPES, export_elements, export_format, read_page
+from page_snapshot import SNAPSHOT_MODE, SNAPSHOT_MODES, page_url
+from image_prep import make_thumbnail, prepare_image, visibly_changed, visual_signature
+from screenshot_index import get_screenshot_index
+from site_crawler import CRAWL_BROWSERS, CRAWL_DEPTH, CRAWL_MAX_PAGES, crawl, export_inventory
+from runtime import get_action_engine, get_world_model, startup_report
+from tracing import span
+from ui_assets import STYLESHEET_URL, load_lottie, stylesheet
+
+# Heavy dependencies (lavague, llama_index, selenium, PIL, nltk, the virtual
+# display and the Gemini clients) are loaded by the features that need them.
+
+def main(url, feature_content, language, force_regenerate=False, stream=False, max_workers=SCENARIO_WORKERS,
+         snapshot_mode=None):
+    # language is one target name or a list of them; several targets share one exploration of the site
+    languages = [language] if isinstance(language, str) else list(language)
     # Parse feature content
     feature_name = "generated_feature"
     feature_file_name = f"{feature_name}.feature"
-    test_case = feature_content
-    # Initialize the agent
-    selenium_driver = SeleniumDriver(headless=False)
-    world_model = WorldModel.from_context(context)
-    action_engine = ActionEngine.from_context(context, selenium_driver)
-    agent = WebAgent(world_model, action_engine)
-    objective = f"Run this test case: \n\n{test_case}"
-    # Run the test case with the agent
-    print("--------------------------")
-    print(f"Running test case:\n{test_case}")
-    agent.get(url)
-    agent.run(objective)
-    # Perform RAG on final state of HTML page using the action engine
-    print("--------------------------")
-    print(f"Processing run...\n{test_case}")
-    nodes = action_engine.navigation_engine.get_nodes(
-        f"We have ran the test case, generate the final assert statement.\n\ntest case:\n{test_case}"
-    )
-    # Parse logs
-    logs = agent.logger.return_pandas()
-    last_screenshot_path = get_latest_screenshot_path(logs.iloc[-1]["screenshots_path"])
-    b64_img = pil_image_to_base64(last_screenshot_path)
-    selenium_code = "\n".join(logs["code"].dropna())
-    print("--------------------------")
-    print(f"Generating {language} code")
-    # Generate test code
-    if language.lower() == "python":
-        code = generate_pytest_code(url, feature_file_name, test_case, selenium_code, nodes, b64_img)
-    else:  # Java
-        code = generate_java_code(url, feature_file_name, test_case, selenium_code, nodes, b64_img)
-    if language.lower() == "python":
-        st.download_button(
-            label="Download Python Code",
-            data=code,
-            file_name=f"{feature_file_name}.py",
-            mime="text/plain"
-        )
-
-    return code
-
-def get_latest_screenshot_path(directory):
-    # List all files in the directory
-    files = os.listdir(directory)
-    # Get the full path of the files
-    full_paths = [os.path.join(directory, f) for f in files]
-    # Find the most recently modified file
-    latest_file = max(full_paths, key=os.path.getmtime)
-    return latest_file
-
-def pil_image_to_base64(image_path):
-    # Open the image file
-    with Image.open(image_path) as img:
-        # Convert image to BytesIO object
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        # Encode the BytesIO object to base64
-        img_str = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    return img_str
-
-def generate_pytest_code(url, feature_file_name, test_case, selenium_code, nodes, b64_img):
-    prompt = f"""Generate a Python Selenium test script with the following inputs and structure examples to guide you:
-    Base url: {url}
-    Feature file name: {feature_file_name}
-    Test case: {test_case}
-    Already executed code:
-    {selenium_code}
-    Selected html of the last page: {nodes}
-    Image: {b64_img}
-    Examples:
-    {PYTHON_EXAMPLES}
-    """
-    messages = [ChatMessage(role="user", content=prompt)]
-    response = llm.chat(messages)
-    return response.message.content
-
-def generate_java_code(url, feature_file_name, test_case, selenium_code, nodes, b64_img):
-    prompt = f"""Generate a Java Selenium test script with the following inputs and structure examples to guide you:
-    Base url: {url}
-    Feature file name: {feature_file_name}
-    Test case: {test_case}
-    Already executed code:
-    {selenium_code}
-    Selected html of the last page: {nodes}
-    Image: {b64_img}
-    Examples:
-    {JAVA_EXAMPLES}
-    """
-    messages = [ChatMessage(role="user", content=prompt)]
-    response = llm.chat(messages)
-    return response.message.content
-
-PYTHON_EXAMPLES = """
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-# Constants
-BASE_URL = '{url}'
-
-class JobApplicationTest:
-    def __init__(self):
-        self.driver = webdriver.Chrome()
-        self.driver.implicitly_wait(10)
-
-    def setup(self):
-        self.driver.get(BASE_URL)
-
-    def teardown(self):
-        self.driver.quit()
-
-    def given_i_am_on_the_job_application_page(self):
-        # This step is handled by the setup method
-        pass
-
-    def when_i_enter_first_name(self, first_name):
-        first_name_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[2]/div/div/span[1]/input")
-        first_name_field.send_keys(first_name)
-
-    def when_i_enter_last_name(self, last_name):
-        last_name_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[2]/div/div/span[2]/input")
-        last_name_field.send_keys(last_name)
-
-    def when_i_enter_email_address(self, email):
-        email_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[3]/div/span/input")
-        email_field.send_keys(email)
-
-    def when_i_enter_phone_number(self, phone_number):
-        phone_number_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[4]/div/span/input")
-        phone_number_field.send_keys(phone_number)
-
-    def when_i_leave_cover_letter_empty(self):
-        # No action needed as the field should remain empty
-        pass
-
-    def when_i_click_apply_button(self):
-        apply_button = WebDriverWait(self.driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, "/html/body/form/div[1]/ul/li[6]/div/div/button"))
-        )
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", apply_button)
-        apply_button.click()
-
-    def then_i_should_see_error_message_for_cover_letter(self):
-        try:
-            error_message = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[5]/div/div/span")
-            assert error_message.is_displayed(), "Error message for Cover Letter field is not displayed"
-        except Exception as e:
-            raise AssertionError(f"Error message not displayed: {e}")
-
-    def run_test(self):
-        try:
-            self.setup()
-            self.given_i_am_on_the_job_application_page()
-            self.when_i_enter_first_name("John")
-            self.when_i_enter_last_name("Doe")
-            self.when_i_enter_email_address(john.doe@example.com)
-            self.when_i_enter_phone_number("(123) 456-7890")
-            self.when_i_leave_cover_letter_empty()
-            self.when_i_click_apply_button()
-            self.then_i_should_see_error_message_for_cover_letter()
-            print("Test passed: Job application scenario completed successfully.")
-        except AssertionError as e:
-            print(f"Test failed: {str(e)}")
-        except Exception as e:
-            print(f"Test failed: An unexpected error occurred: {str(e)}")
-        finally:
-            self.teardown()
-
-if __name__ == "__main__":
-    test = JobApplicationTest()
-    test.run_test()
-"""
-
-JAVA_EXAMPLES = """
-import org.openqa.selenium.By;
-import org.openqa.selenium.WebDriver;
-import org.openqa.selenium.WebElement;
-import org.openqa.selenium.chrome.ChromeDriver;
-import org.openqa.selenium.support.ui.ExpectedConditions;
-import org.openqa.selenium.support.ui.WebDriverWait;
-import org.testng.Assert;
-import org.testng.annotations.AfterMethod
-import org.testng.annotations.BeforeMethod;
-import org.testng.annotations.Test;
-
-public class JobApplicationTest {
-    private WebDriver driver;
-    private String baseUrl;
-
-    @BeforeMethod
-    public void setup() {
-        System.setProperty("webdriver.chrome.driver", "/path/to/chromedriver");
-        driver = new ChromeDriver();
-        driver.manage().timeouts().implicitlyWait(10, java.util.concurrent.TimeUnit.SECONDS);
-        baseUrl = "{url}"; // Replace with the actual base URL
-        driver.get(baseUrl);
-    }
-
-    @AfterMethod
-    public void teardown() {
-        driver.quit();
-    }
-
-    @Test
-    public void jobApplicationScenario() {
-        givenIAmOnTheJobApplicationPage();
-        whenIEnterFirstName("John");
-        whenIEnterLastName("Doe");
-        whenIEnterEmailAddress(john.doe@example.com);
-        whenIEnterPhoneNumber("(123) 456-7890");
-        whenILeaveCoverLetterEmpty();
-        whenIClickApplyButton();
-        thenIShouldSeeErrorMessageForCoverLetter();
-    }
-
-    private void givenIAmOnTheJobApplicationPage() {
-        // This step is handled by the setup method
-    }
-
-    private void whenIEnterFirstName(String firstName) {
-        WebElement firstNameField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[2]/div/div/span[1]/input"));
-        firstNameField.sendKeys(firstName);
-    }
-
-    private void whenIEnterLastName(String lastName) {
-        WebElement lastNameField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[2]/div/div/span[2]/input"));
-        lastNameField.sendKeys(lastName);
-    }
-
-    private void whenIEnterEmailAddress(String email) {
-        WebElement emailField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[3]/div/span/input"));
-        emailField.sendKeys(email);
-    }
-
-    private void whenIEnterPhoneNumber(String phoneNumber) {
-        WebElement phoneNumberField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[4]/div/span/input"));
-        phoneNumberField.sendKeys(phoneNumber);
-    }
-
-    private void whenILeaveCoverLetterEmpty() {
-        // No action needed as the field should remain empty
-    }
-
-    private void whenIClickApplyButton() {
-        WebElement applyButton = new WebDriverWait(driver, 10).until(
-                ExpectedConditions.elementToBeClickable(By.xpath("/html/body/form/div[1]/ul/li[6]/div/div/button"))
-        );
-        ((JavascriptExecutor) driver).executeScript("arguments[0].scrollIntoView(true);", applyButton);
-        applyButton.click();
-    }
-
-    private void thenIShouldSeeErrorMessageForCoverLetter() {
-        try {
-            WebElement errorMessage = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[5]/div/div/span"));
-            Assert.assertTrue(errorMessage.isDisplayed(), "Error message for Cover Letter field is not displayed");
-        } catch (Exception e) {
-            Assert.fail("Error message not displayed: " + e.getMessage());
-        }
-    }
-}
-"""
+    codes = generate_test_codes(url, feature_content, languages, feature_file_name, force_regenerate,
+                                stream and len(languages) == 1, max_workers, snapshot_mode)
+    if stream and len(codes) == 1:
+        (lang, code), = codes.items()
+        codes[lang] = render_stream(code, TARGETS[lang]["syntax"], f"{feature_file_name}.{CODE_EXTENSIONS[lang]}",
+                                    f"Download {TARGETS[lang]['label']} Code")
+    elif stream:
+        # Generated concurrently, so they are shown once all are done, one tab each
+        for (lang, code), tab in zip(codes.items(), st.tabs([TARGETS[lang]["label"] for lang in codes])):
+            with tab:
+                st.code(code, language=TARGETS[lang]["syntax"])
+                st.download_button(label=f"Download {TARGETS[lang]['label']} Code", data=code,
+                                   file_name=f"{feature_file_name}.{CODE_EXTENSIONS[lang]}", mime="text/plain")
+
+    return codes[languages[0].lower()] if isinstance(language, str) else codes
+
+def render_trace(root):
+    # Collapsible per-stage timing of the run that just finished; counts include nested stages
+    with st.expander(f"Timing breakdown ({root.seconds:.1f}s)"):
+        st.table(root.breakdown())
+
+def render_stream(chunks, language=None, file_name=None, label="Download"):
+    # Shows text deltas as they arrive; the download button fills in once the stream completes.
+    # A Streamlit stop/rerun interrupts the loop and closing the generator aborts the request.
+    output = st.empty()
+    download = st.empty()
+    text = ""
+    try:
+        for delta in chunks:
+            text += delta
+            if language:
+                output.code(text, language=language)
+            else:
+                output.markdown(text)
+    finally:
+        chunks.close()
+    if file_name:
+        download.download_button(label=label, data=text, file_name=file_name, mime="text/plain")
+    return text
 
-def generate_gherkin_feature(user_story, detail_level):
+def generate_gherkin_feature(user_story, detail_level, force_regenerate=False, stream=False):
     if detail_level == "Detailed":
         custom_prompt_template = """Create a comprehensive Gherkin feature file based on the provided user story. Follow these instructions to produce a detailed output:
                                 Instructions:
@@ -395,162 +153,161 @@ def generate_gherkin_feature(user_story, detail_level):
                     """
 
     prompt = custom_prompt_template.format(context=user_story)
+    from llama_index.core.llms import ChatMessage
+
     messages = [ChatMessage(role="user", content=prompt)]
-    response = llm.chat(messages)
-    return response.message.content
+    return get_model_router().chat(messages, force_regenerate, stream)
+
+# Kept out of ./screenshots, which lavague owns and wipes when it sees fit
+EXPLORER_SCREENSHOTS = os.path.join("artifacts", "explorer")
+# Target for a rerun that does no real work (switching pages, ticking a box)
+RERUN_BUDGET_MS = float(os.getenv("SDET_RERUN_BUDGET_MS", "100"))
+RERUN_HISTORY = 50
 
 def streamlit_webagent_demo(objective: str, url: str):
     st.write(f"Objective: {objective}")
     st.write(f"Starting URL: {url}")
-    
-    driver = setup_headless_chrome()
-    selenium_driver = SeleniumDriver(driver=driver)
-    world_model = WorldModel.from_context(context)
-    action_engine = ActionEngine.from_context(context, selenium_driver)
-    agent = WebAgent(world_model, action_engine)
-    # Initialize progress
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    # Navigate to the initial URL
-    agent.get(url)
-    # Run the agent
-    for step in range(agent.n_steps):
-        status_text.text(f"Step {step + 1}/{agent.n_steps}")
-        # Run a single step
-        result = agent.run(objective)
-        # Update progress
-        progress_bar.progress((step + 1) / agent.n_steps)
-        # Display current URL
-        st.write(f"Current URL: {agent.driver.get_url()}")
-        # Display screenshot
-        screenshot = Image.open(BytesIO(agent.driver.get_screenshot_as_png()))
-        st.image(screenshot, caption=f"Step {step + 1} Screenshot", use_column_width=True)
-        # Display action taken
-        st.write(f"Action taken: {result.instruction}")
-        # Display output
-        if result.output:
-            st.write(f"Output: {result.output}")
-        # Check if objective is reached
-        if result.success:
-            st.success("Objective reached!")
-            break
+    from lavague.core.agents import WebAgent
+
+    run_id = time.strftime("%Y%m%d-%H%M%S")
+    run_dir = os.path.join(EXPLORER_SCREENSHOTS, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    index = get_screenshot_index()
+    steps = []
+    result = None
+    with get_driver_pool().lease() as lease:
+        # The world model and this browser's action engine are built once and reused.
+        # The agent must not clear the screenshot folder other runs are still writing to.
+        agent = WebAgent(get_world_model(), get_action_engine(lease.driver), clean_screenshot_folder=False)
+        # Initialize progress
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        # Navigate to the initial URL
+        with span("agent.get", url=url):
+            agent.get(url)
+        agent.prepare_run()
+        signature = None
+        # Run the agent one step at a time
+        for step in range(agent.n_steps):
+            status_text.text(f"Step {step + 1}/{agent.n_steps}")
+            # run_step returns a result only once the objective is reached or abandoned
+            with span("agent.run_step", step=step + 1):
+                result = agent.run_step(objective)
+            # Update progress
+            progress_bar.progress((step + 1) / agent.n_steps)
+            logs = agent.logger.return_pandas()
+            last = logs.iloc[-1].to_dict() if len(logs) else {}
+            instruction = result.instruction if result is not None else last.get("instruction")
+            # Display current URL
+            st.write(f"Current URL: {lease.driver.current_url}")
+            # Keep the full-size PNG on disk and only stream a thumbnail when the page changed
+            png = lease.driver.get_screenshot_as_png()
+            path = os.path.join(run_dir, f"{step + 1}.png")
+            with open(path, "wb") as f:
+                f.write(png)
+            index.record(path, run_id, step + 1)
+            steps.append(step + 1)
+            current = visual_signature(png)
+            if visibly_changed(signature, current):
+                st.image(make_thumbnail(png), caption=f"Step {step + 1} Screenshot")
+            else:
+                st.caption(f"Step {step + 1}: no visible change")
+            signature = current
+            # Display action taken
+            st.write(f"Action taken: {instruction}")
+            # Display output
+            if result is not None and result.output:
+                st.write(f"Output: {result.output}")
+            # Check if objective is reached
+            if result is not None:
+                if result.success:
+                    st.success("Objective reached!")
+                break
+    st.session_state.explorer_run = {"run_id": run_id, "steps": steps}
     # Final status
-    if not result.success:
+    if result is None or not result.success:
         st.error("Failed to reach the objective within the given steps.")
-    # Display final result
-    st.write("Final Result:")
-    st.json(result.__dict__)
-
-def identify_elements_and_generate_csv(url, output_file='elements.csv'):
-    driver = setup_headless_chrome()  # You may need to specify the path to your ChromeDriver
-    driver.get(url)
-
-    def highlight_element(element):
-        driver.execute_script(
-            "arguments[0].setAttribute('style', arguments[1]);",
-            element,
-            "border: 2px solid red;"
-        )
-
-    def add_id_overlays(elements):
-        js_script = """
-        function addIdOverlay(element, id) {
-            const rect = element.getBoundingClientRect();
-            const overlay = document.createElement('div');
-            overlay.textContent = id;
-            overlay.style.position = 'absolute';
-            overlay.style.backgroundColor = 'rgba(255, 0, 0, 0.7)';
-            overlay.style.color = 'white';
-            overlay.style.padding = '2px 5px';
-            overlay.style.borderRadius = '3px';
-            overlay.style.fontSize = '12px';
-            overlay.style.zIndex = '10000';
-            overlay.style.pointerEvents = 'none';
-            overlay.style.left = (rect.left - 25) + 'px';
-            overlay.style.top = (rect.top - 25) + 'px';
-
-            if (rect.left < 30) {
-                overlay.style.left = rect.right + 'px';
-            }
-
-            if (rect.top < 30) {
-                overlay.style.top = rect.bottom + 'px';
-            }
-            document.body.appendChild(overlay);
-        }
-
-        const elements = arguments[0];
-        for (let i = 0; i < elements.length; i++) {
-            addIdOverlay(elements[i], i);
-        }
-
-        """
-        driver.execute_script(js_script, elements)
-    try:
-        # Wait for the page to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        # Find all elements
-        elements = driver.find_elements(By.XPATH, "//*[@id]")
-        # Highlight elements and add overlays
-        for element in elements:
-            highlight_element(element)
-        add_id_overlays(elements)
-        # Prepare data for CSV
-        element_data = []
-        for i, element in enumerate(elements):
-            element_id = element.get_attribute("id")
-            element_xpath = driver.execute_script(
-                "function getXPath(element) {"
-                "   if (element.id !== '')"
-                "       return 'id(\"' + element.id + '\")';"
-                "   if (element === document.body)"
-                "       return element.tagName;"
-                "   var ix = 0;"
-                "   var siblings = element.parentNode.childNodes;"
-                "   for (var i = 0; i < siblings.length; i++) {"
-                "       var sibling = siblings[i];"
-                "       if (sibling === element)"
-                "           return getXPath(element.parentNode) + '/' + element.tagName + '[' + (ix + 1) + ']';"
-                "       if (sibling.nodeType === 1 && sibling.tagName === element.tagName)"
-                "           ix++;"
-                "   }"
-                "}"
-                "return getXPath(arguments[0]);", element
+    if result is not None:
+        # Display final result
+        st.write("Final Result:")
+        st.json(result.__dict__)
+
+def show_full_screenshot():
+    # Full-size screenshots of the last Explorer run are read from disk only when asked for
+    run = st.session_state.get("explorer_run")
+    if not run or not run["steps"]:
+        return
+    step = st.selectbox("Full-size screenshot for step", run["steps"])
+    if st.button("Load Screenshot"):
+        path = get_screenshot_index().for_step(run["run_id"], step)
+        if path:
+            st.image(path, caption=f"Step {step} Screenshot", use_column_width=True)
+
+def identify_elements_and_generate_csv(url, output_file='elements.csv', compare_timings=False, snapshot_mode=None,
+                                       fmt=None):
+    # fmt is csv, jsonl or parquet; by default it follows the output file's extension
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    timings = None
+    with get_driver_pool().lease() as lease:
+        driver = lease.driver
+        # A replayed snapshot is served locally, so the page costs no network load
+        with span("page_snapshot", mode=snapshot_mode or "default"):
+            target = page_url(url, driver, snapshot_mode)
+        if compare_timings:
+            # Time the old per-element path against the single-pass script
+            with span("inspector.compare_timings"):
+                timings = compare_extraction_timings(driver, target)
+            print(f"Extraction timings: {timings}")
+        with span("inspector.load", url=target):
+            driver.get(target)
+            # Wait for the page to load
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            element_data.append([i, element_id, element_xpath])
-        # Write to CSV
-        with open(output_file, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['ID', 'Element ID', 'XPath'])
-            writer.writerows(element_data)
-        print(f"Element data has been written to {output_file}")
-        # Keep the browser open for inspection
-        input("Press Enter to close the browser...")
-    finally:
-        driver.quit()
+        # Known locators of this page are re-checked before the new extraction is recorded
+        store = get_locator_store()
+        store.resolve(url, driver)
+        # Find, highlight and overlay all elements (iframes and shadow roots included)
+        # in one pass and stream the rows straight into the export file
+        with span("inspector.export", format=fmt or export_format(output_file)) as current:
+            count = export_elements(store.record_elements(url, iter_elements(driver)), output_file, fmt)
+            current.set(rows=count)
+        print(f"{count} element(s) have been written to {output_file}")
+    return count, timings
+
+def show_export_preview(page_size=50):
+    # Pages through the last export instead of sending the whole file to the browser
+    export = st.session_state.get("inspector_export")
+    if not export or not os.path.exists(export["path"]):
+        return
+    with open(export["path"], "rb") as f:
+        st.download_button(
+            label=f"Download {export['format'].upper()}",
+            data=f,
+            file_name=os.path.basename(export["path"]),
+            mime=MIMETYPES[export["format"]]
+        )
+    pages = max(1, -(-export["rows"] // page_size))
+    page = st.number_input(f"Preview page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+    st.dataframe(read_page(export["path"], page, page_size, export["format"]))
 
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+def propagate_script_context(func):
+    # Lets a callback running on a worker thread update this session's widgets
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-def setup_headless_chrome():
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--remote-debugging-port=9222")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.binary_location = os.environ.get("CHROME_BIN")
+    ctx = get_script_run_ctx()
 
-    driver = webdriver.Chrome(
-        executable_path=os.environ.get("CHROMEDRIVER_PATH"),
-        options=chrome_options
-    )
-    return driver
+    def wrapper(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args, **kwargs)
+    return wrapper
 
 def setup_interactive_browser(url):
-    driver = driver = setup_headless_chrome()
+    lease = get_driver_pool().lease()
+    driver = lease.driver
     driver.get(url)
     
     js_code = """
@@ -576,23 +333,25 @@ def setup_interactive_browser(url):
     }, true);
     """
     driver.execute_script(js_code)
-    return driver
+    return lease
 
 def get_selected_elements(driver):
+    from selenium.common.exceptions import WebDriverException
+
     try:
         elements = driver.execute_script("return localStorage.getItem('selectedElements');")
         return json.loads(elements) if elements else []
     except WebDriverException:
         return None
 
-def generate_test_scenarios(url, selected_elements, screenshot):
-    img_str = ""
-    if screenshot:
-        buffered = io.BytesIO(screenshot)
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+def generate_test_scenarios(url, selected_elements, screenshot, force_regenerate=False, stream=False):
+    with span("screenshot.prepare"):
+        images = [prepare_image(screenshot)] if screenshot else []
     
     role = "You are a Software Test Consultant with expertise in web application testing"
-    prompt = f"""Generate test ideas based on the selected elements of the webpage. 
+    prompt = f"""{role}
+
+    Generate test ideas based on the selected elements of the webpage. 
     Focus on user-oriented tests that cover functionality, usability, and potential edge cases. 
     Include both positive and negative test scenarios. Consider the element types and their potential interactions.
 
@@ -601,7 +360,7 @@ def generate_test_scenarios(url, selected_elements, screenshot):
     Selected Elements:
     {selected_elements}
     
-    Screenshot: {"Available" if img_str else "Not available"}
+    Screenshot: {"Attached" if images else "Not available"}
 
     Please provide a mix of positive and negative test scenarios, considering the interactions between the selected elements.
     Format the output as a numbered list of test scenarios.
@@ -619,16 +378,19 @@ def generate_test_scenarios(url, selected_elements, screenshot):
     - <Idea 1>
     - <Idea 2>
     """
-    messages = [ChatMessage(role="system", content=role),
-                ChatMessage(role="user", content=prompt)]
-    response = mm_llm.chat(messages)
-    return response.message.content
+    return get_model_router().complete(prompt, images, force_regenerate, stream)
 
-def load_lottieurl(url: str):
-    r = requests.get(url)
-    if r.status_code != 200:
-        return None
-    return r.json()
+def show_lottie(name, height, key):
+    # Bundled animations only, read once per process
+    animation = load_lottie(name)
+    if animation is not None:
+        st_lottie(animation, speed=1, height=height, key=key)
+
+def inject_styles():
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<link rel="stylesheet" href="{STYLESHEET_URL}">', unsafe_allow_html=True)
+    else:
+        st.markdown(f"<style>{stylesheet()}</style>", unsafe_allow_html=True)
 
 def landing_page():
     st.title("Supercharge Your QA Workflow with SDET-Genie")
@@ -647,8 +409,7 @@ def landing_page():
         st.image(image_path, width=320) 
     
     # with col2:
-    #     lottie_animation = load_lottieurl('https://assets3.lottiefiles.com/packages/lf20_M9p23l.json')
-    #     st_lottie(lottie_animation, speed=1, height=200, key="hero_animation")
+    #     show_lottie("robot", height=200, key="hero_animation")
     
     st.header("Key Features")
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -684,147 +445,15 @@ def landing_page():
     st.header("What Our Customers Say")
     st.markdown('"SDET-Genie has revolutionized our QA process. We\'ve seen a 50% reduction in test creation time!" - Richardson Gunde, Lead QA Engineer')
 
+# Project features that lease a browser from the driver pool
+BROWSER_FEATURES = {"Test Idea Generation", "Element Inspector", "Automation Code Generator", "Agent Explorer"}
+
 def streamlit_interface():
+    render_started = time.perf_counter()
     st.set_page_config(page_title="SDET-Genie", page_icon="🧞", layout="wide")
     
-    # Custom CSS with animations (keep your existing CSS)
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap');
-
-    /* General App Styling */
-    .stApp {
-        font-family: 'Poppins', sans-serif;
-        background: linear-gradient(135deg, #1A1A2E, #0F3460, #533483);
-        background-size: 400% 400%;
-        animation: gradientBG 15s ease infinite;
-        color: #FFFFFF;
-        padding: 2rem;
-    }
-
-    @keyframes gradientBG {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-
-    /* Navigation Bar Styling */
-    .header {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        padding: 1rem 2rem;
-        background: linear-gradient(90deg, #240046, #6A0572);
-        border-radius: 10px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.4);
-        margin-bottom: 2rem;
-    }
-
-    .header-item {
-        color: #FFFFFF;
-        font-size: 1.1rem;
-        font-weight: 600;
-        text-decoration: none;
-        padding: 0.5rem 1rem;
-        border-radius: 6px;
-        transition: background 0.3s ease, transform 0.3s ease, box-shadow 0.3s ease;
-    }
-
-    .header-item:hover {
-        background: rgba(255, 255, 255, 0.2);
-        transform: translateY(-3px);
-        box-shadow: 0 8px 20px rgba(0, 0, 0, 0.2);
-    }
-
-    /* Button Styling */
-    .stButton > button {
-        background: linear-gradient(90deg, #6A0572, #240046);
-        color: #FFFFFF;
-        font-size: 1rem;
-        font-weight: 600;
-        padding: 0.6rem 1.2rem;
-        border-radius: 8px;
-        border: none;
-        transition: background 0.4s ease, transform 0.3s ease, box-shadow 0.3s ease;
-    }
-
-    .stButton > button:hover {
-        background: linear-gradient(90deg, #833AB4, #6A0572);
-        transform: scale(1.08);
-        box-shadow: 0 8px 15px rgba(0, 0, 0, 0.3);
-    }
-
-    /* Input Fields Styling */
-    .stTextInput > div > div > input,
-    .stTextArea > div > div > textarea {
-        background-color: #2E2E3A;
-        border: 1px solid #6A0572;
-        color: #FFFFFF;
-        border-radius: 8px;
-        padding: 0.6rem;
-        transition: border 0.3s ease, box-shadow 0.3s ease;
-    }
-
-    .stTextInput > div > div > input:focus,
-    .stTextArea > div > div > textarea:focus {
-        border-color: #FF69B4;
-        box-shadow: 0 0 8px rgba(255, 105, 180, 0.6);
-        transform: scale(1.02);
-    }
-
-    /* Form Controls Styling */
-    .stRadio > div {
-        background-color: #2D2D44;
-        padding: 1rem;
-        border-radius: 8px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.3);
-        transition: background 0.3s ease;
-    }
-
-    .stRadio > div:hover {
-        background-color: #3E3E5E;
-    }
-
-    /* Grid Layout Styling */
-    .stContainer {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-        gap: 2rem;
-    }
-
-    /* Footer Styling */
-    .footer {
-        text-align: center;
-        padding: 1rem;
-        background: linear-gradient(90deg, #240046, #6A0572);
-        border-radius: 10px;
-        margin-top: 3rem;
-        box-shadow: 0 -4px 15px rgba(0, 0, 0, 0.4);
-    }
-
-    /* Animations for Smooth User Interaction */
-    @keyframes fadeIn {
-        from { opacity: 0; }
-        to { opacity: 1; }
-    }
-    
-    .main-title {
-    text-align: center;
-    font-family: 'Arial', sans-serif;
-    font-size: 60px;
-    color: #FFFFFF; /* Change color to white */
-    padding: 10px 0;
-    margin-bottom: 20px;
-    border-bottom: 2px solid #533483;
-    width: 100%;
-    box-sizing: border-box;
-    }
-
-    .fade-in {
-        animation: fadeIn 1.5s ease-in-out;
-    }
-    </style>
-""", unsafe_allow_html=True)
+    # Custom CSS with animations, linked from the static folder so the browser caches it
+    inject_styles()
 
     # Header
     page = st.radio("", ["Home", "Project", "About"])
@@ -855,35 +484,53 @@ def streamlit_interface():
             
         # Display the selected feature content
         if 'selected_feature' in st.session_state and st.session_state.selected_feature:
+            # Start warming browser sessions in the background, only for features that drive a browser
+            if st.session_state.selected_feature in BROWSER_FEATURES:
+                get_driver_pool()
             if st.session_state.selected_feature == "Automation Code Generator":
-                lottie_robot = load_lottieurl('https://assets3.lottiefiles.com/packages/lf20_M9p23l.json')
-                st_lottie(lottie_robot, speed=1, height=300, key="robot")
+                show_lottie("robot", height=300, key="robot")
                 st.title("Generating QA Automation Scripts With Just Gherkin Steps")
                 st.write("Enter a URL, Gherkin feature steps, and select a language to generate automated test code.")
                 url = st.text_input("URL")
                 feature_content = st.text_area("Gherkin Feature Steps")
-                language = st.radio("Language", ["Python", "Java"])
+                languages = st.multiselect("Languages", list(TARGETS), default=["python"],
+                                           format_func=lambda name: TARGETS[name]["label"],
+                                           help="Every language is generated from the same agent run")
+                max_workers = st.slider("Scenarios to run in parallel", 1, 6, SCENARIO_WORKERS)
+                force_regenerate = st.checkbox(
+                    "Regenerate from scratch", key="force_code",
+                    help="Re-explore every scenario with the agent instead of replaying recorded runs, rebuild the "
+                         "code instead of updating the previous generation, and bypass the LLM response cache")
+                snapshot_mode = st.selectbox("Page snapshot", SNAPSHOT_MODES, SNAPSHOT_MODES.index(SNAPSHOT_MODE),
+                                             key="snapshot_code")
 
                 if st.button("Generate Code"):
-                    code = main(url, feature_content, language)
-                    st.success(f"{language.capitalize()} Test Code is Generated you can Download the File")
-                    st.code(code, language=language.lower())
+                    if not languages:
+                        st.warning("Select at least one language")
+                        st.stop()
+                    with span("main", language=",".join(languages)) as trace:
+                        main(url, feature_content, languages, force_regenerate, stream=True, max_workers=max_workers,
+                             snapshot_mode=snapshot_mode)
+                    labels = ", ".join(TARGETS[lang]["label"] for lang in languages)
+                    st.success(f"{labels} Test Code is Generated you can Download the File")
+                    render_trace(trace)
                 
             elif st.session_state.selected_feature == "Gherkin Feature Generator":
-                lottie_steps = load_lottieurl('https://lottie.host/cacd1d54-83e0-40dd-bfe6-fc71b136d6ee/kZjrOTkQdO.json')
-                st_lottie(lottie_steps, speed=1, height=300, key="steps")
+                show_lottie("steps", height=300, key="steps")
                 st.title("Generate BDD Gherkin Feature Steps")
                 st.write("Enter a user story to generate Gherkin feature steps.")
                 user_story = st.text_area("User Story")
                 detail_level = st.radio("Choose detail level", ["Simple", "Detailed"])
+                force_regenerate = st.checkbox("Force regenerate", key="force_gherkin", help="Bypass the LLM response cache")
                 if st.button("Generate Gherkin Feature"):
-                    gherkin_feature = generate_gherkin_feature(user_story, detail_level)
+                    with span("generate_gherkin_feature", detail_level=detail_level) as trace:
+                        render_stream(generate_gherkin_feature(user_story, detail_level, force_regenerate, stream=True),
+                                      "gherkin", "generated_feature.feature", "Download Feature File")
                     st.success("Gherkin Feature Generated")
-                    st.code(gherkin_feature, language="gherkin")
+                    render_trace(trace)
                 
             elif st.session_state.selected_feature == "Agent Explorer":
-                lottie_web = load_lottieurl('https://lottie.host/78d638e9-e95a-42b8-944f-e65b95120010/sl2gbZWLFk.json')
-                st_lottie(lottie_web, speed=1, height=300, key="web")
+                show_lottie("web", height=300, key="web")
                 st.title("Web Agent Demo")
                 st.write("Enter an objective and URL to start the Web Agent demo.")
                 objective = st.text_input("Objective")
@@ -891,53 +538,86 @@ def streamlit_interface():
                     
 
                 if st.button("Start Demo"):
-                    streamlit_webagent_demo(objective, url)
+                    with span("agent_explorer") as trace:
+                        streamlit_webagent_demo(objective, url)
+                    render_trace(trace)
+                show_full_screenshot()
                 
             elif st.session_state.selected_feature == "Element Inspector":
-                lottie_search = load_lottieurl('https://assets9.lottiefiles.com/packages/lf20_jcikwtux.json')
-                st_lottie(lottie_search, speed=1, height=300, key="search")
+                show_lottie("search", height=300, key="search")
                 st.title("Identify Page Elements")
-                st.write("Enter a URL to identify all elements with IDs and generate a CSV file.")
+                st.write("Enter a URL to identify all elements with IDs and export them as CSV, JSONL or Parquet.")
                 url = st.text_input("URL")
-                output_file = st.text_input("Output CSV file name", value="elements.csv")
-                if st.button("Identify Elements"):
-                    with st.spinner("Identifying elements and generating CSV..."):
-                        identify_elements_and_generate_csv(url, output_file)
-                    st.success(f"Element data has been written to {output_file}")
-                    # Display the CSV content
-                    with open(output_file, 'r') as csvfile:
-                        csv_content = csvfile.read()
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv_content,
-                        file_name=output_file,
-                        mime="text/csv"
-                    )
-                    st.code(csv_content, language="csv")
+                fmt = st.radio("Export format", EXPORT_FORMATS, horizontal=True)
+                output_file = st.text_input("Output file name", value=f"elements.{fmt}")
+                compare_timings = st.checkbox("Compare timing with per-element extraction")
+                snapshot_mode = st.selectbox("Page snapshot", SNAPSHOT_MODES, SNAPSHOT_MODES.index(SNAPSHOT_MODE),
+                                             key="snapshot_inspector")
+                crawl_site = st.checkbox("Crawl same-origin links and build a site-wide inventory")
+                if crawl_site:
+                    depth_col, pages_col, browsers_col = st.columns(3)
+                    crawl_depth = depth_col.number_input("Link depth", min_value=0, max_value=10, value=CRAWL_DEPTH)
+                    crawl_pages = pages_col.number_input("Max pages", min_value=1, max_value=1000,
+                                                         value=CRAWL_MAX_PAGES)
+                    crawl_browsers = browsers_col.number_input("Browsers", min_value=1, max_value=MAX_SESSIONS,
+                                                               value=CRAWL_BROWSERS)
+                if crawl_site and st.button("Crawl Site"):
+                    progress = st.progress(0.0, text="Starting crawl...")
+
+                    def crawl_progress(page, done, queued):
+                        progress.progress(done / (done + queued), text=f"{done} page(s) inspected, {queued} to go")
+
+                    with span("crawl_site") as trace:
+                        result = crawl(url, crawl_depth, crawl_pages, crawl_browsers,
+                                       on_page=propagate_script_context(crawl_progress))
+                        count = export_inventory(result, output_file, fmt)
+                    progress.empty()
+                    st.session_state.inspector_export = {"path": output_file, "format": fmt, "rows": count}
+                    failed = [page for page in result["pages"] if page["error"]]
+                    st.success(f"{len(result['pages'])} page(s) crawled in {result['seconds']:.1f}s; "
+                               f"{count} distinct elements have been written to {output_file}")
+                    if failed:
+                        st.warning(f"{len(failed)} page(s) could not be inspected")
+                    st.dataframe(result["pages"])
+                    render_trace(trace)
+                elif not crawl_site and st.button("Identify Elements"):
+                    with st.spinner("Identifying elements and exporting them..."):
+                        with span("identify_elements_and_generate_csv") as trace:
+                            count, timings = identify_elements_and_generate_csv(url, output_file, compare_timings,
+                                                                                snapshot_mode, fmt)
+                    st.session_state.inspector_export = {"path": output_file, "format": fmt, "rows": count}
+                    st.success(f"{count} elements have been written to {output_file}")
+                    render_trace(trace)
+                    if timings:
+                        st.write(f"Per-element extraction: {timings['per_element']['seconds']:.2f}s "
+                                 f"({timings['per_element']['elements']} elements)")
+                        st.write(f"Single-pass extraction: {timings['single_pass']['seconds']:.2f}s "
+                                 f"({timings['single_pass']['elements']} elements)")
+                        if timings["speedup"]:
+                            st.write(f"Speedup: {timings['speedup']:.1f}x")
+                show_export_preview()
                 
             elif st.session_state.selected_feature == "Test Idea Generation":
-                lottie_test = load_lottieurl('https://lottie.host/8bf5d28b-0256-41ef-9719-b2c1a7369150/48W8wvE9Gd.json')
-                st_lottie(lottie_test, speed=1, height=300, key="test")
+                show_lottie("test", height=300, key="test")
                 st.title("Interactive Test Scenario Generator")
                 url = st.text_input("Enter the URL of the webpage you want to test:")
                 
-                if 'driver' not in st.session_state:
-                    st.session_state.driver = None
+                if 'browser' not in st.session_state:
+                    st.session_state.browser = None
                     
                 if url and st.button("Start Element Selection"):
-                    if st.session_state.driver:
-                        try:
-                            st.session_state.driver.quit()
-                        except:
-                            pass
+                    if st.session_state.browser:
+                        st.session_state.browser.release()
                         
-                    st.session_state.driver = setup_interactive_browser(url)
+                    # The lease hands the browser back to the pool if this session is dropped
+                    st.session_state.browser = setup_interactive_browser(url)
                     st.write("Browser opened. Please select elements on the webpage.")
                     st.write("Click 'Generate Test Scenarios' when you're done selecting elements.")
                     
-                if st.session_state.driver:
+                if st.session_state.browser:
+                    force_regenerate = st.checkbox("Force regenerate", key="force_scenarios", help="Bypass the LLM response cache")
                     if st.button("Check Selected Elements"):
-                        selected_elements = get_selected_elements(st.session_state.driver)
+                        selected_elements = get_selected_elements(st.session_state.browser.driver)
                         if selected_elements:
                             st.write("Currently selected elements:")
                             st.write(selected_elements)
@@ -945,10 +625,13 @@ def streamlit_interface():
                             st.write("No elements selected yet.")
                         
                     if st.button("Generate Test Scenarios"):
-                        selected_elements = get_selected_elements(st.session_state.driver)
+                        from PIL import Image
+                        from selenium.common.exceptions import WebDriverException
+
+                        selected_elements = get_selected_elements(st.session_state.browser.driver)
                         if selected_elements is not None:
                             try:
-                                screenshot = st.session_state.driver.get_screenshot_as_png()
+                                screenshot = st.session_state.browser.driver.get_screenshot_as_png()
                             except WebDriverException:
                                 st.error("Unable to capture screenshot. Browser may have been closed.")
                                 screenshot = None
@@ -956,18 +639,16 @@ def streamlit_interface():
                             if screenshot:
                                 st.image(Image.open(io.BytesIO(screenshot)), caption="Webpage with Selected Elements", use_column_width=True)
                                 
-                            test_scenarios = generate_test_scenarios(url, selected_elements, screenshot)
                             st.write("Generated Test Scenarios:")
-                            st.write(test_scenarios)
+                            with span("generate_test_scenarios", elements=len(selected_elements)) as trace:
+                                render_stream(generate_test_scenarios(url, selected_elements, screenshot, force_regenerate, stream=True))
+                            render_trace(trace)
                         else:
                             st.error("Unable to retrieve selected elements. Please restart the element selection process.")
                             
-                        # Close the browser after generating scenarios
-                        try:
-                            st.session_state.driver.quit()
-                        except:
-                            pass
-                        st.session_state.driver = None
+                        # Return the browser to the pool after generating scenarios
+                        st.session_state.browser.release()
+                        st.session_state.browser = None
 
     elif page == "About":
         st.title("About SDET-Genie")
@@ -977,8 +658,7 @@ def streamlit_interface():
         automation code generation, and an AI-powered web agent explorer.
         """)
 
-        lottie_about = load_lottieurl('https://assets9.lottiefiles.com/packages/lf20_jcikwtux.json')
-        st_lottie(lottie_about, speed=1, height=400, key="about")
+        show_lottie("search", height=400, key="about")
             
         st.subheader("Test Idea Generation")
         st.write("""
@@ -1043,8 +723,30 @@ def streamlit_interface():
         streamlit_webagent_demo(objective, url)
         """)
             
-        lottie_about = load_lottieurl('https://assets9.lottiefiles.com/packages/lf20_jcikwtux.json')
-        st_lottie(lottie_about, speed=1, height=400, key="about1")
+        show_lottie("search", height=400, key="about1")
+    cache_stats = get_llm_cache().stats()
+    st.caption(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries")
+    governor_stats = get_llm_governor().stats()
+    st.caption(f"LLM calls: {governor_stats['in_flight']} in flight, {governor_stats['queued']} queued, "
+               f"{governor_stats['throttled']} rate limited")
+    # Rerun latency up to here, kept per session so idle reruns can be told apart from ones that did work
+    rerun_ms = (time.perf_counter() - render_started) * 1000
+    history = st.session_state.setdefault("rerun_ms", [])
+    history.append(rerun_ms)
+    del history[:-RERUN_HISTORY]
+    median_ms = sorted(history)[len(history) // 2]
+    with st.expander("Startup timing"):
+        st.write(f"Module import: {_import_seconds * 1000:.0f} ms")
+        st.write(f"Page render: {rerun_ms:.0f} ms")
+        st.write(f"Median rerun over the last {len(history)}: {median_ms:.0f} ms (budget {RERUN_BUDGET_MS:.0f} ms)")
+        if median_ms > RERUN_BUDGET_MS:
+            st.warning("Reruns are slower than the budget; check the component timings below.")
+        for component, seconds in startup_report().items():
+            st.write(f"{component} initialized in {seconds * 1000:.0f} ms")
+    route_stats = get_model_router().stats()
+    if route_stats:
+        with st.expander("Model routing"):
+            st.table(route_stats)
     # Footer
     st.markdown("""
     <div class="footer">
@@ -1052,5 +754,7 @@ def streamlit_interface():
     </div>
     """, unsafe_allow_html=True)
 
+_import_seconds = time.perf_counter() - _import_started
+
 if __name__ == "__main__":
     streamlit_interface()
@@ -0,0 +1,134 @@
+"""Generate test code for many feature files without the Streamlit UI.
+
+Example:
+    python batch.py "features/**/*.feature" --manifest urls.json --language python java --out generated
+
+The manifest is a JSON object mapping feature file names, relative paths or
+glob patterns to the URL each feature should be explored against, e.g.
+{"login.feature": "https://example.com/login", "*": "https://example.com"}.
+
+With --snapshot capture the pages are saved locally; later runs with
+--snapshot replay browse those snapshots without loading the live site.
+"""
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from codegen import CODE_EXTENSIONS, SCENARIO_WORKERS, extract_code_block, generate_test_codes
+from driver_pool import get_driver_pool
+from llm_governor import llm_lane
+from page_snapshot import SNAPSHOT_MODE, SNAPSHOT_MODES
+from tracing import propagate
+
+def find_feature_files(sources):
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            files.extend(glob.glob(os.path.join(source, "**", "*.feature"), recursive=True))
+        else:
+            files.extend(glob.glob(source, recursive=True))
+    return sorted(set(files))
+
+def resolve_url(manifest, feature_path, root):
+    relative = os.path.relpath(feature_path, root)
+    candidates = (relative, os.path.basename(feature_path), feature_path)
+    for key in candidates:
+        if key in manifest:
+            return manifest[key]
+    for pattern, url in manifest.items():
+        if any(fnmatch.fnmatch(candidate, pattern) for candidate in candidates):
+            return url
+    return None
+
+def generate_one(feature_path, url, languages, out_dir, base, scenario_workers, force_regenerate, snapshot_mode=None):
+    # Every language is generated from the same exploration of the feature
+    result = {"feature": feature_path, "url": url, "languages": languages, "outputs": {}, "status": "ok", "error": None}
+    start = time.perf_counter()
+    try:
+        if not url:
+            raise ValueError("No URL in the manifest matches this feature file")
+        with open(feature_path, encoding="utf-8") as f:
+            feature_content = f.read()
+        codes = generate_test_codes(url, feature_content, languages, os.path.basename(feature_path),
+                                    force_regenerate, max_workers=scenario_workers, snapshot_mode=snapshot_mode)
+        # Mirror the feature tree under out_dir
+        stem = os.path.splitext(os.path.relpath(os.path.abspath(feature_path), base))[0]
+        for language, code in codes.items():
+            output = os.path.join(out_dir, f"{stem}.{CODE_EXTENSIONS[language]}")
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+            with open(output, "w", encoding="utf-8") as f:
+                f.write(extract_code_block(code))
+            result["outputs"][language] = output
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    print(f"[{result['status']}] {feature_path} ({result['seconds']}s)" + (f": {result['error']}" if result["error"] else ""))
+    return result
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Selenium test code from Gherkin feature files.")
+    parser.add_argument("features", nargs="+", help="Feature files, directories or glob patterns")
+    parser.add_argument("--manifest", required=True, help="JSON file mapping feature names or patterns to URLs")
+    parser.add_argument("--language", nargs="+", choices=sorted(CODE_EXTENSIONS), default=["python"],
+                        help="One or more targets, all generated from one exploration per feature")
+    parser.add_argument("--out", default="generated", help="Directory for the generated code")
+    parser.add_argument("--summary", help="Path of the JSON summary (default: <out>/summary.json)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Feature files processed at the same time")
+    parser.add_argument("--scenario-workers", type=int, default=SCENARIO_WORKERS,
+                        help="Scenarios of one feature explored at the same time")
+    parser.add_argument("--force-regenerate", action="store_true",
+                        help="Re-explore every scenario with the agent instead of replaying recorded runs and rebuild "
+                             "the code from scratch instead of updating the previous generation; also bypasses the "
+                             "LLM response cache")
+    parser.add_argument("--snapshot", choices=SNAPSHOT_MODES, default=SNAPSHOT_MODE,
+                        help="capture page snapshots, replay them without network page loads, or auto (default: off)")
+    return parser.parse_args(argv)
+
+def run(args):
+    with open(args.manifest, encoding="utf-8") as f:
+        manifest = json.load(f)
+    root = os.path.dirname(os.path.abspath(args.manifest))
+    features = find_feature_files(args.features)
+    if not features:
+        print("No feature files found", file=sys.stderr)
+        return 2
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in features])
+    started = time.perf_counter()
+    try:
+        # Batch calls queue behind interactive ones sharing this process's LLM quota
+        with llm_lane("batch"), ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            results = list(executor.map(
+                propagate(lambda path: generate_one(path, resolve_url(manifest, path, root), args.language, args.out,
+                                                    base, args.scenario_workers, args.force_regenerate,
+                                                    args.snapshot)),
+                features,
+            ))
+    finally:
+        get_driver_pool().shutdown()
+    failed = [r for r in results if r["status"] != "ok"]
+    summary = {
+        "languages": args.language,
+        "total": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+    summary_path = args.summary or os.path.join(args.out, "summary.json")
+    os.makedirs(os.path.dirname(summary_path) or ".", exist_ok=True)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    print(f"{summary['succeeded']}/{summary['total']} feature files generated in {summary['seconds']}s; summary at {summary_path}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    load_dotenv()
+    sys.exit(run(parse_args()))
@@ -0,0 +1,18 @@
+Feature: Login
+  As a registered user
+  I want to sign in with my credentials
+  So that I can reach my account
+
+  Scenario: Successful login
+    Given I am on the login page
+    When I enter "standard_user" as username
+    And I enter "secret_sauce" as password
+    And I click the Login button
+    Then I should be redirected to the inventory page
+
+  Scenario: Login with a wrong password
+    Given I am on the login page
+    When I enter "standard_user" as username
+    And I enter "wrong_password" as password
+    And I click the Login button
+    Then I should see the error "Username and password do not match"
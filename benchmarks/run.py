@@ -0,0 +1,233 @@
+"""Benchmark the SDET-Genie pipelines against local fixture pages and the stub LLM backend.
+
+Example:
+    python benchmarks/run.py --repeat 5 --out bench-new.json --compare bench-old.json
+
+Every run uses fresh caches, the bundled fixture sites served on localhost and
+the deterministic stub LLM/embedding backend (SDET_LLM_BACKEND=stub), so results
+only move when the code does. Needs Chrome like the app itself.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+FIXTURES = os.path.join(HERE, "fixtures")
+BENCHMARKS = ("main", "generate_gherkin_feature", "identify_elements_and_generate_csv", "generate_test_scenarios")
+
+def configure_environment(args, workdir):
+    # Read by the pipeline modules at import time, so this runs before importing them
+    os.environ.update({
+        "SDET_LLM_BACKEND": "stub",
+        "SDET_STUB_LATENCY": str(args.llm_latency),
+        "SDET_STUB_CHUNK_LATENCY": str(args.chunk_latency),
+        "SDET_STUB_EMBED_LATENCY": str(args.embed_latency),
+        "SDET_LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        "SDET_EMBEDDING_CACHE": os.path.join(workdir, "embeddings"),
+        "SDET_EXAMPLES_INDEX": os.path.join(workdir, "examples_index"),
+        "SDET_SCREENSHOT_INDEX": os.path.join(workdir, "screenshots.sqlite3"),
+        "SDET_SCREENSHOTS_ROOT": os.path.join(workdir, "screenshots"),
+        "SDET_SNAPSHOT_MODE": "off",
+        "SDET_LOCATOR_STORE": os.path.join(workdir, "locators.sqlite3"),
+        "SDET_RECORDINGS": os.path.join(workdir, "recordings.sqlite3"),
+        "SDET_TRACE_FILE": os.path.join(workdir, "traces.jsonl"),
+    })
+    sys.path.insert(0, ROOT)
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_fixtures():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_QuietHandler, directory=os.path.join(FIXTURES, "sites")))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class PeakRSS:
+    # Samples this process' resident set size while a benchmark runs
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def current():
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            # Lifetime peak where /proc is not available (kilobytes on Linux, bytes on macOS)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self):
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+def percentile(values, q):
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def build_benchmarks(base_url, workdir):
+    from codegen import generate_test_code
+    from driver_pool import get_driver_pool
+    from element_inspector import extract_elements
+
+    import app
+
+    with open(os.path.join(FIXTURES, "login.feature"), encoding="utf-8") as f:
+        feature = f.read()
+    with open(os.path.join(FIXTURES, "user_story.txt"), encoding="utf-8") as f:
+        user_story = f.read()
+    # Inputs of the test idea generator are captured once, outside the timed runs
+    with get_driver_pool().lease() as lease:
+        lease.driver.get(f"{base_url}/cart/")
+        screenshot = lease.driver.get_screenshot_as_png()
+        selected = [{"tag": e["tag"], "id": e["id"]} for e in extract_elements(lease.driver, highlight=False)[:15]]
+
+    return {
+        # main() minus the Streamlit rendering
+        "main": lambda: generate_test_code(f"{base_url}/login/", feature, "python", "login.feature",
+                                           force_regenerate=True),
+        "generate_gherkin_feature": lambda: app.generate_gherkin_feature(user_story, "Detailed", force_regenerate=True),
+        "identify_elements_and_generate_csv": lambda: app.identify_elements_and_generate_csv(
+            f"{base_url}/search/", os.path.join(workdir, "elements.csv")),
+        "generate_test_scenarios": lambda: app.generate_test_scenarios(f"{base_url}/cart/", selected, screenshot,
+                                                                       force_regenerate=True),
+    }
+
+def measure(name, func, repeat, warmup):
+    from stub_backend import reset_stub_usage, stub_usage
+    from tracing import webdriver_command_count
+
+    for _ in range(warmup):
+        func()
+    runs = []
+    for _ in range(repeat):
+        reset_stub_usage()
+        commands = webdriver_command_count()
+        with PeakRSS() as rss:
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+        usage = stub_usage()
+        runs.append({
+            "seconds": seconds,
+            "webdriver_commands": webdriver_command_count() - commands,
+            "llm_calls": usage["calls"],
+            "prompt_tokens": usage["prompt_tokens"],
+            "completion_tokens": usage["completion_tokens"],
+            "embedded_texts": usage["embedded_texts"],
+            "peak_rss_bytes": rss.peak,
+        })
+    latencies = [r["seconds"] for r in runs]
+    result = {
+        "runs": repeat,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1),
+        "webdriver_commands": percentile([r["webdriver_commands"] for r in runs], 0.5),
+        "llm_calls": percentile([r["llm_calls"] for r in runs], 0.5),
+        "prompt_tokens": percentile([r["prompt_tokens"] for r in runs], 0.5),
+        "completion_tokens": percentile([r["completion_tokens"] for r in runs], 0.5),
+        "embedded_texts": percentile([r["embedded_texts"] for r in runs], 0.5),
+        "peak_rss_mb": round(max(r["peak_rss_bytes"] for r in runs) / 2 ** 20, 1),
+        "samples_ms": [round(s * 1000, 1) for s in latencies],
+    }
+    print(f"{name}: p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, {result['webdriver_commands']:g} WebDriver "
+          f"commands, {result['prompt_tokens']:g} prompt tokens, peak RSS {result['peak_rss_mb']} MB")
+    return result
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous_path, report):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous.get('label') or previous.get('revision')} ({previous_path}):")
+    for name, result in report["benchmarks"].items():
+        before = previous.get("benchmarks", {}).get(name)
+        if not before:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p95_ms", "webdriver_commands", "prompt_tokens", "peak_rss_mb"):
+            old, new = before.get(metric), result[metric]
+            if old:
+                changes.append(f"{metric} {old:g} -> {new:g} ({(new - old) / old * 100:+.1f}%)")
+        print(f"  {name}: " + ", ".join(changes))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SDET-Genie pipelines offline.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before the timed ones")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Stub LLM seconds per call")
+    parser.add_argument("--chunk-latency", type=float, default=0.005, help="Stub LLM seconds per streamed chunk")
+    parser.add_argument("--embed-latency", type=float, default=0.02, help="Stub embedding seconds per batch")
+    parser.add_argument("--label", help="Name for this run in the report (default: git revision)")
+    parser.add_argument("--out", default="benchmark-results.json", help="JSON report path")
+    parser.add_argument("--compare", help="Earlier JSON report to print the differences against")
+    return parser.parse_args(argv)
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="sdet-bench-")
+    configure_environment(args, workdir)
+    from driver_pool import get_driver_pool
+
+    server, base_url = serve_fixtures()
+    revision = git_revision()
+    report = {
+        "label": args.label or revision,
+        "revision": revision,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"repeat": args.repeat, "warmup": args.warmup, "llm_latency": args.llm_latency,
+                   "chunk_latency": args.chunk_latency, "embed_latency": args.embed_latency},
+        "benchmarks": {},
+    }
+    try:
+        benchmarks = build_benchmarks(base_url, workdir)
+        for name in args.only:
+            report["benchmarks"][name] = measure(name, benchmarks[name], args.repeat, args.warmup)
+    finally:
+        get_driver_pool().shutdown()
+        server.shutdown()
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
+    if args.compare:
+        compare(args.compare, report)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(run(parse_args()))
@@ -0,0 +1,209 @@
+import ast
+import io
+import re
+import textwrap
+import tokenize
+
+# Replaces individual methods of a generated test class with rewritten ones,
+# so an edited scenario only costs the methods it touches. Python is parsed
+# with ast; Java methods are found by signature and brace matching.
+
+JAVA_METHOD_RE = re.compile(
+    r"^[ \t]*(?:@[\w.]+(?:\([^)]*\))?\s*)*"
+    r"(?:(?:public|protected|private|static|final|synchronized|abstract)\s+)*"
+    r"(?:<[^>]+>\s+)?[\w.<>\[\], ?]+\s+(?P<name>\w+)\s*\([^;{)]*\)\s*(?:throws\s+[\w., ]+)?\{",
+    re.MULTILINE,
+)
+JAVA_KEYWORDS = {"if", "for", "while", "switch", "catch", "synchronized", "return", "new", "else"}
+
+class SpliceError(ValueError):
+    pass
+
+def _python_tree(code):
+    try:
+        return ast.parse(code)
+    except SyntaxError as e:
+        raise SpliceError(f"Generated Python does not parse: {e}") from e
+
+def _python_container(tree):
+    # The first class, or the module itself for function-based code like pytest-bdd steps
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    return classes[0] if classes else tree
+
+def _node_lines(node):
+    # Decorators belong to the method they decorate
+    start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+    return start, node.end_lineno
+
+def _string_lines(code):
+    # Numbers of the lines that begin inside a multi-line string; their leading
+    # whitespace belongs to the string and must never be shifted
+    protected = set()
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            protected.update(range(token.start[0] + 1, token.end[0] + 1))
+    except (tokenize.TokenError, SyntaxError) as e:
+        raise SpliceError(f"Generated Python does not tokenize: {e}") from e
+    return protected
+
+def _shift(lines, protected, remove=0, add="", first=1):
+    # Takes up to remove columns of leading whitespace off each line and prefixes
+    # add, leaving blank lines empty and lines inside strings as they are
+    shifted = []
+    for number, line in enumerate(lines, first):
+        if number in protected:
+            shifted.append(line)
+        elif not line.strip():
+            shifted.append("")
+        else:
+            cut = min(remove, len(line) - len(line.lstrip(" \t")))
+            shifted.append(add + line[cut:])
+    return shifted
+
+def _indent_method(source, indent):
+    return _shift(source.splitlines(), _string_lines(source), add=indent)
+
+def python_methods(code):
+    # ({method name: source}, import lines) of the first class in code, or of the
+    # functions when the update came back as bare (possibly indented) methods
+    lines = code.splitlines()
+    protected = _string_lines(code)
+    imports = {number for number, line in enumerate(lines, 1)
+               if number not in protected and re.match(r"(import|from)\s", line)}
+    import_lines = [lines[number - 1] for number in sorted(imports)]
+    kept = [number for number in range(1, len(lines) + 1) if number not in imports]
+    rest = [lines[number - 1] for number in kept]
+    rest_protected = {i for i, number in enumerate(kept, 1) if number in protected}
+    margin = min((len(line) - len(line.lstrip(" \t")) for i, line in enumerate(rest, 1)
+                  if line.strip() and i not in rest_protected), default=0)
+    code = "\n".join(_shift(rest, rest_protected, margin))
+    tree = _python_tree(code)
+    lines = code.splitlines()
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+    body = classes[0].body if classes else tree.body
+    methods = {}
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            start, end = _node_lines(node)
+            methods[node.name] = "\n".join(_shift(lines[start - 1:end], rest_protected, node.col_offset, first=start))
+    return methods, import_lines
+
+def splice_python(previous, update):
+    methods, imports = python_methods(update)
+    if not methods:
+        raise SpliceError("The update holds no methods")
+    tree = _python_tree(previous)
+    container = _python_container(tree)
+    lines = previous.splitlines()
+    existing = {node.name: node for node in container.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    indent = ""
+    if isinstance(container, ast.ClassDef):
+        indent = re.match(r"\s*", lines[container.body[0].lineno - 1]).group(0) if container.body else "    "
+    replaced = []
+    # Bottom-up, so earlier line numbers stay valid while splicing
+    for name, node in sorted(((n, existing[n]) for n in methods if n in existing), key=lambda item: -item[1].lineno):
+        start, end = _node_lines(node)
+        lines[start - 1:end] = _indent_method(methods[name], indent)
+        replaced.append(name)
+    added = [name for name in methods if name not in existing]
+    if added:
+        # After the class's last line (or the end of the module); the replacements
+        # above are all inside the class, so it is found again on the spliced code
+        container = _python_container(_python_tree("\n".join(lines)))
+        end = container.end_lineno if isinstance(container, ast.ClassDef) else len(lines)
+        block = []
+        for name in added:
+            block += [""] * (1 if indent else 2) + _indent_method(methods[name], indent)
+        lines[end:end] = block
+    present = {ast.get_source_segment(previous, node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))}
+    missing = [line for line in imports if line not in present]
+    if missing:
+        last_import = max((node.end_lineno for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))),
+                          default=0)
+        lines[last_import:last_import] = missing
+    code = "\n".join(lines) + "\n"
+    # Parsing is not enough: a method spliced in at the wrong depth still parses,
+    # as a function nested in its neighbour, and the test would silently vanish
+    members = {node.name for node in _python_container(_python_tree(code)).body
+               if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+    lost = [name for name in replaced + added if name not in members]
+    if lost:
+        raise SpliceError(f"Spliced method(s) {', '.join(lost)} did not end up in the test class")
+    return code, replaced, added
+
+def _matching_brace(code, open_index):
+    # Index of the brace closing the one at open_index; skips strings, chars and comments
+    depth = 0
+    i = open_index
+    while i < len(code):
+        c = code[i]
+        if code.startswith("//", i):
+            i = code.find("\n", i)
+            if i < 0:
+                break
+        elif code.startswith("/*", i):
+            i = code.find("*/", i) + 1
+            if i <= 0:
+                break
+        elif c in "\"'":
+            i += 1
+            while i < len(code) and code[i] != c:
+                i += 2 if code[i] == "\\" else 1
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise SpliceError("Unbalanced braces in the Java code")
+
+def java_methods(code):
+    # {method name: (start, end)} character spans, annotations included
+    methods = {}
+    for match in JAVA_METHOD_RE.finditer(code):
+        name = match.group("name")
+        if name in JAVA_KEYWORDS:
+            continue
+        end = _matching_brace(code, match.end() - 1)
+        if not any(start < match.start() < stop for start, stop in methods.values()):
+            methods[name] = (match.start(), end + 1)
+    return methods
+
+def splice_java(previous, update):
+    spans = java_methods(update)
+    if not spans:
+        raise SpliceError("The update holds no methods")
+    methods = {name: textwrap.dedent(update[start:end]).strip("\n") for name, (start, end) in spans.items()}
+    existing = java_methods(previous)
+    class_open = previous.find("{", re.search(r"\bclass\s+\w+", previous).end()) if re.search(r"\bclass\s+\w+", previous) else -1
+    if class_open < 0:
+        raise SpliceError("No test class in the previous code")
+    class_close = _matching_brace(previous, class_open)
+    indent = "    "
+    if existing:
+        first = previous[existing[min(existing, key=lambda n: existing[n][0])][0]:]
+        indent = re.match(r"[ \t]*", first).group(0) or indent
+    code = previous
+    replaced = []
+    # Appended methods go before the class's closing brace, after every replacement
+    new = [name for name in methods if name not in existing]
+    if new:
+        block = "".join("\n" + textwrap.indent(methods[name], indent) + "\n" for name in new)
+        code = code[:class_close] + block + code[class_close:]
+    for name, (start, end) in sorted(((n, existing[n]) for n in methods if n in existing), key=lambda item: -item[1][0]):
+        code = code[:start] + textwrap.indent(methods[name], indent) + code[end:]
+        replaced.append(name)
+    imports = [line for line in re.findall(r"^import\s+[\w.*]+;", update, re.MULTILINE) if line not in code]
+    if imports:
+        last = list(re.finditer(r"^import\s+[\w.*]+;\n?", code, re.MULTILINE))
+        at = last[-1].end() if last else 0
+        code = code[:at] + "\n".join(imports) + "\n" + code[at:]
+    _matching_brace(code, code.find("{", re.search(r"\bclass\s+\w+", code).end()))
+    return code, replaced, new
+
+def splice_methods(previous, update, language):
+    # Returns (code, replaced method names, added method names); raises SpliceError
+    if language == "python":
+        return splice_python(previous, update)
+    return splice_java(previous, update)
@@ -0,0 +1,448 @@
+import contextlib
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_pool import get_driver_pool
+from example_library import select_examples
+from code_splice import SpliceError, splice_methods
+from gherkin import feature_key, feature_steps, split_feature
+from image_prep import prepare_image
+from locator_store import format_locator, get_locator_store
+from model_router import get_model_router
+from page_snapshot import page_url
+from prompt_builder import Section, assemble_prompt, distill_nodes
+from run_recorder import REPLAY_ENABLED, align_actions, get_run_recorder, replay_steps, scenario_hash
+from runtime import get_action_engine, get_world_model
+from screenshot_index import SCREENSHOTS_ROOT, get_screenshot_index, record_agent_logs
+from tracing import propagate, span
+
+# Feature-to-code pipeline shared by the Streamlit app and the batch CLI.
+# Nothing in here may import Streamlit.
+
+# Code generation targets by name, filled by register_target at the end of this
+# module; CODE_EXTENSIONS maps each to the extension of its output file
+TARGETS = {}
+CODE_EXTENSIONS = {}
+
+SCENARIO_WORKERS = int(os.getenv("SDET_SCENARIO_WORKERS", "3"))
+
+# Explorations running in this process; lavague's screenshot folder is only
+# cleared when none is, since they all write their observations there
+_explorations = 0
+_explorations_lock = threading.Lock()
+
+@contextlib.contextmanager
+def agent_screenshots():
+    global _explorations
+    with _explorations_lock:
+        if not _explorations:
+            shutil.rmtree(SCREENSHOTS_ROOT, ignore_errors=True)
+        _explorations += 1
+    try:
+        yield
+    finally:
+        with _explorations_lock:
+            _explorations -= 1
+
+def explore_scenario(url, test_case, site_url=None, replay=REPLAY_ENABLED, name=None):
+    # Runs one scenario with its own agent on its own pooled browser; site_url is
+    # the live page when url is a replayed snapshot of it
+    from lavague.core.agents import WebAgent
+
+    recorder = get_run_recorder()
+    plan = recorder.plan(site_url or url, test_case, name) if replay else None
+    with span("context"):
+        world_model = get_world_model()
+    # Initialize the agent on a warm browser from the pool
+    with span("driver.lease"):
+        lease = get_driver_pool().lease()
+    with lease:
+        action_engine = get_action_engine(lease.driver)
+        # Never clear the screenshot folder here: parallel scenarios are writing to it
+        agent = WebAgent(world_model, action_engine, clean_screenshot_folder=False)
+        print("--------------------------")
+        print(f"Running test case:\n{test_case}")
+        with span("agent.get", url=url):
+            agent.get(url)
+        # Locators from earlier runs that still resolve on this page let the
+        # agent act on known elements without searching the page for them
+        with span("locators.hints") as current:
+            locators = get_locator_store().hints(site_url or url, lease.driver)
+            current.set(hints=len(locators))
+        objective = f"Run this test case: \n\n{test_case}"
+        if locators:
+            objective += ("\n\nKnown locators on this page, confirmed on earlier runs:\n"
+                          + "\n".join(format_locator(entry) for entry in locators))
+        # A recorded run of this scenario (or of its unchanged leading steps) is
+        # executed directly, without the LLM; the agent only takes over from the
+        # first step that changed or no longer works
+        replayed, alignment, resume_at = [], [], 0
+        if plan:
+            with span("replay", steps=len(plan["steps"]), exact=plan["exact"]) as current:
+                done, error = replay_steps(lease.driver, plan["steps"])
+                replayed, alignment = plan["steps"][:done], plan["alignment"][:done]
+                resume_at = plan["alignment"][done] if error else plan["resume_at"]
+                current.set(replayed=done, resume_at=resume_at)
+            if plan["exact"]:
+                recorder.mark_replayed(site_url or url, test_case, fallback=error is not None)
+        gherkin = plan["gherkin"] if plan else feature_steps(test_case)
+        agent_ran = not plan or resume_at < len(gherkin) or len(replayed) < len(plan["steps"])
+        if agent_ran:
+            if replayed:
+                objective += "\n\nPart of the test case has already been performed on the current page"
+                if resume_at < len(gherkin):
+                    objective += f"; continue it from this step:\n{gherkin[resume_at]}"
+                objective += "\n\nCode already executed:\n" + "\n".join(replayed)
+            # Run the test case with the agent
+            with span("agent.run", resumed_at=resume_at):
+                agent.run(objective)
+        else:
+            print(f"Replayed {len(replayed)} recorded step(s) without the agent")
+            screenshot = lease.driver.get_screenshot_as_png()
+        # Perform RAG on final state of HTML page using the action engine
+        print("--------------------------")
+        print(f"Processing run...\n{test_case}")
+        with span("get_nodes") as current:
+            nodes = action_engine.navigation_engine.get_nodes(
+                f"We have ran the test case, generate the final assert statement.\n\ntest case:\n{test_case}"
+            )
+            current.set(nodes=len(nodes))
+    steps = list(replayed)
+    if agent_ran:
+        # Parse logs
+        logs = agent.logger.return_pandas()
+        record_agent_logs(logs)
+        screenshot = get_latest_screenshot_path(logs.iloc[-1]["screenshots_path"])
+        actions = [row for row in logs.to_dict("records") if isinstance(row.get("code"), str)]
+        steps += [row["code"] for row in actions]
+        # New actions are attributed to the Gherkin steps they carried out, for the next diff
+        alignment += align_actions([f"{row.get('instruction') or ''}\n{row['code']}" for row in actions], gherkin,
+                                   resume_at if replayed else 0)
+        recorder.save(site_url or url, test_case, steps, alignment, name)
+    with span("screenshot.prepare") as current:
+        image = prepare_image(screenshot)
+        current.set(original_bytes=image.original_bytes, prepared_bytes=len(image.data))
+    print(f"Screenshot prompt size: {image.savings()}")
+    selenium_code = "\n".join(steps)
+    get_locator_store().record_agent_run(site_url or url, selenium_code)
+    return {"selenium_code": selenium_code, "nodes": nodes, "image": image, "locators": locators,
+            "replayed": len(replayed), "agent_ran": agent_ran}
+
+def explore_feature(url, feature_content, max_workers=SCENARIO_WORKERS, snapshot_mode=None, replay=REPLAY_ENABLED,
+                    scenarios=None):
+    # Every scenario (or only the given ones) is explored in its own agent, at most max_workers at a time
+    scenarios = scenarios or split_feature(feature_content)
+    workers = max(1, min(max_workers, len(scenarios)))
+    # Resolved once so parallel scenarios share one capture and one replay server
+    with span("page_snapshot", mode=snapshot_mode or "default"):
+        target = page_url(url, mode=snapshot_mode)
+
+    def explore(scenario):
+        with span("explore_scenario", scenario=scenario.name):
+            return explore_scenario(target, scenario.text, url, replay, scenario.name)
+
+    with agent_screenshots(), ThreadPoolExecutor(max_workers=workers) as executor:
+        runs = list(executor.map(propagate(explore), scenarios))
+    # Merge the per-scenario artifacts so one test class covers the whole feature
+    if len(runs) == 1:
+        selenium_code, nodes = runs[0]["selenium_code"], runs[0]["nodes"]
+    else:
+        selenium_code = "\n\n".join(
+            f"# Scenario: {scenario.name}\n{run['selenium_code']}" for scenario, run in zip(scenarios, runs)
+        )
+        # Duplicate nodes across scenarios are dropped when the prompt is assembled
+        nodes = [node for run in runs for node in run["nodes"]]
+    locators = list({entry["fingerprint"]: entry for run in runs for entry in run["locators"]}.values())
+    return {"selenium_code": selenium_code, "nodes": nodes, "images": [run["image"] for run in runs],
+            "locators": locators}
+
+def changed_scenarios(previous, scenarios):
+    # Scenarios edited since the previous generation, or None when there is no
+    # previous class to update (first run, or scenarios added, removed or renamed)
+    if not previous or [name for name, _ in previous["scenarios"]] != [s.name for s in scenarios]:
+        return None
+    return [s for s, (_, digest) in zip(scenarios, previous["scenarios"]) if scenario_hash(s.text) != digest]
+
+def _text_stream(text):
+    yield text
+
+def _save_when_complete(chunks, save):
+    # Passes a stream through and saves the full text only if it completes
+    parts = []
+    try:
+        for delta in chunks:
+            parts.append(delta)
+            yield delta
+    finally:
+        chunks.close()
+    save("".join(parts))
+
+def generate_test_code(url, feature_content, language, feature_file_name="generated_feature.feature",
+                       force_regenerate=False, stream=False, max_workers=SCENARIO_WORKERS, snapshot_mode=None):
+    return generate_test_codes(url, feature_content, [language], feature_file_name, force_regenerate, stream,
+                               max_workers, snapshot_mode)[language.lower()]
+
+def generate_test_codes(url, feature_content, languages, feature_file_name="generated_feature.feature",
+                        force_regenerate=False, stream=False, max_workers=SCENARIO_WORKERS, snapshot_mode=None):
+    # {target: code} for every requested target (see TARGETS) from one exploration
+    # of the feature. Without stream the targets are generated concurrently; with
+    # it each value is a stream that only starts when it is consumed.
+    test_case = feature_content
+    langs = list(dict.fromkeys(language.lower() for language in languages))
+    unknown = [lang for lang in langs if lang not in TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown code generation target(s) {unknown}; expected some of {sorted(TARGETS)}")
+    scenarios = split_feature(feature_content)
+    # Previous generations belong to the feature itself, whatever file name it is given
+    feature = feature_key(feature_content)
+    recorder = get_run_recorder()
+    results = {}
+
+    with span("generate_test_code", language=",".join(langs), url=url) as current:
+        # Edited scenarios only rewrite their own methods of the code generated last time
+        previous, changed = {}, {}
+        for lang in langs:
+            previous[lang] = None if force_regenerate else recorder.last_generation(url, feature, lang)
+            changed[lang] = changed_scenarios(previous[lang], scenarios)
+            if changed[lang] == []:
+                print(f"Feature unchanged since the last {lang} generation, reusing its code")
+                results[lang] = _text_stream(previous[lang]["code"]) if stream else previous[lang]["code"]
+        pending = [lang for lang in langs if lang not in results]
+        current.set(reused=len(results), generated=len(pending))
+        if not pending:
+            return results
+        # One exploration covers every target: the whole feature if any target
+        # needs it, otherwise only the scenarios some target has to update
+        if any(changed[lang] is None for lang in pending):
+            needed = None
+        else:
+            names = {s.name for lang in pending for s in changed[lang]}
+            needed = [s for s in scenarios if s.name in names]
+        # The prompt keeps the real url even when the agent browsed a replayed snapshot.
+        # A forced regeneration explores with the agent again instead of replaying.
+        with span("explore_feature"):
+            run = explore_feature(url, feature_content, max_workers, snapshot_mode, replay=not force_regenerate,
+                                  scenarios=needed)
+        full_run = {"run": run if needed is None else None}
+        full_run_lock = threading.Lock()
+
+        def whole_feature_run():
+            # Unchanged scenarios replay their recordings, so this is quick; shared by all targets
+            with full_run_lock:
+                if full_run["run"] is None:
+                    with span("explore_feature"):
+                        full_run["run"] = explore_feature(url, feature_content, max_workers, snapshot_mode)
+                return full_run["run"]
+
+        def generate_target(lang):
+            target = TARGETS[lang]
+
+            def save(code):
+                recorder.save_generation(url, feature, lang, code, scenarios)
+
+            with span("generate_target", target=lang) as target_span:
+                if changed[lang]:
+                    print("--------------------------")
+                    print(f"Updating {len(changed[lang])} changed scenario(s) of the {target['label']} code")
+                    code = update_test_code(url, feature_file_name, lang,
+                                            extract_code_block(previous[lang]["code"]), changed[lang], run,
+                                            force_regenerate)
+                    if code:
+                        target_span.set(mode="incremental", changed=len(changed[lang]))
+                        save(code)
+                        return _text_stream(code) if stream else code
+                target_span.set(mode="full")
+                feature_run = whole_feature_run()
+                print("--------------------------")
+                print(f"Generating {target['label']} code")
+                code = target["generate"](url, feature_file_name, test_case, feature_run["selenium_code"],
+                                          feature_run["nodes"], feature_run["images"], force_regenerate, stream,
+                                          feature_run["locators"])
+                if stream:
+                    return _save_when_complete(code, save)
+                save(code)
+                return code
+
+        if stream or len(pending) == 1:
+            results.update((lang, generate_target(lang)) for lang in pending)
+        else:
+            # The run artifacts are shared; only the LLM calls differ per target
+            with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                results.update(zip(pending, executor.map(propagate(generate_target), pending)))
+    return {lang: results[lang] for lang in langs}
+
+def update_test_code(url, feature_file_name, target, previous_code, changed, run, force_regenerate=False):
+    # Asks for the methods of the changed scenarios only and splices them into the
+    # previous class; None when the answer cannot be spliced in. The prompt names
+    # the target, so targets sharing a syntax never share a cached answer.
+    language = TARGETS[target]["syntax"]
+    prompt = build_code_prompt(UPDATE_PROMPT, url, feature_file_name, "\n\n".join(s.text for s in changed),
+                               run["selenium_code"], run["nodes"], [], run["locators"], previous_code,
+                               TARGETS[target]["label"])
+    update = get_model_router().complete(prompt, run["images"], force_regenerate)
+    with span("code.splice") as current:
+        try:
+            code, replaced, added = splice_methods(previous_code, extract_code_block(update), language)
+        except SpliceError as e:
+            current.fail(e)
+            print(f"Could not update the previous code in place ({e}); generating it again")
+            return None
+        current.set(replaced=len(replaced), added=len(added))
+    print(f"Regenerated methods: {', '.join(replaced) or 'none'}; added: {', '.join(added) or 'none'}")
+    return f"```{language}\n{code}```"
+
+def extract_code_block(text):
+    # Models usually wrap the script in a fenced block; keep only the code
+    match = re.search(r"```[\w+-]*\n(.*?)```", text, re.DOTALL)
+    # Leading indentation is kept: a partial update may start with an indented method
+    return match.group(1).lstrip("\n").rstrip() + "\n" if match else text
+
+def get_latest_screenshot_path(directory):
+    # Served from the screenshot index instead of listing the directory
+    return get_screenshot_index().latest(directory)
+
+PYTEST_PROMPT = """Generate a Python Selenium test script with the following inputs and structure examples to guide you:
+    Base url: {url}
+    Feature file name: {feature_file_name}
+    Test case: {test_case}
+    Already executed code:
+    {selenium_code}
+    Known stable locators of the start page (prefer these):
+    {known_locators}
+    Selected html of the last page: {nodes}
+    Image: screenshot of the last page of each scenario, attached
+    Cover every scenario of the test case in one test class.
+    Examples:
+    {examples}
+    """
+
+JAVA_PROMPT = """Generate a Java Selenium test script with the following inputs and structure examples to guide you:
+    Base url: {url}
+    Feature file name: {feature_file_name}
+    Test case: {test_case}
+    Already executed code:
+    {selenium_code}
+    Known stable locators of the start page (prefer these):
+    {known_locators}
+    Selected html of the last page: {nodes}
+    Image: screenshot of the last page of each scenario, attached
+    Cover every scenario of the test case in one test class.
+    Examples:
+    {examples}
+    """
+
+PLAYWRIGHT_PROMPT = """Generate a Python Playwright test script (pytest-playwright, sync API, page fixture) with the following inputs and structure examples to guide you:
+    Base url: {url}
+    Feature file name: {feature_file_name}
+    Test case: {test_case}
+    Already executed code (Selenium, translate its locators and actions to Playwright):
+    {selenium_code}
+    Known stable locators of the start page (prefer these):
+    {known_locators}
+    Selected html of the last page: {nodes}
+    Image: screenshot of the last page of each scenario, attached
+    Cover every scenario of the test case in one test class and assert with Playwright's expect.
+    Examples (Selenium; follow their structure, not their API):
+    {examples}
+    """
+
+PYTEST_BDD_PROMPT = """Generate a Python pytest-bdd step definition test script with the following inputs and structure examples to guide you:
+    Base url: {url}
+    Feature file name: {feature_file_name}
+    Test case: {test_case}
+    Already executed code:
+    {selenium_code}
+    Known stable locators of the start page (prefer these):
+    {known_locators}
+    Selected html of the last page: {nodes}
+    Image: screenshot of the last page of each scenario, attached
+    Bind the feature file with scenarios("{feature_file_name}") and write one @given, @when or @then function per
+    distinct step (parsers for quoted values), driving Selenium through a browser fixture.
+    Examples:
+    {examples}
+    """
+
+UPDATE_PROMPT = """Update the test code below after some scenarios of its feature file were edited:
+    Base url: {url}
+    Feature file name: {feature_file_name}
+    Target: {target}
+    Current test code:
+    {previous_code}
+    Edited scenarios: {test_case}
+    Already executed code:
+    {selenium_code}
+    Known stable locators of the start page (prefer these):
+    {known_locators}
+    Selected html of the last page: {nodes}
+    Image: screenshot of the last page of each edited scenario, attached
+    Return, in one code block, only the methods the edited scenarios need changed, each rewritten in full under its
+    current name, plus any new methods they need. Do not repeat methods that stay the same.
+    """
+
+def build_code_prompt(template, url, feature_file_name, test_case, selenium_code, nodes, examples, locators=(),
+                      previous_code=None, target=None):
+    # Fits every section into the token budget: inputs are kept whole, executed code
+    # is cut by lines, examples by whole example and nodes by least relevant first
+    if isinstance(nodes, str):
+        nodes = [nodes]
+    sections = [
+        Section("url", [url], 0, required=True),
+        Section("feature_file_name", [feature_file_name], 0, required=True),
+        Section("test_case", [test_case], 0, required=True),
+        Section("selenium_code", selenium_code.splitlines(), 1),
+        Section("known_locators", [format_locator(entry) for entry in locators], 1),
+        Section("examples", examples, 2, joiner="\n\n"),
+        Section("nodes", distill_nodes(nodes), 3),
+    ]
+    if previous_code is not None:
+        sections.append(Section("previous_code", [previous_code], 0, required=True))
+    if target is not None:
+        sections.append(Section("target", [target], 0, required=True))
+    with span("prompt.assemble") as current:
+        prompt, report = assemble_prompt(template, sections)
+        tokens = {name: r["tokens"] for name, r in report.items()}
+        current.set(**{f"tokens.{name}": value for name, value in tokens.items()})
+    print(f"Prompt sections (tokens): {tokens}")
+    return prompt
+
+def generate_from_template(template, examples_language, url, feature_file_name, test_case, selenium_code, nodes,
+                           images, force_regenerate=False, stream=False, locators=()):
+    prompt = build_code_prompt(template, url, feature_file_name, test_case, selenium_code, nodes,
+                               select_examples(examples_language, test_case), locators)
+    # The screenshot travels as an image part instead of base64 text in the prompt
+    return get_model_router().complete(prompt, images, force_regenerate, stream)
+
+def generate_pytest_code(url, feature_file_name, test_case, selenium_code, nodes, images, force_regenerate=False, stream=False,
+                         locators=()):
+    return generate_from_template(PYTEST_PROMPT, "python", url, feature_file_name, test_case, selenium_code, nodes,
+                                  images, force_regenerate, stream, locators)
+
+def generate_java_code(url, feature_file_name, test_case, selenium_code, nodes, images, force_regenerate=False, stream=False,
+                       locators=()):
+    return generate_from_template(JAVA_PROMPT, "java", url, feature_file_name, test_case, selenium_code, nodes,
+                                  images, force_regenerate, stream, locators)
+
+def generate_playwright_code(url, feature_file_name, test_case, selenium_code, nodes, images, force_regenerate=False,
+                             stream=False, locators=()):
+    # The curated examples are Selenium, but their test structure carries over
+    return generate_from_template(PLAYWRIGHT_PROMPT, "python", url, feature_file_name, test_case, selenium_code,
+                                  nodes, images, force_regenerate, stream, locators)
+
+def generate_pytest_bdd_code(url, feature_file_name, test_case, selenium_code, nodes, images, force_regenerate=False,
+                             stream=False, locators=()):
+    return generate_from_template(PYTEST_BDD_PROMPT, "python", url, feature_file_name, test_case, selenium_code,
+                                  nodes, images, force_regenerate, stream, locators)
+
+def register_target(name, label, generate, extension, syntax):
+    # generate takes the arguments of generate_pytest_code; syntax ("python" or
+    # "java") is the language the generated code is spliced and highlighted as
+    TARGETS[name] = {"label": label, "generate": generate, "extension": extension, "syntax": syntax}
+    CODE_EXTENSIONS[name] = extension
+
+register_target("python", "Python", generate_pytest_code, "py", "python")
+register_target("java", "Java", generate_java_code, "java", "java")
+register_target("playwright", "Playwright (Python)", generate_playwright_code, "playwright.py", "python")
+register_target("pytest-bdd", "pytest-bdd steps", generate_pytest_bdd_code, "steps.py", "python")
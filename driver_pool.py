@@ -0,0 +1,254 @@
+import logging
+import os
+import socket
+import threading
+import time
+import weakref
+
+from tracing import instrument_webdriver
+
+# Pool sizing and timeouts can be tuned per deployment
+POOL_SIZE = int(os.getenv("SDET_DRIVER_POOL_SIZE", "2"))
+MAX_SESSIONS = int(os.getenv("SDET_DRIVER_POOL_MAX", "6"))
+IDLE_TIMEOUT = float(os.getenv("SDET_DRIVER_IDLE_TIMEOUT", "600"))
+LEASE_TIMEOUT = float(os.getenv("SDET_DRIVER_LEASE_TIMEOUT", "1800"))
+REAP_INTERVAL = 30
+
+log = logging.getLogger(__name__)
+
+def _free_port():
+    # Let the OS pick an unused port so concurrent sessions never share a debug port
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def launch_chrome(debug_port=None, headless=True):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"--remote-debugging-port={debug_port or _free_port()}")
+    chrome_options.add_argument("--window-size=1920,1080")
+    if os.environ.get("CHROME_BIN"):
+        chrome_options.binary_location = os.environ["CHROME_BIN"]
+
+    # Every WebDriver command is counted on the tracing span that issued it
+    instrument_webdriver()
+    service = Service(executable_path=os.environ.get("CHROMEDRIVER_PATH"))
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+def reset_driver(driver):
+    # Close every tab but the first
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+    # Storage is per origin, so clear it while still on the last visited page
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except Exception:
+        pass
+    driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    driver.delete_all_cookies()
+    driver.get("about:blank")
+
+class _Session:
+    def __init__(self, driver, port):
+        self.driver = driver
+        self.port = port
+        self.since = time.monotonic()
+
+class Lease:
+    # Returned by DriverPool.lease(); the driver goes back to the pool on
+    # release(), at the end of a with-block, or when the lease is garbage
+    # collected (e.g. a Streamlit session that went away).
+    def __init__(self, pool, driver):
+        self.driver = driver
+        self._finalizer = weakref.finalize(self, pool.release, driver)
+
+    def release(self):
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class DriverPool:
+    def __init__(self, size=POOL_SIZE, max_sessions=MAX_SESSIONS, idle_timeout=IDLE_TIMEOUT,
+                 lease_timeout=LEASE_TIMEOUT, headless=True):
+        self.size = size
+        self.max_sessions = max(size, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.lease_timeout = lease_timeout
+        self.headless = headless
+        self._idle = []
+        self._leased = {}
+        self._launching = 0
+        self._waiting = 0
+        # Counts failed launches; waiters compare it with its value when they arrived
+        self._failures = 0
+        self._launch_error = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._reaper = threading.Thread(target=self._reap_loop, name="driver-pool-reaper", daemon=True)
+        self._reaper.start()
+        self._replenish()
+
+    def _total(self):
+        return len(self._idle) + len(self._leased) + self._launching
+
+    def _launch(self):
+        port = _free_port()
+        try:
+            driver = launch_chrome(port, headless=self.headless)
+        except Exception as e:
+            log.warning("Driver pool: failed to launch Chrome: %s", e)
+            driver = None
+            error = e
+        with self._cond:
+            self._launching -= 1
+            if driver is None:
+                self._failures += 1
+                self._launch_error = error
+            else:
+                if self._closed:
+                    _quit(driver)
+                else:
+                    self._idle.append(_Session(driver, port))
+            self._cond.notify_all()
+
+    def _replenish(self):
+        # Warm sessions are launched in the background, off the request path
+        with self._cond:
+            missing = self.size - len(self._idle) - self._launching
+            missing = min(missing, self.max_sessions - self._total())
+            self._launching += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            threading.Thread(target=self._launch, name="driver-pool-launch", daemon=True).start()
+
+    def acquire(self, timeout=120):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiting += 1
+            failures = self._failures
+            try:
+                while not self._idle:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    failed = self._failures != failures
+                    # A launch failed while we waited and none is left that could serve us:
+                    # report why instead of launching again until the timeout
+                    if failed and not self._launching:
+                        raise RuntimeError("Could not launch a browser session") from self._launch_error
+                    # Cold-launch only when the launches in flight cannot cover every waiter
+                    if not failed and self._launching < self._waiting and self._total() < self.max_sessions:
+                        self._launching += 1
+                        threading.Thread(target=self._launch, name="driver-pool-launch", daemon=True).start()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("No browser session became available")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            session = self._idle.pop()
+            session.since = time.monotonic()
+            self._leased[id(session.driver)] = session
+        self._replenish()
+        return session.driver
+
+    def lease(self, timeout=120):
+        return Lease(self, self.acquire(timeout))
+
+    def release(self, driver):
+        with self._cond:
+            session = self._leased.pop(id(driver), None)
+        if session is None:
+            return
+        try:
+            reset_driver(driver)
+        except Exception:
+            # A session that cannot be reset is not worth keeping
+            _quit(driver)
+            self._replenish()
+            return
+        with self._cond:
+            if self._closed:
+                _quit(driver)
+                return
+            session.since = time.monotonic()
+            self._idle.append(session)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"idle": len(self._idle), "leased": len(self._leased), "launching": self._launching}
+
+    def _reap_loop(self):
+        while not self._closed:
+            time.sleep(REAP_INTERVAL)
+            self.reap()
+
+    def reap(self):
+        now = time.monotonic()
+        doomed = []
+        with self._cond:
+            # Leases held far longer than any run should take are treated as stuck
+            for key, session in list(self._leased.items()):
+                if now - session.since > self.lease_timeout:
+                    doomed.append(self._leased.pop(key))
+            # Idle sessions beyond the warm size are closed once they go stale
+            keep = []
+            for session in sorted(self._idle, key=lambda s: s.since, reverse=True):
+                if len(keep) >= self.size and now - session.since > self.idle_timeout:
+                    doomed.append(session)
+                else:
+                    keep.append(session)
+            self._idle = keep
+        for session in doomed:
+            _quit(session.driver)
+        if doomed:
+            log.info("Driver pool: reaped %d session(s)", len(doomed))
+            self._replenish()
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            sessions = self._idle + list(self._leased.values())
+            self._idle, self._leased = [], {}
+            self._cond.notify_all()
+        for session in sessions:
+            _quit(session.driver)
+
+# Called with every driver the pool quits, so per-driver caches can drop it
+_retire_hooks = []
+
+def on_retire(hook):
+    if hook not in _retire_hooks:
+        _retire_hooks.append(hook)
+
+def _quit(driver):
+    for hook in _retire_hooks:
+        hook(driver)
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_driver_pool():
+    # One pool per process, shared by every Streamlit session
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool()
+        return _pool
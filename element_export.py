@@ -0,0 +1,121 @@
+import csv
+import json
+import os
+from itertools import islice
+
+# Element rows as produced by element_inspector.iter_elements, written one at a
+# time so an export never holds the whole page in memory.
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+# (CSV header, row key)
+COLUMNS = [
+    ("ID", "index"),
+    ("Element ID", "id"),
+    ("XPath", "xpath"),
+    ("Tag", "tag"),
+    ("X", "x"),
+    ("Y", "y"),
+    ("Width", "width"),
+    ("Height", "height"),
+    ("Frame", "frame"),
+    ("Shadow Host", "shadow_host"),
+]
+# Site-wide inventory from the crawler: one row per distinct element
+INVENTORY_COLUMNS = COLUMNS[1:] + [("Fingerprint", "fingerprint"), ("Pages", "pages"), ("First URL", "url")]
+INTEGER_KEYS = {"index", "x", "y", "width", "height", "pages"}
+PARQUET_BATCH_ROWS = 2000
+MIMETYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+def export_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    return {"ndjson": "jsonl", "pq": "parquet"}.get(ext, ext) if ext in EXPORT_FORMATS + ("ndjson", "pq") else "csv"
+
+class CsvExporter:
+    def __init__(self, path, columns=COLUMNS):
+        self._columns = columns
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([title for title, _ in columns])
+
+    def write(self, row):
+        self._writer.writerow([row.get(key, "") for _, key in self._columns])
+
+    def close(self):
+        self._file.close()
+
+class JsonlExporter:
+    def __init__(self, path, columns=COLUMNS):
+        self._columns = columns
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, row):
+        self._file.write(json.dumps({key: row.get(key) for _, key in self._columns}) + "\n")
+
+    def close(self):
+        self._file.close()
+
+class ParquetExporter:
+    # Rows are buffered into record batches; each batch becomes a row group
+    def __init__(self, path, columns=COLUMNS):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(key, pa.int64() if key in INTEGER_KEYS else pa.string()) for _, key in columns])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._rows = []
+
+    def write(self, row):
+        self._rows.append(row)
+        if len(self._rows) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            rows = [{key: row.get(key) for _, key in self._columns} for row in self._rows]
+            self._writer.write_batch(self._pa.RecordBatch.from_pylist(rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+EXPORTERS = {"csv": CsvExporter, "jsonl": JsonlExporter, "parquet": ParquetExporter}
+
+def export_elements(rows, path, fmt=None, columns=COLUMNS):
+    # Consumes an iterable of element rows and returns how many were written
+    exporter = EXPORTERS[fmt or export_format(path)](path, columns)
+    count = 0
+    try:
+        for row in rows:
+            exporter.write(row)
+            count += 1
+    finally:
+        exporter.close()
+    return count
+
+def read_page(path, page, page_size=50, fmt=None):
+    # Reads one page of an export for the preview without loading the whole file
+    fmt = fmt or export_format(path)
+    start = page * page_size
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        # Rows start..start+page_size like the other formats: only the row groups
+        # holding them are read, since batches never span two row groups
+        parquet = pq.ParquetFile(path)
+        groups, offset, first = [], 0, None
+        for i in range(parquet.num_row_groups):
+            rows = parquet.metadata.row_group(i).num_rows
+            if offset + rows > start and offset < start + page_size:
+                groups.append(i)
+                first = offset if first is None else first
+            offset += rows
+        if not groups:
+            return []
+        table = parquet.read_row_groups(groups)
+        return table.slice(start - first, page_size).to_pylist()
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "jsonl":
+            return [json.loads(line) for line in islice(f, start, start + page_size)]
+        return list(islice(csv.DictReader(f), start, start + page_size))
@@ -0,0 +1,225 @@
+import json
+import time
+
+from tracing import span
+
+# Walks the document once and returns every element carrying an id attribute
+# (the same set as //*[@id]) together with its tag, XPath and bounding box,
+# descending into same-origin iframes and open shadow roots in the same pass.
+# frame and shadow_host hold the XPaths of the enclosing iframes and shadow
+# hosts (" >> " separated); coordinates are relative to the top page.
+# Layout is read for all elements first and the highlight/overlay writes are
+# done afterwards, so the browser lays the page out only once. The first page
+# of rows is returned straight away and the rest is kept for FETCH_ELEMENTS_JS.
+EXTRACT_ELEMENTS_JS = """
+const paths = new Map();
+function getXPath(element) {
+    if (paths.has(element))
+        return paths.get(element);
+    let path;
+    const parent = element.parentNode;
+    if (element.id !== '')
+        path = 'id("' + element.id + '")';
+    else if (element === element.ownerDocument.body)
+        path = element.tagName;
+    else {
+        // Documents and shadow roots start a new path
+        const prefix = parent.nodeType === 1 ? getXPath(parent) : '';
+        let ix = 0;
+        const siblings = parent.childNodes;
+        for (let i = 0; i < siblings.length; i++) {
+            const sibling = siblings[i];
+            if (sibling === element) {
+                path = prefix + '/' + element.tagName + '[' + (ix + 1) + ']';
+                break;
+            }
+            if (sibling.nodeType === 1 && sibling.tagName === element.tagName)
+                ix++;
+        }
+    }
+    paths.set(element, path);
+    return path;
+}
+
+const highlight = arguments[0];
+const pageSize = arguments[1];
+const found = [];
+const rows = [];
+function walk(root, frame, shadow, offsetX, offsetY) {
+    const walker = (root.ownerDocument || root).createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+    for (let element = walker.currentNode; element; element = walker.nextNode()) {
+        if (element.nodeType !== 1)
+            continue;
+        if (element.hasAttribute('id')) {
+            const rect = element.getBoundingClientRect();
+            const box = [rect.left + offsetX, rect.top + offsetY, rect.right + offsetX, rect.bottom + offsetY];
+            found.push([element, box]);
+            rows.push({
+                index: rows.length,
+                id: element.getAttribute('id'),
+                tag: element.tagName.toLowerCase(),
+                xpath: getXPath(element),
+                x: Math.round(box[0]),
+                y: Math.round(box[1]),
+                width: Math.round(rect.width),
+                height: Math.round(rect.height),
+                frame: frame.join(' >> '),
+                shadow_host: shadow.join(' >> ')
+            });
+        }
+        if (element.shadowRoot)
+            walk(element.shadowRoot, frame, shadow.concat(getXPath(element)), offsetX, offsetY);
+        if (element.tagName === 'IFRAME' || element.tagName === 'FRAME') {
+            let inner = null;
+            try {
+                inner = element.contentDocument;  // null or a throw for cross-origin frames
+            } catch (e) {}
+            if (inner && inner.documentElement) {
+                const rect = element.getBoundingClientRect();
+                walk(inner.documentElement, frame.concat(getXPath(element)), [],
+                     offsetX + rect.left + element.clientLeft, offsetY + rect.top + element.clientTop);
+            }
+        }
+    }
+}
+walk(document.documentElement, [], [], window.scrollX, window.scrollY);
+
+if (highlight) {
+    const overlays = document.createDocumentFragment();
+    for (let i = 0; i < found.length; i++) {
+        const [element, box] = found[i];
+        element.setAttribute('style', 'border: 2px solid red;');
+        const overlay = document.createElement('div');
+        overlay.textContent = i;
+        overlay.style.position = 'absolute';
+        overlay.style.backgroundColor = 'rgba(255, 0, 0, 0.7)';
+        overlay.style.color = 'white';
+        overlay.style.padding = '2px 5px';
+        overlay.style.borderRadius = '3px';
+        overlay.style.fontSize = '12px';
+        overlay.style.zIndex = '10000';
+        overlay.style.pointerEvents = 'none';
+        overlay.style.left = (box[0] - window.scrollX < 30 ? box[2] : box[0] - 25) + 'px';
+        overlay.style.top = (box[1] - window.scrollY < 30 ? box[3] : box[1] - 25) + 'px';
+        overlays.appendChild(overlay);
+    }
+    document.body.appendChild(overlays);
+}
+window.__sdetElements = rows.length > pageSize ? rows : undefined;
+return JSON.stringify({total: rows.length, rows: rows.slice(0, pageSize)});
+"""
+
+FETCH_ELEMENTS_JS = """
+const rows = window.__sdetElements || [];
+const end = arguments[0] + arguments[1];
+const page = rows.slice(arguments[0], end);
+if (end >= rows.length)
+    delete window.__sdetElements;
+return JSON.stringify(page);
+"""
+
+# Rows per WebDriver round trip when handing extracted elements to Python
+ELEMENT_PAGE_SIZE = 5000
+
+GET_XPATH_JS = """
+function getXPath(element) {
+   if (element.id !== '')
+       return 'id("' + element.id + '")';
+   if (element === document.body)
+       return element.tagName;
+   var ix = 0;
+   var siblings = element.parentNode.childNodes;
+   for (var i = 0; i < siblings.length; i++) {
+       var sibling = siblings[i];
+       if (sibling === element)
+           return getXPath(element.parentNode) + '/' + element.tagName + '[' + (ix + 1) + ']';
+       if (sibling.nodeType === 1 && sibling.tagName === element.tagName)
+           ix++;
+   }
+}
+return getXPath(arguments[0]);
+"""
+
+ADD_ID_OVERLAYS_JS = """
+function addIdOverlay(element, id) {
+    const rect = element.getBoundingClientRect();
+    const overlay = document.createElement('div');
+    overlay.textContent = id;
+    overlay.style.position = 'absolute';
+    overlay.style.backgroundColor = 'rgba(255, 0, 0, 0.7)';
+    overlay.style.color = 'white';
+    overlay.style.padding = '2px 5px';
+    overlay.style.borderRadius = '3px';
+    overlay.style.fontSize = '12px';
+    overlay.style.zIndex = '10000';
+    overlay.style.pointerEvents = 'none';
+    overlay.style.left = (rect.left - 25) + 'px';
+    overlay.style.top = (rect.top - 25) + 'px';
+
+    if (rect.left < 30) {
+        overlay.style.left = rect.right + 'px';
+    }
+
+    if (rect.top < 30) {
+        overlay.style.top = rect.bottom + 'px';
+    }
+    document.body.appendChild(overlay);
+}
+
+const elements = arguments[0];
+for (let i = 0; i < elements.length; i++) {
+    addIdOverlay(elements[i], i);
+}
+"""
+
+def iter_elements(driver, highlight=True, page_size=ELEMENT_PAGE_SIZE):
+    # One WebDriver round trip for the whole page, plus one per further page of rows
+    with span("inspector.extract") as current:
+        payload = driver.execute_script(EXTRACT_ELEMENTS_JS, highlight, page_size)
+        payload = json.loads(payload) if payload else {"total": 0, "rows": []}
+        current.set(elements=payload["total"])
+    yield from payload["rows"]
+    offset = len(payload["rows"])
+    while offset < payload["total"]:
+        page = json.loads(driver.execute_script(FETCH_ELEMENTS_JS, offset, page_size))
+        if not page:
+            break
+        yield from page
+        offset += len(page)
+
+def extract_elements(driver, highlight=True):
+    return list(iter_elements(driver, highlight))
+
+def extract_elements_per_element(driver, highlight=True):
+    # Previous implementation: several WebDriver calls per element
+    from selenium.webdriver.common.by import By
+
+    elements = driver.find_elements(By.XPATH, "//*[@id]")
+    if highlight:
+        for element in elements:
+            driver.execute_script(
+                "arguments[0].setAttribute('style', arguments[1]);",
+                element,
+                "border: 2px solid red;"
+            )
+        driver.execute_script(ADD_ID_OVERLAYS_JS, elements)
+    rows = []
+    for i, element in enumerate(elements):
+        rows.append({
+            "index": i,
+            "id": element.get_attribute("id"),
+            "xpath": driver.execute_script(GET_XPATH_JS, element),
+        })
+    return rows
+
+def compare_extraction_timings(driver, url, highlight=True):
+    # Loads the page fresh for each path so neither run sees the other's overlays
+    timings = {}
+    for name, extract in (("per_element", extract_elements_per_element), ("single_pass", extract_elements)):
+        driver.get(url)
+        start = time.perf_counter()
+        rows = extract(driver, highlight=highlight)
+        timings[name] = {"seconds": time.perf_counter() - start, "elements": len(rows)}
+    single_pass = timings["single_pass"]["seconds"]
+    timings["speedup"] = timings["per_element"]["seconds"] / single_pass if single_pass else None
+    return timings
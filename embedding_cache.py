@@ -0,0 +1,142 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+from llm_governor import get_llm_governor
+from prompt_builder import count_tokens
+
+EMBEDDING_CACHE_DIR = os.getenv("SDET_EMBEDDING_CACHE", os.path.join(os.path.expanduser("~"), ".sdet_genie", "embeddings"))
+
+def embedding_key(model, kind, text):
+    # Queries and documents are embedded with different task types, so they never share a key
+    return hashlib.sha256(f"{model}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingStore:
+    # Vectors are appended as raw float32 rows to one file per dimension and
+    # located through a sqlite key index, so the store stays compact, is read
+    # with a memory map and can be shared by several sessions and processes.
+    def __init__(self, directory=EMBEDDING_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, dim INTEGER, row INTEGER)")
+
+    def _vectors_path(self, dim):
+        return os.path.join(self.directory, f"vectors-{dim}.f32")
+
+    def get_many(self, keys):
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(
+                    (key, (dim, row)) for key, dim, row in
+                    self._conn.execute(f"SELECT key, dim, row FROM vectors WHERE key IN ({placeholders})", chunk)
+                )
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        vectors = {}
+        by_dim = {}
+        for key, (dim, row) in found.items():
+            by_dim.setdefault(dim, []).append((key, row))
+        for dim, entries in by_dim.items():
+            matrix = np.memmap(self._vectors_path(dim), dtype=np.float32, mode="r").reshape(-1, dim)
+            rows = matrix[[row for _, row in entries]]
+            for (key, _), vector in zip(entries, rows):
+                vectors[key] = vector.tolist()
+        return vectors
+
+    def put_many(self, items):
+        # items: (key, vector) pairs of equal dimension per file
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                by_dim = {}
+                for key, vector in items:
+                    by_dim.setdefault(len(vector), []).append((key, vector))
+                for dim, entries in by_dim.items():
+                    path = self._vectors_path(dim)
+                    # The sqlite write lock serializes appends across processes too
+                    row = os.path.getsize(path) // (4 * dim) if os.path.exists(path) else 0
+                    with open(path, "ab") as f:
+                        f.truncate(row * 4 * dim)  # drop a torn row left by a crashed writer
+                        np.asarray([v for _, v in entries], dtype=np.float32).tofile(f)
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO vectors (key, dim, row) VALUES (?, ?, ?)",
+                        [(key, dim, row + i) for i, (key, _) in enumerate(entries)],
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+        size = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.name.endswith(".f32"))
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_embedding_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = EmbeddingStore()
+        return _store
+
+class CachedEmbedding(BaseEmbedding):
+    # Wraps an embedding model; only chunks whose content was never embedded by
+    # this model go to the API, in one batched call per request.
+    _inner: BaseEmbedding = PrivateAttr()
+    _store: EmbeddingStore = PrivateAttr()
+
+    def __init__(self, inner, store=None, **kwargs):
+        kwargs.setdefault("embed_batch_size", 2048)
+        super().__init__(model_name=inner.model_name, **kwargs)
+        self._inner = inner
+        self._store = store or get_embedding_store()
+
+    @classmethod
+    def class_name(cls):
+        return "CachedEmbedding"
+
+    def _embed(self, kind, texts, embed_misses):
+        keys = [embedding_key(self.model_name, kind, text) for text in texts]
+        vectors = self._store.get_many(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            print(f"Embedding cache: embedding {len(missing)} of {len(texts)} {kind} chunk(s)")
+            texts = list(missing.values())
+            fresh = get_llm_governor().call(self.model_name, sum(count_tokens(text) for text in texts),
+                                            lambda: embed_misses(texts))
+            self._store.put_many(list(zip(missing, fresh)))
+            vectors.update(zip(missing, fresh))
+        return [vectors[key] for key in keys]
+
+    def _get_query_embedding(self, query):
+        return self._embed("query", [query], lambda texts: [self._inner.get_query_embedding(texts[0])])[0]
+
+    async def _aget_query_embedding(self, query):
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text):
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts):
+        return self._embed("text", texts, self._inner.get_text_embedding_batch)
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+
+from runtime import EMBEDDING_MODEL, get_embedding
+from tracing import span
+
+# Curated pairs: <name>.feature plus the code for it in each language (<name>.py, <name>.java)
+EXAMPLES_DIR = os.getenv("SDET_EXAMPLES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples"))
+INDEX_DIR = os.getenv("SDET_EXAMPLES_INDEX", os.path.join(os.path.expanduser("~"), ".sdet_genie", "examples_index"))
+EXAMPLES_TOP_K = int(os.getenv("SDET_EXAMPLES_TOP_K", "2"))
+FALLBACK_EXAMPLE = "job_application"
+
+LANGUAGE_EXTENSIONS = {"python": ".py", "java": ".java"}
+
+def load_examples(directory=EXAMPLES_DIR):
+    examples = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext != ".feature":
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            example = {"name": stem, "feature": f.read().strip(), "code": {}}
+        for language, code_ext in LANGUAGE_EXTENSIONS.items():
+            path = os.path.join(directory, stem + code_ext)
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    example["code"][language] = f.read().strip()
+        if example["code"]:
+            examples.append(example)
+    return examples
+
+def format_example(example, language):
+    return f"Feature:\n{example['feature']}\nCode:\n{example['code'][language]}"
+
+class ExampleLibrary:
+    # Feature texts are embedded once; the matrix is persisted as float32 .npy next
+    # to a metadata file and rebuilt only when the examples or the model change.
+    def __init__(self, directory=EXAMPLES_DIR, index_dir=INDEX_DIR, model_name=EMBEDDING_MODEL):
+        self.examples = load_examples(directory)
+        self.index_dir = index_dir
+        self.model_name = model_name
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        digest = hashlib.sha256(self.model_name.encode("utf-8"))
+        for example in self.examples:
+            digest.update(json.dumps(example, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def matrix(self):
+        import numpy as np
+
+        with self._lock:
+            if self._matrix is not None:
+                return self._matrix
+            vectors_path = os.path.join(self.index_dir, "vectors.npy")
+            meta_path = os.path.join(self.index_dir, "index.json")
+            fingerprint = self.fingerprint()
+            try:
+                with open(meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("fingerprint") == fingerprint:
+                    self._matrix = np.load(vectors_path)
+                    return self._matrix
+            except (OSError, ValueError):
+                pass
+            print(f"Example library: embedding {len(self.examples)} example(s)")
+            vectors = get_embedding(self.model_name).get_text_embedding_batch([e["feature"] for e in self.examples])
+            matrix = np.asarray(vectors, dtype=np.float32)
+            # Normalized rows turn cosine similarity into a single matrix-vector product
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            os.makedirs(self.index_dir, exist_ok=True)
+            np.save(vectors_path, matrix)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "model": self.model_name,
+                           "names": [e["name"] for e in self.examples]}, f)
+            self._matrix = matrix
+            return matrix
+
+    def search(self, query, language, k=EXAMPLES_TOP_K):
+        import numpy as np
+
+        candidates = np.array([language in e["code"] for e in self.examples], dtype=bool)
+        if not candidates.any() or k <= 0:
+            return []
+        query_vector = np.asarray(get_embedding(self.model_name).get_query_embedding(query), dtype=np.float32)
+        scores = self.matrix() @ (query_vector / max(np.linalg.norm(query_vector), 1e-12))
+        scores[~candidates] = -np.inf
+        k = min(k, int(candidates.sum()))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.examples[i], float(scores[i])) for i in top]
+
+_library = None
+_library_lock = threading.Lock()
+
+def get_example_library():
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = ExampleLibrary()
+        return _library
+
+def select_examples(language, test_case, k=EXAMPLES_TOP_K):
+    # Most similar curated examples for the prompt; the job application pair is
+    # used when the library cannot be searched (no embeddings, no API key)
+    library = get_example_library()
+    try:
+        with span("examples.select", language=language):
+            matches = library.search(test_case, language, k)
+        print(f"Examples for {language}: " + ", ".join(f"{e['name']} ({score:.2f})" for e, score in matches))
+        return [format_example(e, language) for e, _ in matches]
+    except Exception as e:
+        print(f"Example search failed ({type(e).__name__}: {e}); using the default example")
+        return [format_example(example, language) for example in library.examples
+                if example["name"] == FALLBACK_EXAMPLE and language in example["code"]]
@@ -0,0 +1,14 @@
+Feature: Job application form
+  As a job seeker
+  I want to submit my application
+  So that the company can review it
+
+  Scenario: Cover letter is mandatory
+    Given I am on the job application page
+    When I enter "John" as first name
+    And I enter "Doe" as last name
+    And I enter "john.doe@example.com" as email address
+    And I enter "(123) 456-7890" as phone number
+    And I leave the cover letter empty
+    And I click the Apply button
+    Then I should see an error message for the cover letter field
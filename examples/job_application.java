@@ -0,0 +1,87 @@
+import org.openqa.selenium.By;
+import org.openqa.selenium.JavascriptExecutor;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.WebElement;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.openqa.selenium.support.ui.ExpectedConditions;
+import org.openqa.selenium.support.ui.WebDriverWait;
+import org.testng.Assert;
+import org.testng.annotations.AfterMethod;
+import org.testng.annotations.BeforeMethod;
+import org.testng.annotations.Test;
+
+public class JobApplicationTest {
+    private WebDriver driver;
+    private String baseUrl;
+
+    @BeforeMethod
+    public void setup() {
+        System.setProperty("webdriver.chrome.driver", "/path/to/chromedriver");
+        driver = new ChromeDriver();
+        driver.manage().timeouts().implicitlyWait(10, java.util.concurrent.TimeUnit.SECONDS);
+        baseUrl = "{url}"; // Replace with the actual base URL
+        driver.get(baseUrl);
+    }
+
+    @AfterMethod
+    public void teardown() {
+        driver.quit();
+    }
+
+    @Test
+    public void jobApplicationScenario() {
+        givenIAmOnTheJobApplicationPage();
+        whenIEnterFirstName("John");
+        whenIEnterLastName("Doe");
+        whenIEnterEmailAddress("john.doe@example.com");
+        whenIEnterPhoneNumber("(123) 456-7890");
+        whenILeaveCoverLetterEmpty();
+        whenIClickApplyButton();
+        thenIShouldSeeErrorMessageForCoverLetter();
+    }
+
+    private void givenIAmOnTheJobApplicationPage() {
+        // This step is handled by the setup method
+    }
+
+    private void whenIEnterFirstName(String firstName) {
+        WebElement firstNameField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[2]/div/div/span[1]/input"));
+        firstNameField.sendKeys(firstName);
+    }
+
+    private void whenIEnterLastName(String lastName) {
+        WebElement lastNameField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[2]/div/div/span[2]/input"));
+        lastNameField.sendKeys(lastName);
+    }
+
+    private void whenIEnterEmailAddress(String email) {
+        WebElement emailField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[3]/div/span/input"));
+        emailField.sendKeys(email);
+    }
+
+    private void whenIEnterPhoneNumber(String phoneNumber) {
+        WebElement phoneNumberField = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[4]/div/span/input"));
+        phoneNumberField.sendKeys(phoneNumber);
+    }
+
+    private void whenILeaveCoverLetterEmpty() {
+        // No action needed as the field should remain empty
+    }
+
+    private void whenIClickApplyButton() {
+        WebElement applyButton = new WebDriverWait(driver, 10).until(
+                ExpectedConditions.elementToBeClickable(By.xpath("/html/body/form/div[1]/ul/li[6]/div/div/button"))
+        );
+        ((JavascriptExecutor) driver).executeScript("arguments[0].scrollIntoView(true);", applyButton);
+        applyButton.click();
+    }
+
+    private void thenIShouldSeeErrorMessageForCoverLetter() {
+        try {
+            WebElement errorMessage = driver.findElement(By.xpath("/html/body/form/div[1]/ul/li[5]/div/div/span"));
+            Assert.assertTrue(errorMessage.isDisplayed(), "Error message for Cover Letter field is not displayed");
+        } catch (Exception e) {
+            Assert.fail("Error message not displayed: " + e.getMessage());
+        }
+    }
+}
@@ -0,0 +1,78 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+# Constants
+BASE_URL = '{url}'
+
+class JobApplicationTest:
+    def __init__(self):
+        self.driver = webdriver.Chrome()
+        self.driver.implicitly_wait(10)
+
+    def setup(self):
+        self.driver.get(BASE_URL)
+
+    def teardown(self):
+        self.driver.quit()
+
+    def given_i_am_on_the_job_application_page(self):
+        # This step is handled by the setup method
+        pass
+
+    def when_i_enter_first_name(self, first_name):
+        first_name_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[2]/div/div/span[1]/input")
+        first_name_field.send_keys(first_name)
+
+    def when_i_enter_last_name(self, last_name):
+        last_name_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[2]/div/div/span[2]/input")
+        last_name_field.send_keys(last_name)
+
+    def when_i_enter_email_address(self, email):
+        email_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[3]/div/span/input")
+        email_field.send_keys(email)
+
+    def when_i_enter_phone_number(self, phone_number):
+        phone_number_field = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[4]/div/span/input")
+        phone_number_field.send_keys(phone_number)
+
+    def when_i_leave_cover_letter_empty(self):
+        # No action needed as the field should remain empty
+        pass
+
+    def when_i_click_apply_button(self):
+        apply_button = WebDriverWait(self.driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "/html/body/form/div[1]/ul/li[6]/div/div/button"))
+        )
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", apply_button)
+        apply_button.click()
+
+    def then_i_should_see_error_message_for_cover_letter(self):
+        try:
+            error_message = self.driver.find_element(By.XPATH, "/html/body/form/div[1]/ul/li[5]/div/div/span")
+            assert error_message.is_displayed(), "Error message for Cover Letter field is not displayed"
+        except Exception as e:
+            raise AssertionError(f"Error message not displayed: {e}")
+
+    def run_test(self):
+        try:
+            self.setup()
+            self.given_i_am_on_the_job_application_page()
+            self.when_i_enter_first_name("John")
+            self.when_i_enter_last_name("Doe")
+            self.when_i_enter_email_address("john.doe@example.com")
+            self.when_i_enter_phone_number("(123) 456-7890")
+            self.when_i_leave_cover_letter_empty()
+            self.when_i_click_apply_button()
+            self.then_i_should_see_error_message_for_cover_letter()
+            print("Test passed: Job application scenario completed successfully.")
+        except AssertionError as e:
+            print(f"Test failed: {str(e)}")
+        except Exception as e:
+            print(f"Test failed: An unexpected error occurred: {str(e)}")
+        finally:
+            self.teardown()
+
+if __name__ == "__main__":
+    test = JobApplicationTest()
+    test.run_test()
@@ -0,0 +1,80 @@
+import org.openqa.selenium.By;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.WebElement;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.openqa.selenium.support.ui.ExpectedConditions;
+import org.openqa.selenium.support.ui.WebDriverWait;
+import org.testng.Assert;
+import org.testng.annotations.AfterMethod;
+import org.testng.annotations.BeforeMethod;
+import org.testng.annotations.Test;
+
+import java.time.Duration;
+
+public class LoginTest {
+    private WebDriver driver;
+    private String baseUrl;
+
+    @BeforeMethod
+    public void setup() {
+        driver = new ChromeDriver();
+        driver.manage().timeouts().implicitlyWait(Duration.ofSeconds(10));
+        baseUrl = "{url}"; // Replace with the actual base URL
+        driver.get(baseUrl);
+    }
+
+    @AfterMethod
+    public void teardown() {
+        driver.quit();
+    }
+
+    @Test
+    public void successfulLogin() {
+        givenIAmOnTheLoginPage();
+        whenIEnterUsername("standard_user");
+        whenIEnterPassword("secret_sauce");
+        whenIClickLoginButton();
+        thenIShouldBeRedirectedToInventoryPage();
+    }
+
+    @Test
+    public void loginWithWrongPassword() {
+        givenIAmOnTheLoginPage();
+        whenIEnterUsername("standard_user");
+        whenIEnterPassword("wrong_password");
+        whenIClickLoginButton();
+        thenIShouldSeeError("Username and password do not match");
+    }
+
+    private void givenIAmOnTheLoginPage() {
+        // This step is handled by the setup method
+    }
+
+    private void whenIEnterUsername(String username) {
+        WebElement usernameField = driver.findElement(By.id("user-name"));
+        usernameField.clear();
+        usernameField.sendKeys(username);
+    }
+
+    private void whenIEnterPassword(String password) {
+        WebElement passwordField = driver.findElement(By.id("password"));
+        passwordField.clear();
+        passwordField.sendKeys(password);
+    }
+
+    private void whenIClickLoginButton() {
+        driver.findElement(By.id("login-button")).click();
+    }
+
+    private void thenIShouldBeRedirectedToInventoryPage() {
+        new WebDriverWait(driver, Duration.ofSeconds(10)).until(ExpectedConditions.urlContains("inventory"));
+        Assert.assertTrue(driver.getCurrentUrl().contains("inventory"), "Inventory page was not opened");
+    }
+
+    private void thenIShouldSeeError(String message) {
+        WebElement error = new WebDriverWait(driver, Duration.ofSeconds(10)).until(
+                ExpectedConditions.visibilityOfElementLocated(By.cssSelector("[data-test='error']"))
+        );
+        Assert.assertTrue(error.getText().contains(message), "Unexpected error message: " + error.getText());
+    }
+}
@@ -0,0 +1,20 @@
+Feature: Product search
+  As a shopper
+  I want to search the catalogue
+  So that I can find the products I need
+
+  Scenario Outline: Search returns matching products
+    Given I am on the home page
+    When I search for "<term>"
+    Then I should see a results list
+    And every result title should contain "<term>"
+
+    Examples:
+      | term    |
+      | laptop  |
+      | monitor |
+
+  Scenario: Search without matches
+    Given I am on the home page
+    When I search for "zzzz-no-such-product"
+    Then I should see the message "No results found"
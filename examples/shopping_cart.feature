@@ -0,0 +1,18 @@
+Feature: Shopping cart
+  As a shopper
+  I want to manage the items in my cart
+  So that I only buy what I need
+
+  Background:
+    Given I am on the product listing page
+
+  Scenario: Add a product to the cart
+    When I click "Add to cart" for "Backpack"
+    Then the cart badge should show "1"
+    And the cart should contain "Backpack"
+
+  Scenario: Remove a product from the cart
+    Given I added "Backpack" to the cart
+    When I open the cart
+    And I click "Remove" for "Backpack"
+    Then the cart should be empty
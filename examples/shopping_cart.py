@@ -0,0 +1,76 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+# Constants
+BASE_URL = '{url}'
+
+class ShoppingCartTest:
+    def __init__(self):
+        self.driver = webdriver.Chrome()
+        self.driver.implicitly_wait(10)
+
+    def setup(self):
+        self.driver.get(BASE_URL)
+
+    def teardown(self):
+        self.driver.quit()
+
+    def given_i_am_on_the_product_listing_page(self):
+        # This step is handled by the setup method
+        pass
+
+    def when_i_click_add_to_cart_for(self, product):
+        item = self.driver.find_element(By.XPATH, f"//div[@class='inventory_item'][.//div[text()='{product}']]")
+        item.find_element(By.XPATH, ".//button[text()='Add to cart']").click()
+
+    def given_i_added_to_the_cart(self, product):
+        self.when_i_click_add_to_cart_for(product)
+
+    def when_i_open_the_cart(self):
+        self.driver.find_element(By.CLASS_NAME, "shopping_cart_link").click()
+
+    def when_i_click_remove_for(self, product):
+        item = self.driver.find_element(By.XPATH, f"//div[@class='cart_item'][.//div[text()='{product}']]")
+        item.find_element(By.XPATH, ".//button[text()='Remove']").click()
+
+    def then_the_cart_badge_should_show(self, count):
+        badge = self.driver.find_element(By.CLASS_NAME, "shopping_cart_badge")
+        assert badge.text == count, f"Cart badge shows '{badge.text}', expected '{count}'"
+
+    def then_the_cart_should_contain(self, product):
+        self.when_i_open_the_cart()
+        names = [e.text for e in self.driver.find_elements(By.CLASS_NAME, "inventory_item_name")]
+        assert product in names, f"'{product}' not found in cart: {names}"
+
+    def then_the_cart_should_be_empty(self):
+        WebDriverWait(self.driver, 10).until(
+            EC.invisibility_of_element_located((By.CLASS_NAME, "cart_item"))
+        )
+        assert not self.driver.find_elements(By.CLASS_NAME, "shopping_cart_badge"), "Cart badge is still shown"
+
+    def test_add_product_to_cart(self):
+        self.setup()
+        try:
+            self.given_i_am_on_the_product_listing_page()
+            self.when_i_click_add_to_cart_for("Backpack")
+            self.then_the_cart_badge_should_show("1")
+            self.then_the_cart_should_contain("Backpack")
+        finally:
+            self.teardown()
+
+    def test_remove_product_from_cart(self):
+        self.setup()
+        try:
+            self.given_i_am_on_the_product_listing_page()
+            self.given_i_added_to_the_cart("Backpack")
+            self.when_i_open_the_cart()
+            self.when_i_click_remove_for("Backpack")
+            self.then_the_cart_should_be_empty()
+        finally:
+            self.teardown()
+
+if __name__ == "__main__":
+    test = ShoppingCartTest()
+    test.test_add_product_to_cart()
+    test.test_remove_product_from_cart()
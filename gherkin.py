@@ -0,0 +1,66 @@
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+SCENARIO_KEYWORDS = ("Scenario Outline:", "Scenario Template:", "Scenario:", "Example:")
+STEP_KEYWORDS = ("Given ", "When ", "Then ", "And ", "But ", "* ")
+
+@dataclass
+class Scenario:
+    name: str
+    lines: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    preamble: List[str] = field(default_factory=list)
+
+    @property
+    def steps(self):
+        return [line.strip() for line in self.lines if line.strip().startswith(STEP_KEYWORDS)]
+
+    @property
+    def text(self):
+        # Standalone feature text for this scenario: feature header, background, tags and body
+        return "\n".join(self.preamble + self.tags + self.lines).strip()
+
+def feature_steps(text):
+    # Every step in the order it runs, background steps first, whitespace normalized
+    return [" ".join(line.split()) for line in text.splitlines() if line.strip().startswith(STEP_KEYWORDS)]
+
+def strip_code_fence(text):
+    # Generated features often arrive wrapped in ```gherkin fences
+    match = re.search(r"```(?:gherkin|feature)?\s*\n(.*?)```", text, re.DOTALL)
+    return match.group(1) if match else text
+
+def parse_scenarios(feature_text):
+    preamble, tags, scenarios = [], [], []
+    current = None
+    for line in strip_code_fence(feature_text).splitlines():
+        stripped = line.strip()
+        if stripped.startswith("@"):
+            tags.append(line)
+        elif stripped.startswith(SCENARIO_KEYWORDS):
+            name = stripped.split(":", 1)[1].strip()
+            current = Scenario(name=name, lines=[line], tags=tags, preamble=list(preamble))
+            scenarios.append(current)
+            tags = []
+        elif current is None or stripped.startswith(("Background:", "Rule:")):
+            # Feature header, backgrounds and rules are shared by the scenarios that follow
+            current = None
+            preamble.extend(tags + [line])
+            tags = []
+        else:
+            current.lines.append(line)
+    return scenarios
+
+def feature_key(feature_text):
+    # Identifies a feature across edits of its steps by its title and scenario names;
+    # text without a Feature: line (plain test steps) only matches itself
+    lines = [line.strip() for line in strip_code_fence(feature_text).splitlines()]
+    title = next((line for line in lines if line.startswith("Feature:")), None)
+    identity = [title] + [s.name for s in parse_scenarios(feature_text)] if title else lines
+    return hashlib.sha256("\n".join(identity).encode("utf-8")).hexdigest()[:32]
+
+def split_feature(feature_text):
+    # Features without any Scenario keyword (plain test steps) run as a single unit
+    scenarios = parse_scenarios(feature_text)
+    return scenarios or [Scenario(name="test case", lines=feature_text.strip().splitlines())]
@@ -0,0 +1,118 @@
+from llama_index.core.llms import LLM, CustomLLM
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.multi_modal_llms import MultiModalLLM
+
+from llm_governor import IMAGE_TOKENS, get_llm_governor
+from prompt_builder import count_tokens
+
+# Wrappers that send the clients handed to lavague's Context through the LLM
+# governor, so the world model's and action engine's calls share the rate
+# limits, backoff and lanes of the direct calls in llm_cache.
+
+def _model(llm):
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+
+def _messages_tokens(messages):
+    return count_tokens("\n".join(str(m.content) for m in messages))
+
+def _governed_stream(model, tokens, open_stream):
+    # The call counts as in flight until the stream ends; only opening it is retried
+    governor = get_llm_governor()
+    upstream = governor.start(model, tokens, open_stream)
+    parts = []
+    try:
+        for response in upstream:
+            parts.append(response.delta or "")
+            yield response
+    finally:
+        close = getattr(upstream, "close", None)
+        if close:
+            close()
+        governor.release(model, count_tokens("".join(parts)))
+
+class GovernedLLM(CustomLLM):
+    model: str = "governed"
+    _inner: LLM = PrivateAttr()
+
+    def __init__(self, inner, **kwargs):
+        super().__init__(model=_model(inner), **kwargs)
+        self._inner = inner
+
+    @classmethod
+    def class_name(cls):
+        return "GovernedLLM"
+
+    @property
+    def metadata(self):
+        return self._inner.metadata
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        return get_llm_governor().call(self.model, count_tokens(prompt),
+                                       lambda: self._inner.complete(prompt, formatted=formatted, **kwargs),
+                                       lambda response: count_tokens(response.text))
+
+    def stream_complete(self, prompt, formatted=False, **kwargs):
+        return _governed_stream(self.model, count_tokens(prompt),
+                                lambda: self._inner.stream_complete(prompt, formatted=formatted, **kwargs))
+
+    def chat(self, messages, **kwargs):
+        return get_llm_governor().call(self.model, _messages_tokens(messages),
+                                       lambda: self._inner.chat(messages, **kwargs),
+                                       lambda response: count_tokens(str(response.message.content)))
+
+    def stream_chat(self, messages, **kwargs):
+        return _governed_stream(self.model, _messages_tokens(messages),
+                                lambda: self._inner.stream_chat(messages, **kwargs))
+
+class GovernedMultiModal(MultiModalLLM):
+    model: str = "governed"
+    _inner: MultiModalLLM = PrivateAttr()
+
+    def __init__(self, inner, **kwargs):
+        super().__init__(model=_model(inner), **kwargs)
+        self._inner = inner
+
+    @classmethod
+    def class_name(cls):
+        return "GovernedMultiModal"
+
+    @property
+    def metadata(self):
+        return self._inner.metadata
+
+    def complete(self, prompt, image_documents=(), **kwargs):
+        return get_llm_governor().call(self.model, count_tokens(prompt) + IMAGE_TOKENS * len(image_documents),
+                                       lambda: self._inner.complete(prompt, image_documents, **kwargs),
+                                       lambda response: count_tokens(response.text))
+
+    def stream_complete(self, prompt, image_documents=(), **kwargs):
+        return _governed_stream(self.model, count_tokens(prompt) + IMAGE_TOKENS * len(image_documents),
+                                lambda: self._inner.stream_complete(prompt, image_documents, **kwargs))
+
+    def chat(self, messages, **kwargs):
+        return get_llm_governor().call(self.model, _messages_tokens(messages),
+                                       lambda: self._inner.chat(messages, **kwargs),
+                                       lambda response: count_tokens(str(response.message.content)))
+
+    def stream_chat(self, messages, **kwargs):
+        return _governed_stream(self.model, _messages_tokens(messages),
+                                lambda: self._inner.stream_chat(messages, **kwargs))
+
+    # lavague calls the sync methods; the async ones run them in turn
+    async def acomplete(self, prompt, image_documents=(), **kwargs):
+        return self.complete(prompt, image_documents, **kwargs)
+
+    async def astream_complete(self, prompt, image_documents=(), **kwargs):
+        async def gen():
+            for response in self.stream_complete(prompt, image_documents, **kwargs):
+                yield response
+        return gen()
+
+    async def achat(self, messages, **kwargs):
+        return self.chat(messages, **kwargs)
+
+    async def astream_chat(self, messages, **kwargs):
+        async def gen():
+            for response in self.stream_chat(messages, **kwargs):
+                yield response
+        return gen()
@@ -0,0 +1,100 @@
+import base64
+import hashlib
+import io
+import os
+
+# Screenshots are passed through untouched unless downscaling, a different
+# output format or a crop is configured.
+IMAGE_MAX_SIDE = int(os.getenv("SDET_IMAGE_MAX_SIDE", "0")) or None
+IMAGE_FORMAT = os.getenv("SDET_IMAGE_FORMAT", "").upper() or None
+IMAGE_QUALITY = int(os.getenv("SDET_IMAGE_QUALITY", "80"))
+
+# Gemini 1.5 bills an inline image at a flat token count regardless of size
+GEMINI_IMAGE_TOKENS = 258
+CHARS_PER_TOKEN = 4
+
+MIMETYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+def sniff_mimetype(data):
+    if data.startswith(b"\x89PNG"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+class PreparedImage:
+    def __init__(self, data, mimetype, original_bytes):
+        self.data = data
+        self.mimetype = mimetype
+        self.original_bytes = original_bytes
+
+    @property
+    def digest(self):
+        return hashlib.sha256(self.data).hexdigest()
+
+    def to_image_document(self):
+        from llama_index.core.schema import ImageDocument
+
+        return ImageDocument(image=base64.b64encode(self.data).decode("utf-8"), image_mimetype=self.mimetype)
+
+    def savings(self):
+        # Compares against the old approach of pasting a base64 PNG into the prompt text
+        inline_tokens = -(-self.original_bytes * 4 // 3) // CHARS_PER_TOKEN
+        return {
+            "original_bytes": self.original_bytes,
+            "prepared_bytes": len(self.data),
+            "inline_base64_tokens": inline_tokens,
+            "image_part_tokens": GEMINI_IMAGE_TOKENS,
+            "tokens_saved": inline_tokens - GEMINI_IMAGE_TOKENS,
+        }
+
+def prepare_image(source, max_side=IMAGE_MAX_SIDE, fmt=IMAGE_FORMAT, quality=IMAGE_QUALITY, crop=None):
+    # source is a file path or raw bytes; crop is a (left, top, right, bottom) box in pixels
+    if isinstance(source, (bytes, bytearray)):
+        data = bytes(source)
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    if not (max_side or fmt or crop):
+        return PreparedImage(data, sniff_mimetype(data), len(data))
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        out_format = fmt or img.format or "PNG"
+        if crop:
+            img = img.crop(crop)
+        if max_side and max(img.size) > max_side:
+            img = img.copy()
+            img.thumbnail((max_side, max_side))
+        if out_format == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        buffered = io.BytesIO()
+        options = {"quality": quality} if out_format in ("JPEG", "WEBP") else {}
+        img.save(buffered, format=out_format, **options)
+    return PreparedImage(buffered.getvalue(), MIMETYPES.get(out_format, sniff_mimetype(buffered.getvalue())), len(data))
+
+def visual_signature(data, size=(32, 18)):
+    # Tiny grayscale rendition used to tell whether the page visibly changed
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        return img.convert("L").resize(size).tobytes()
+
+def visibly_changed(previous, current, threshold=4.0):
+    # Mean absolute difference of two signatures, on a 0-255 scale
+    if previous is None:
+        return True
+    return sum(abs(a - b) for a, b in zip(previous, current)) / len(current) > threshold
+
+def make_thumbnail(data, width=480, quality=70):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail((width, width * img.height // max(img.width, 1)))
+        buffered = io.BytesIO()
+        img.save(buffered, format="JPEG", quality=quality)
+    return buffered.getvalue()
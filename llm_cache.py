@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from llm_governor import IMAGE_TOKENS, get_llm_governor
+from prompt_builder import count_tokens
+from tracing import span, start_span
+
+CACHE_PATH = os.getenv("SDET_LLM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".sdet_genie", "llm_cache.sqlite3"))
+CACHE_TTL = float(os.getenv("SDET_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.getenv("SDET_LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+def normalize_text(text):
+    # Rerun noise (line endings, trailing spaces, unicode forms) must not change the key
+    text = unicodedata.normalize("NFC", str(text)).replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+class ChatTurn:
+    # Minimal stand-in for a ChatMessage when keying a plain completion prompt
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+
+def model_name(llm):
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+
+def cache_key(model, messages, extra=None):
+    if isinstance(messages, str):
+        messages = [ChatTurn("user", messages)]
+    payload = {
+        "model": model,
+        "messages": [[str(getattr(m.role, "value", m.role)), normalize_text(m.content)] for m in messages],
+        "extra": extra,
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+class LLMCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, response TEXT, size INTEGER,"
+                " created REAL, accessed REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, model, response):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        # Expired entries go first, then least recently used until under the size cap
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+def _messages_text(messages):
+    return "\n".join(str(m.content) for m in messages)
+
+def _record_usage(current, prompt_tokens, content, images=0):
+    current.add("llm_calls")
+    current.add("prompt_tokens", prompt_tokens)
+    current.add("response_tokens", count_tokens(content))
+    if images:
+        current.set(images=images)
+
+def cached_chat(llm, messages, force_regenerate=False):
+    # Returns the response text, calling the model only on a cache miss
+    cache = get_llm_cache()
+    model = model_name(llm)
+    key = cache_key(model, messages)
+    with span("llm.chat", model=model) as current:
+        if not force_regenerate:
+            content = cache.get(key)
+            current.set(cache_hit=content is not None)
+            if content is not None:
+                return content
+        prompt_tokens = count_tokens(_messages_text(messages))
+        content = get_llm_governor().call(model, prompt_tokens, lambda: llm.chat(messages).message.content,
+                                          count_tokens)
+        _record_usage(current, prompt_tokens, content)
+    cache.put(key, model, content)
+    return content
+
+def cached_complete(llm, prompt, images=(), force_regenerate=False):
+    # Multimodal completion; images are PreparedImage parts and key on their digest
+    cache = get_llm_cache()
+    model = model_name(llm)
+    key = cache_key(model, prompt, extra=[image.digest for image in images])
+    with span("llm.complete", model=model) as current:
+        if not force_regenerate:
+            content = cache.get(key)
+            current.set(cache_hit=content is not None)
+            if content is not None:
+                return content
+        prompt_tokens = count_tokens(prompt)
+        image_documents = [image.to_image_document() for image in images]
+        content = get_llm_governor().call(model, prompt_tokens + IMAGE_TOKENS * len(images),
+                                          lambda: llm.complete(prompt, image_documents=image_documents).text,
+                                          count_tokens)
+        _record_usage(current, prompt_tokens, content, len(images))
+    cache.put(key, model, content)
+    return content
+
+def _stream_cached(key, model, open_stream, force_regenerate, prompt_text, images=0):
+    # Yields text deltas; the full text is cached only when the stream completes.
+    # Closing this generator (e.g. the user cancels) closes the upstream stream.
+    # The span is not made current: the consumer runs between the yields.
+    cache = get_llm_cache()
+    governor = get_llm_governor()
+    current = start_span("llm.stream", model=model)
+    try:
+        if not force_regenerate:
+            content = cache.get(key)
+            current.set(cache_hit=content is not None)
+            if content is not None:
+                yield content
+                return
+        prompt_tokens = count_tokens(prompt_text)
+        # Only opening the stream is retried; the call counts as in flight until the stream ends
+        upstream = governor.start(model, prompt_tokens + IMAGE_TOKENS * images, open_stream)
+        parts = []
+        try:
+            for chunk in upstream:
+                if chunk.delta:
+                    parts.append(chunk.delta)
+                    yield chunk.delta
+        finally:
+            close = getattr(upstream, "close", None)
+            if close:
+                close()
+            content = "".join(parts)
+            governor.release(model, count_tokens(content))
+            _record_usage(current, prompt_tokens, content, images)
+        cache.put(key, model, "".join(parts))
+    except GeneratorExit:
+        current.set(cancelled=True)
+        raise
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        current.end()
+
+def stream_chat(llm, messages, force_regenerate=False):
+    model = model_name(llm)
+    return _stream_cached(cache_key(model, messages), model, lambda: llm.stream_chat(messages), force_regenerate,
+                          _messages_text(messages))
+
+def stream_complete(llm, prompt, images=(), force_regenerate=False):
+    model = model_name(llm)
+    key = cache_key(model, prompt, extra=[image.digest for image in images])
+    image_documents = [image.to_image_document() for image in images]
+    return _stream_cached(key, model, lambda: llm.stream_complete(prompt, image_documents=image_documents),
+                          force_regenerate, prompt, len(images))
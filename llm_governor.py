@@ -0,0 +1,247 @@
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+
+from tracing import add, current_span
+
+# Every Gemini call in the process goes through one governor: per model, a
+# request bucket (requests/min), a token bucket (tokens/min) and a cap on calls
+# in flight. Callers queue per model in lane order, so interactive UI calls go
+# ahead of batch work, and a 429 puts the whole model on a jittered exponential
+# cool-down instead of letting every caller retry at once.
+LANES = ("interactive", "batch")
+DEFAULT_LANE = os.getenv("SDET_LLM_LANE", "interactive")
+RETRIES = int(os.getenv("SDET_LLM_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("SDET_LLM_BACKOFF_BASE", "1"))
+BACKOFF_MAX = float(os.getenv("SDET_LLM_BACKOFF_MAX", "60"))
+# Gemini bills each image as a fixed number of input tokens
+IMAGE_TOKENS = 258
+
+# (requests/min, tokens/min, calls in flight); None is unlimited. Pay-as-you-go
+# quotas; SDET_LLM_LIMITS overrides them, e.g. for the free tier:
+# "models/gemini-1.5-pro-latest=2/32000/1,models/gemini-1.5-flash-latest=15/1000000"
+MODEL_LIMITS = {
+    "models/gemini-1.5-flash-latest": (2000, 4_000_000, 16),
+    "models/gemini-1.5-pro-latest": (1000, 4_000_000, 8),
+    "models/text-embedding-004": (1500, None, 8),
+}
+UNLIMITED = (None, None, None)
+
+_lane = contextvars.ContextVar("sdet_llm_lane", default=None)
+
+def parse_limits(spec):
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = entry.partition("=")
+        numbers = [int(float(v)) if v not in ("", "-") else None for v in values.split("/")]
+        limits[model.strip()] = tuple((numbers + [None] * 3)[:3])
+    return limits
+
+MODEL_LIMITS.update(parse_limits(os.getenv("SDET_LLM_LIMITS", "")))
+
+@contextlib.contextmanager
+def llm_lane(lane):
+    # LLM calls made inside the block (and in threads started with tracing.propagate) queue in this lane
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane {lane!r}; expected one of {', '.join(LANES)}")
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+def current_lane():
+    return _lane.get() or DEFAULT_LANE
+
+def is_rate_limited(error):
+    # google.api_core raises ResourceExhausted (429) and ServiceUnavailable (503);
+    # wrappers in between may only keep the status in the message
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in (429, 503) or type(error).__name__ in ("ResourceExhausted", "ServiceUnavailable", "TooManyRequests"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "resource has been exhausted" in message
+
+def backoff_delay(attempt):
+    # Full jitter: callers that were throttled together do not come back together
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+class TokenBucket:
+    # Refills continuously to one minute's worth; a call larger than the bucket
+    # waits for a full bucket and leaves it in debt rather than waiting forever
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+class ModelLimiter:
+    def __init__(self, limits):
+        rpm, tpm, concurrency = limits
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = concurrency
+        self.cooldown_until = 0.0
+        self.waiting = []
+        self.in_flight = 0
+        self.metrics = {"calls": 0, "throttled": 0, "retries": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+                        "tokens": 0}
+
+    def delay(self, tokens, now):
+        # Seconds until a call of this size may start, or None while the in-flight cap is reached
+        if self.concurrency and self.in_flight >= self.concurrency:
+            return None
+        waits = [self.cooldown_until - now]
+        if self.requests:
+            waits.append(self.requests.wait_time(1, now))
+        if self.tokens:
+            waits.append(self.tokens.wait_time(tokens, now))
+        return max(waits)
+
+class LLMGovernor:
+    def __init__(self, limits=None):
+        self._limits = MODEL_LIMITS if limits is None else limits
+        self._models = {}
+        self._cond = threading.Condition()
+        self._sequence = itertools.count()
+
+    def _limiter(self, model):
+        limiter = self._models.get(model)
+        if limiter is None:
+            limiter = self._models[model] = ModelLimiter(self._limits.get(model, UNLIMITED))
+        return limiter
+
+    def acquire(self, model, tokens, lane=None, ticket=None):
+        # Blocks until the call may start; returns the seconds spent queued. A retry
+        # passes its first ticket back so it keeps its place in the queue.
+        lane = lane or current_lane()
+        ticket = ticket or (LANES.index(lane), next(self._sequence), lane)
+        started = time.monotonic()
+        with self._cond:
+            limiter = self._limiter(model)
+            heapq.heappush(limiter.waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = limiter.delay(tokens, now) if limiter.waiting[0] == ticket else None
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+            except BaseException:
+                limiter.waiting.remove(ticket)
+                heapq.heapify(limiter.waiting)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(limiter.waiting)
+            if limiter.requests:
+                limiter.requests.take(1, now)
+            if limiter.tokens:
+                limiter.tokens.take(tokens, now)
+            limiter.in_flight += 1
+            waited = now - started
+            limiter.metrics["calls"] += 1
+            limiter.metrics["tokens"] += tokens
+            limiter.metrics["wait_seconds"] += waited
+            limiter.metrics["max_wait_seconds"] = max(limiter.metrics["max_wait_seconds"], waited)
+            # The next caller in line may be able to start too
+            self._cond.notify_all()
+        return waited
+
+    def release(self, model, response_tokens=0):
+        # Output tokens count towards tokens/min too, but are only known afterwards
+        with self._cond:
+            limiter = self._limiter(model)
+            limiter.in_flight -= 1
+            if limiter.tokens and response_tokens:
+                limiter.tokens.take(response_tokens, time.monotonic())
+            limiter.metrics["tokens"] += response_tokens
+            self._cond.notify_all()
+
+    def throttle(self, model, delay):
+        # A 429 means the quota is used up for everyone calling this model
+        with self._cond:
+            limiter = self._limiter(model)
+            limiter.cooldown_until = max(limiter.cooldown_until, time.monotonic() + delay)
+            limiter.metrics["throttled"] += 1
+            self._cond.notify_all()
+
+    def start(self, model, tokens, fn, lane=None):
+        # Runs fn once it may start, retrying rate-limited attempts with backoff. The
+        # call stays in flight when this returns; the caller must release() it.
+        lane = lane or current_lane()
+        ticket = (LANES.index(lane), next(self._sequence), lane)
+        waited = 0.0
+        for attempt in itertools.count():
+            waited += self.acquire(model, tokens, lane, ticket)
+            try:
+                result = fn()
+            except Exception as e:
+                self.release(model)
+                if attempt >= RETRIES or not is_rate_limited(e):
+                    raise
+                delay = backoff_delay(attempt)
+                self.throttle(model, delay)
+                with self._cond:
+                    self._limiter(model).metrics["retries"] += 1
+                add("llm_retries")
+                print(f"LLM governor: {model} rate limited ({type(e).__name__}), retrying in {delay:.1f}s")
+                continue
+            current = current_span()
+            if current is not None:
+                current.set(lane=lane, queued_seconds=round(waited, 3))
+            return result
+
+    def call(self, model, tokens, fn, response_tokens=None, lane=None):
+        # response_tokens(result) gives the output size to charge once the call is done
+        result = self.start(model, tokens, fn, lane)
+        used = 0
+        try:
+            used = response_tokens(result) if response_tokens else 0
+        finally:
+            self.release(model, used)
+        return result
+
+    def stats(self):
+        with self._cond:
+            models = {}
+            for model, limiter in self._models.items():
+                lanes = {lane: 0 for lane in LANES}
+                for _, _, lane in limiter.waiting:
+                    lanes[lane] += 1
+                models[model] = {**limiter.metrics, "queued": len(limiter.waiting), "queued_by_lane": lanes,
+                                 "in_flight": limiter.in_flight,
+                                 "cooldown_seconds": round(max(0.0, limiter.cooldown_until - time.monotonic()), 3)}
+        return {
+            "queued": sum(m["queued"] for m in models.values()),
+            "in_flight": sum(m["in_flight"] for m in models.values()),
+            "throttled": sum(m["throttled"] for m in models.values()),
+            "models": models,
+        }
+
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_llm_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = LLMGovernor()
+        return _governor
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from tracing import span
+
+# Locators seen on earlier runs, keyed by URL pattern and element fingerprint.
+# The Element Inspector and the crawler record every element they extract and
+# completed agent runs record the locators their Selenium code used. Whenever
+# a page matching a pattern is loaded again the known locators are re-checked
+# in one script call, and the hit/miss counts give each one a stability score.
+STORE_PATH = os.getenv("SDET_LOCATOR_STORE", os.path.join(os.path.expanduser("~"), ".sdet_genie", "locators.sqlite3"))
+MIN_STABILITY = float(os.getenv("SDET_LOCATOR_MIN_STABILITY", "0.6"))
+HINT_LIMIT = int(os.getenv("SDET_LOCATOR_HINTS", "40"))
+RECORD_BATCH_ROWS = 1000
+
+# Selenium By constants worth storing, mapped to the strategy names used here
+BY_STRATEGIES = {"ID": "id", "NAME": "name", "XPATH": "xpath", "CSS_SELECTOR": "css"}
+AGENT_LOCATOR_RE = re.compile(r"By\.(ID|NAME|XPATH|CSS_SELECTOR)\s*,\s*(?P<q>['\"])(?P<value>.*?)(?<!\\)(?P=q)")
+# Path segments that vary between pages of the same screen
+VARIABLE_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27}|[0-9a-f]{16,}|[A-Za-z0-9_-]{24,})$", re.IGNORECASE)
+
+# One boolean per locator; frame and shadow-root locators cannot be resolved
+# from the top document and come back null (not checked)
+RESOLVE_LOCATORS_JS = """
+return arguments[0].map(function (l) {
+    if (l[2]) return null;
+    try {
+        if (l[0] === 'id') return document.getElementById(l[1]) !== null;
+        if (l[0] === 'name') return document.getElementsByName(l[1]).length > 0;
+        if (l[0] === 'css') return document.querySelector(l[1]) !== null;
+        return document.evaluate(l[1], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null)
+            .singleNodeValue !== null;
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+def url_pattern(url):
+    # Origin and path with ids, hashes and tokens wildcarded; query and fragment dropped
+    parts = urlsplit(url.strip())
+    segments = ["*" if VARIABLE_SEGMENT_RE.match(s) else s for s in parts.path.split("/")]
+    return f"{parts.scheme}://{parts.netloc}{'/'.join(segments) or '/'}"
+
+def stability(hits, misses):
+    # Share of checks the locator resolved in, pulled towards 1/2 while there are few
+    return (hits + 1) / (hits + misses + 2)
+
+def locator_fingerprint(strategy, locator, context=""):
+    # The inspector and the agent's code agree on id locators, so they share a row
+    return hashlib.sha1(f"{strategy}|{locator}|{context}".encode("utf-8")).hexdigest()[:16]
+
+def absolute_xpath(xpath):
+    # The inspector's paths start at BODY when no ancestor has an id, which only
+    # matches relative to the body; anchored at the root they mean the same from
+    # the document. Paths from the root or an id() are left as they are.
+    if xpath.startswith("BODY"):
+        return "/HTML/" + xpath
+    return xpath
+
+def is_absolute_xpath(xpath):
+    return xpath.startswith(("/", "(", "id("))
+
+def element_locator(row):
+    # The id is the most direct locator unless the element sits in a frame or shadow root
+    context = " >> ".join(filter(None, (row.get("frame"), row.get("shadow_host"))))
+    if row.get("id") and not context:
+        return "id", row["id"], context
+    return "xpath", absolute_xpath(row["xpath"]), context
+
+def agent_locators(code):
+    # (strategy, value) pairs in the order the agent's Selenium code used them
+    seen = []
+    for match in AGENT_LOCATOR_RE.finditer(code or ""):
+        locator = (BY_STRATEGIES[match.group(1)], match.group("value").replace("\\" + match.group("q"), match.group("q")))
+        # A relative xpath is searched from an element found earlier, which is not known here
+        if locator[0] == "xpath" and not is_absolute_xpath(locator[1]):
+            continue
+        if locator not in seen:
+            seen.append(locator)
+    return seen
+
+def format_locator(entry):
+    line = f"{entry['strategy']}={entry['locator']}"
+    if entry["tag"]:
+        line += f" <{entry['tag'].lower()}>"
+    if entry["context"]:
+        line += f" inside {entry['context']}"
+    return line + f" (resolved {entry['hits']} of {entry['hits'] + entry['misses']} checks)"
+
+class LocatorStore:
+    def __init__(self, path=STORE_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS locators ("
+                " pattern TEXT, fingerprint TEXT, strategy TEXT, locator TEXT, tag TEXT, context TEXT,"
+                " source TEXT, hits INTEGER, misses INTEGER, stability REAL, first_seen REAL, last_seen REAL,"
+                " PRIMARY KEY (pattern, fingerprint))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS locators_stability ON locators(pattern, stability)")
+
+    def _upsert(self, rows):
+        # New locators start with one hit; known ones are only refreshed, since
+        # their hits and misses come from resolve() so no check counts twice
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO locators (pattern, fingerprint, strategy, locator, tag, context, source, hits, misses,"
+                " stability, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, 1, 0, ?, ?, ?)"
+                " ON CONFLICT(pattern, fingerprint) DO UPDATE SET last_seen = excluded.last_seen,"
+                " tag = COALESCE(excluded.tag, tag)",
+                [(*row, stability(1, 0), now, now) for row in rows],
+            )
+
+    def record_elements(self, url, rows, source="inspector"):
+        # Passes element rows through unchanged, so an export can keep streaming
+        pattern = url_pattern(url)
+        batch = []
+        for row in rows:
+            yield row
+            strategy, locator, context = element_locator(row)
+            batch.append((pattern, locator_fingerprint(strategy, locator, context), strategy, locator, row.get("tag"),
+                          context, source))
+            if len(batch) >= RECORD_BATCH_ROWS:
+                self._upsert(batch)
+                batch = []
+        self._upsert(batch)
+
+    def record_agent_run(self, url, code):
+        # Locators used by the Selenium code of a completed agent run
+        pattern = url_pattern(url)
+        locators = agent_locators(code)
+        self._upsert([(pattern, locator_fingerprint(strategy, value), strategy, value, None, "", "agent")
+                      for strategy, value in locators])
+        return len(locators)
+
+    def known(self, url, min_stability=0.0, limit=None):
+        # Most stable first; within a score, the most often confirmed
+        query = ("SELECT * FROM locators WHERE pattern = ? AND stability >= ?"
+                 " ORDER BY stability DESC, hits DESC, last_seen DESC")
+        params = [url_pattern(url), min_stability]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = [dict(row) for row in self._conn.execute(query, params)]
+        # Xpaths stored before they were made absolute are anchored now; relative
+        # ones from agent code would match from the wrong node, so they are left out
+        entries = []
+        for row in rows:
+            if row["strategy"] == "xpath":
+                row["locator"] = absolute_xpath(row["locator"])
+                if not is_absolute_xpath(row["locator"]):
+                    continue
+            entries.append(row)
+        return entries
+
+    def resolve(self, url, driver):
+        # Re-checks every known locator of url's pattern on the page the driver
+        # has loaded and returns the ones that were not found missing
+        entries = self.known(url)
+        if not entries:
+            return []
+        with span("locators.resolve", known=len(entries)) as current:
+            results = driver.execute_script(RESOLVE_LOCATORS_JS,
+                                            [[e["strategy"], e["locator"], e["context"]] for e in entries])
+            now = time.time()
+            updates = []
+            usable = []
+            for entry, ok in zip(entries, results):
+                if ok is None:
+                    usable.append(entry)
+                    continue
+                entry["hits" if ok else "misses"] += 1
+                entry["stability"] = stability(entry["hits"], entry["misses"])
+                updates.append((int(ok), int(not ok), int(ok), now if ok else None, entry["pattern"],
+                                entry["fingerprint"]))
+                if ok:
+                    usable.append(entry)
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    # Increments, so checks from parallel scenarios are never lost
+                    "UPDATE locators SET hits = hits + ?, misses = misses + ?,"
+                    " stability = (hits + ? + 1.0) / (hits + misses + 3), last_seen = COALESCE(?, last_seen)"
+                    " WHERE pattern = ? AND fingerprint = ?",
+                    updates,
+                )
+            current.set(usable=len(usable), checked=len(updates))
+        return usable
+
+    def hints(self, url, driver=None, min_stability=MIN_STABILITY, limit=HINT_LIMIT):
+        # Stable locators for url, re-checked against the loaded page when a driver is given
+        entries = self.resolve(url, driver) if driver is not None else self.known(url)
+        entries = [e for e in entries if e["stability"] >= min_stability]
+        entries.sort(key=lambda e: (-e["stability"], -e["hits"]))
+        return entries[:limit]
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT pattern), AVG(stability) FROM locators").fetchone()
+        return {"locators": row[0], "patterns": row[1], "mean_stability": round(row[2] or 0, 3)}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_locator_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocatorStore()
+        return _store
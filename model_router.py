@@ -0,0 +1,242 @@
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from llm_cache import cached_chat, cached_complete, stream_chat, stream_complete
+from llm_governor import IMAGE_TOKENS
+from prompt_builder import count_tokens
+from runtime import MULTIMODAL_MODEL, TEXT_MODEL, get_llm, get_mm_llm
+from tracing import propagate, span
+
+# Picks the model for each call from the prompt's size and whether it carries
+# images. Every route lists its models in order of preference; a model whose
+# recent p90 latency on that route misses the SLO is passed over for one that
+# meets it, and a call that runs past the timeout is retried on the next model
+# (for a stream, one whose first text runs past it, since nothing was shown yet).
+# The latency of every (route, model) pair is kept so the table can be tuned.
+LARGE_PROMPT_TOKENS = int(os.getenv("SDET_LLM_LARGE_PROMPT", "16000"))
+LATENCY_SLO = float(os.getenv("SDET_LLM_SLO", "30"))
+# Seconds before a call is given up on in favour of the next model; defaults to twice the SLO
+CALL_TIMEOUT = float(os.getenv("SDET_LLM_TIMEOUT", "0")) or None
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 5
+
+ROUTES = {
+    "text-small": [TEXT_MODEL, MULTIMODAL_MODEL],
+    "text-large": [TEXT_MODEL, MULTIMODAL_MODEL],
+    "image-small": [TEXT_MODEL, MULTIMODAL_MODEL],
+    # Large prompts that need the screenshot read it better with the larger model
+    "image-large": [MULTIMODAL_MODEL, TEXT_MODEL],
+}
+
+def parse_routes(spec):
+    # "image-small=models/a|models/b,text-large=models/c"
+    routes = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, models = entry.partition("=")
+        routes[name.strip()] = [model.strip() for model in models.split("|") if model.strip()]
+    return routes
+
+ROUTES.update(parse_routes(os.getenv("SDET_LLM_ROUTES", "")))
+
+def route_name(prompt_tokens, images=0):
+    size = "large" if prompt_tokens + IMAGE_TOKENS * images >= LARGE_PROMPT_TOKENS else "small"
+    return f"{'image' if images else 'text'}-{size}"
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class ModelRouter:
+    def __init__(self, routes=None, slo=LATENCY_SLO, timeout=CALL_TIMEOUT):
+        self.routes = ROUTES if routes is None else routes
+        self.slo = slo
+        self.timeout = timeout
+        self._stats = {}
+        self._lock = threading.Lock()
+        # Calls run here so a slow one can be left behind; it still finishes
+        # (and fills the cache) in the background
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-router")
+
+    def _entry(self, route, model):
+        key = (route, model)
+        if key not in self._stats:
+            self._stats[key] = {"calls": 0, "timeouts": 0, "errors": 0,
+                                "latencies": collections.deque(maxlen=LATENCY_WINDOW),
+                                "first_deltas": collections.deque(maxlen=LATENCY_WINDOW)}
+        return self._stats[key]
+
+    def _record(self, route, model, seconds=None, outcome="ok", first_delta=None):
+        # seconds is the whole call; first_delta the time to a stream's first text
+        with self._lock:
+            entry = self._entry(route, model)
+            if outcome == "timeout":
+                entry["timeouts"] += 1
+                return
+            entry["calls"] += 1
+            if outcome == "error":
+                entry["errors"] += 1
+                return
+            if seconds is not None:
+                entry["latencies"].append(seconds)
+            if first_delta is not None:
+                entry["first_deltas"].append(first_delta)
+
+    def p90(self, route, model):
+        # Of whole calls, or of the time to first text when that is worse (streams
+        # abandoned for being slow only ever report the latter)
+        with self._lock:
+            entry = self._stats.get((route, model))
+            samples = [list(entry[name]) for name in ("latencies", "first_deltas")] if entry else []
+        p90s = [_percentile(values, 0.9) for values in samples if len(values) >= MIN_SAMPLES]
+        return max(p90s) if p90s else None
+
+    def candidates(self, route, slo=None):
+        # The route's models with those missing the SLO moved to the back, fastest first
+        slo = slo or self.slo
+        models = self.routes.get(route) or [TEXT_MODEL]
+        p90s = {model: self.p90(route, model) for model in models}
+        within = [model for model in models if p90s[model] is None or p90s[model] <= slo]
+        missing = sorted((model for model in models if model not in within), key=lambda model: p90s[model])
+        return within + missing
+
+    def _attempt(self, route, model, call):
+        # (result, cache hit); answers from the cache say nothing about the model's latency
+        with span("llm.attempt", route=route, model=model) as current:
+            result = call(model)
+        return result, any(child.attributes.get("cache_hit") for child in current.children)
+
+    def _run(self, route, models, call, slo):
+        timeout = self.timeout or 2 * (slo or self.slo)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            started = time.perf_counter()
+            future = self._executor.submit(propagate(self._attempt), route, model, call)
+            try:
+                # The last model has nowhere to fall back to, so it is waited for
+                result, hit = future.result(None if last else timeout)
+            except FutureTimeout:
+                self._record(route, model, outcome="timeout")
+                # Its latency still counts once it finishes
+                future.add_done_callback(
+                    lambda f, model=model, started=started: self._record(
+                        route, model, time.perf_counter() - started, "error" if f.exception() else "ok"))
+                print(f"Model router: {model} took over {timeout:.1f}s on {route}, falling back to {models[i + 1]}")
+                continue
+            except Exception:
+                self._record(route, model, outcome="error")
+                raise
+            if not hit:
+                self._record(route, model, time.perf_counter() - started)
+            return model, result
+
+    def _first_delta(self, route, model, chunks):
+        with span("llm.attempt", route=route, model=model, stream=True) as current:
+            first = next(chunks, None)
+        return first, any(child.attributes.get("cache_hit") for child in current.children)
+
+    def _abandon_stream(self, route, model, started, future, chunks):
+        # A stream given up on before its first text: its time to first text still
+        # counts, and the upstream stream is closed instead of read to the end
+        if future.exception():
+            self._record(route, model, outcome="error")
+            return
+        self._record(route, model, first_delta=time.perf_counter() - started)
+        chunks.close()
+
+    def _stream(self, route, models, open_stream, slo, **attributes):
+        # Yields text deltas. Until the first one arrives nothing has been shown,
+        # so a model that takes longer than the timeout is dropped for the next.
+        timeout = self.timeout or 2 * (slo or self.slo)
+        with span("llm.route", route=route, stream=True, **attributes) as current:
+            for i, model in enumerate(models):
+                last = i == len(models) - 1
+                started = time.perf_counter()
+                chunks = open_stream(model)
+                future = self._executor.submit(propagate(self._first_delta), route, model, chunks)
+                try:
+                    first, hit = future.result(None if last else timeout)
+                except FutureTimeout:
+                    self._record(route, model, outcome="timeout")
+                    future.add_done_callback(
+                        lambda f, model=model, started=started, chunks=chunks: self._abandon_stream(
+                            route, model, started, f, chunks))
+                    print(f"Model router: {model} sent no text within {timeout:.1f}s on {route}, "
+                          f"falling back to {models[i + 1]}")
+                    continue
+                except Exception:
+                    self._record(route, model, outcome="error")
+                    raise
+                break
+            first_delta = time.perf_counter() - started
+            current.set(model=model, first_delta_seconds=round(first_delta, 3))
+        # The rest is read outside the span: the consumer runs between the yields
+        finished = False
+        try:
+            if first is not None:
+                yield first
+            for delta in chunks:
+                yield delta
+            finished = True
+        except Exception:
+            self._record(route, model, outcome="error")
+            raise
+        finally:
+            chunks.close()
+        if finished and not hit:
+            self._record(route, model, time.perf_counter() - started, first_delta=first_delta)
+
+    def complete(self, prompt, images=(), force_regenerate=False, stream=False, slo=None):
+        tokens = count_tokens(prompt)
+        route = route_name(tokens, len(images))
+        models = self.candidates(route, slo)
+        if stream:
+            return self._stream(route, models, lambda m: stream_complete(get_mm_llm(m), prompt, images, force_regenerate),
+                                slo, prompt_tokens=tokens, images=len(images))
+        with span("llm.route", route=route, prompt_tokens=tokens, images=len(images)) as current:
+            model, content = self._run(
+                route, models, lambda m: cached_complete(get_mm_llm(m), prompt, images, force_regenerate), slo)
+            current.set(model=model)
+        return content
+
+    def chat(self, messages, force_regenerate=False, stream=False, slo=None):
+        tokens = count_tokens("\n".join(str(m.content) for m in messages))
+        route = route_name(tokens)
+        models = self.candidates(route, slo)
+        if stream:
+            return self._stream(route, models, lambda m: stream_chat(get_llm(m), messages, force_regenerate), slo,
+                                prompt_tokens=tokens)
+        with span("llm.route", route=route, prompt_tokens=tokens) as current:
+            model, content = self._run(route, models, lambda m: cached_chat(get_llm(m), messages, force_regenerate),
+                                       slo)
+            current.set(model=model)
+        return content
+
+    def stats(self):
+        # One row per (route, model) that has been tried
+        rows = []
+        with self._lock:
+            items = [(key, dict(entry, latencies=list(entry["latencies"]), first_deltas=list(entry["first_deltas"])))
+                     for key, entry in self._stats.items()]
+        for (route, model), entry in sorted(items):
+            latencies, first_deltas = entry["latencies"], entry["first_deltas"]
+            rows.append({
+                "route": route, "model": model, "calls": entry["calls"], "timeouts": entry["timeouts"],
+                "errors": entry["errors"],
+                "p50_seconds": round(_percentile(latencies, 0.5), 3) if latencies else None,
+                "p90_seconds": round(_percentile(latencies, 0.9), 3) if latencies else None,
+                "p90_first_text_seconds": round(_percentile(first_deltas, 0.9), 3) if first_deltas else None,
+            })
+        return rows
+
+_router = None
+_router_lock = threading.Lock()
+
+def get_model_router():
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
@@ -0,0 +1,194 @@
+import hashlib
+import html
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from driver_pool import get_driver_pool
+
+# off: always load the live site; capture: load it live and (re)save a snapshot;
+# replay: serve the saved snapshot, failing when there is none; auto: replay when
+# a snapshot exists and capture one otherwise.
+SNAPSHOT_MODES = ("off", "capture", "replay", "auto")
+SNAPSHOT_MODE = os.getenv("SDET_SNAPSHOT_MODE", "off")
+SNAPSHOT_DIR = os.getenv("SDET_SNAPSHOT_DIR", os.path.join(os.path.expanduser("~"), ".sdet_genie", "snapshots"))
+RESOURCE_TIMEOUT = float(os.getenv("SDET_SNAPSHOT_RESOURCE_TIMEOUT", "15"))
+
+# Rendered DOM without scripts, so the replayed page does not render itself a second time
+SNAPSHOT_DOM_JS = """
+var root = document.documentElement.cloneNode(true);
+root.querySelectorAll('script').forEach(function (el) { el.remove(); });
+var doctype = document.doctype ? '<!DOCTYPE ' + document.doctype.name + '>\\n' : '';
+return doctype + root.outerHTML;
+"""
+
+# Everything the page loaded except scripts and API calls, plus stylesheets and images still in the DOM
+SNAPSHOT_RESOURCES_JS = """
+var skip = {script: 1, xmlhttprequest: 1, fetch: 1, beacon: 1};
+var urls = performance.getEntriesByType('resource')
+    .filter(function (e) { return !skip[e.initiatorType]; })
+    .map(function (e) { return e.name; });
+document.querySelectorAll('link[rel~="stylesheet"][href], link[rel~="icon"][href], img[src]').forEach(function (el) {
+    urls.push(el.href || el.src);
+});
+return Array.from(new Set(urls)).filter(function (u) { return /^https?:/.test(u); });
+"""
+
+def snapshot_key(url):
+    return hashlib.sha1(url.strip().encode("utf-8")).hexdigest()[:16]
+
+def archive_path(url, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, snapshot_key(url))
+
+def has_snapshot(url, directory=SNAPSHOT_DIR):
+    return os.path.exists(os.path.join(archive_path(url, directory), "manifest.json"))
+
+def _route(url):
+    parts = urlsplit(url)
+    return (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+def _fetch_resources(driver, urls):
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+    def fetch(url):
+        try:
+            response = session.get(url, timeout=RESOURCE_TIMEOUT)
+            response.raise_for_status()
+            return url, response.content, response.headers.get("Content-Type", "application/octet-stream")
+        except Exception as e:
+            print(f"Snapshot: skipped {url} ({type(e).__name__}: {e})")
+            return url, None, None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return [r for r in executor.map(fetch, urls) if r[1] is not None]
+
+def _localize(text, replacements):
+    # Absolute references point at the stand-in server instead of the network
+    for url, local in replacements:
+        for form in (url, "//" + url.split("://", 1)[1]):
+            text = text.replace(form, local).replace(html.escape(form, quote=True), local)
+    return text
+
+_capture_locks = {}
+_capture_locks_lock = threading.Lock()
+
+def capture_snapshot(url, driver=None, directory=SNAPSHOT_DIR):
+    # Saves the rendered DOM, the resources it loaded and a screenshot of url
+    with _capture_locks_lock:
+        lock = _capture_locks.setdefault(snapshot_key(url), threading.Lock())
+    with lock:
+        if driver is None:
+            with get_driver_pool().lease() as lease:
+                return _capture(url, lease.driver, directory)
+        return _capture(url, driver, directory)
+
+def _capture(url, driver, directory):
+    start = time.perf_counter()
+    driver.get(url)
+    page_url = driver.current_url
+    origin = urlsplit(page_url)[:2]
+    dom = driver.execute_script(SNAPSHOT_DOM_JS)
+    resources = _fetch_resources(driver, driver.execute_script(SNAPSHOT_RESOURCES_JS))
+    screenshot = driver.get_screenshot_as_png()
+
+    target = archive_path(url, directory)
+    staging = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(os.path.join(staging, "resources"), exist_ok=True)
+    routes = {}
+    local = {}
+    for resource_url, _, _ in resources:
+        name = hashlib.sha1(resource_url.encode("utf-8")).hexdigest()
+        same_origin = urlsplit(resource_url)[:2] == origin
+        local[resource_url] = _route(resource_url) if same_origin else f"/__snapshot__/{name}"
+    # Longest first so a URL is never rewritten through a shorter one it starts with
+    replacements = sorted(local.items(), key=lambda item: -len(item[0]))
+    for resource_url, content, content_type in resources:
+        name = hashlib.sha1(resource_url.encode("utf-8")).hexdigest()
+        if "css" in content_type:
+            content = _localize(content.decode("utf-8", "replace"), replacements).encode("utf-8")
+        with open(os.path.join(staging, "resources", name), "wb") as f:
+            f.write(content)
+        routes[local[resource_url]] = {"file": f"resources/{name}", "content_type": content_type, "url": resource_url}
+    with open(os.path.join(staging, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_localize(dom, replacements))
+    with open(os.path.join(staging, "screenshot.png"), "wb") as f:
+        f.write(screenshot)
+    for route in {_route(url), _route(page_url)}:
+        routes[route] = {"file": "index.html", "content_type": "text/html; charset=utf-8", "url": page_url}
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"url": url, "page_url": page_url, "captured": time.time(), "routes": routes}, f, indent=2)
+
+    # Swap the new archive in whole so a replay never sees a half-written one
+    if os.path.exists(target):
+        retired = f"{staging}.old"
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    print(f"Snapshot of {url}: {len(resources)} resource(s) in {time.perf_counter() - start:.1f}s at {target}")
+    return target
+
+class _SnapshotHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        archive, routes = self.server.archive, self.server.routes
+        entry = routes.get(self.path) or routes.get(self.path.split("?", 1)[0])
+        if entry is None:
+            self.send_error(404)
+            return
+        with open(os.path.join(archive, entry["file"]), "rb") as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", entry["content_type"])
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+def serve_snapshot(url, directory=SNAPSHOT_DIR):
+    # One local server per archive so root-relative resource paths resolve as on the live site
+    archive = archive_path(url, directory)
+    with open(os.path.join(archive, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    with _servers_lock:
+        server = _servers.get(archive)
+        if server is None:
+            server = ThreadingHTTPServer(("127.0.0.1", 0), _SnapshotHandler)
+            server.daemon_threads = True
+            server.archive = archive
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            _servers[archive] = server
+        # A re-captured archive is picked up without restarting the server
+        server.routes = manifest["routes"]
+    return f"http://127.0.0.1:{server.server_address[1]}{_route(url)}"
+
+def page_url(url, driver=None, mode=None):
+    # URL the agent or the inspector should load for url under the snapshot mode
+    mode = mode or SNAPSHOT_MODE
+    if mode not in SNAPSHOT_MODES:
+        raise ValueError(f"Unknown snapshot mode {mode!r}; expected one of {SNAPSHOT_MODES}")
+    if mode == "off":
+        return url
+    if mode == "capture" or (mode == "auto" and not has_snapshot(url)):
+        capture_snapshot(url, driver)
+        if mode == "capture":
+            return url
+    elif not has_snapshot(url):
+        raise FileNotFoundError(f"No snapshot of {url} in {SNAPSHOT_DIR}; run once in capture mode first")
+    return serve_snapshot(url)
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import re
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("SDET_PROMPT_TOKEN_BUDGET", "24000"))
+
+# Tags that never help locate or assert on an element
+NOISE_TAGS = ("script", "style", "svg", "noscript", "template", "link", "meta", "iframe", "canvas")
+# Attributes worth keeping for locators and assertions; lavague adds xpath itself
+KEEP_ATTRIBUTES = {
+    "id", "name", "class", "type", "value", "placeholder", "href", "alt", "title", "role", "for",
+    "label", "xpath", "checked", "selected", "disabled", "readonly", "required", "action", "method",
+    "data-testid", "data-test", "data-test-id", "data-qa", "data-cy",
+}
+
+_encoding = None
+
+def count_tokens(text):
+    # tiktoken's cl100k is close enough to Gemini's tokenizer for budgeting
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+def distill_html(html):
+    from bs4 import BeautifulSoup, Comment
+
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    for tag in soup.find_all(True):
+        tag.attrs = {
+            name: value for name, value in tag.attrs.items()
+            if name in KEEP_ATTRIBUTES or name.startswith("aria-")
+        }
+    body = soup.body or soup
+    text = "".join(str(child) for child in body.children)
+    return re.sub(r"\s+", " ", text).strip()
+
+def distill_nodes(nodes):
+    # Distills each retrieved node and drops ones already seen (same or other scenario)
+    seen = set()
+    distilled = []
+    for node in nodes:
+        html = distill_html(getattr(node, "text", None) or str(node))
+        digest = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        if html and digest not in seen:
+            seen.add(digest)
+            distilled.append(html)
+    return distilled
+
+class Section:
+    # units are dropped from the end when the section does not fit; required
+    # sections are always kept whole. Lower priority numbers are filled first.
+    def __init__(self, name, units, priority, joiner="\n", required=False):
+        self.name = name
+        self.units = [u for u in units if u]
+        self.priority = priority
+        self.joiner = joiner
+        self.required = required
+
+def assemble_prompt(template, sections, budget=PROMPT_TOKEN_BUDGET):
+    # template uses str.format placeholders named after the sections
+    remaining = budget - count_tokens(template.format(**{s.name: "" for s in sections}))
+    fitted = {}
+    report = {}
+    for section in sorted(sections, key=lambda s: (not s.required, s.priority)):
+        kept = []
+        used = 0
+        for unit in section.units:
+            cost = count_tokens(unit) + 1
+            if not section.required and used + cost > remaining:
+                break
+            kept.append(unit)
+            used += cost
+        remaining -= used
+        fitted[section.name] = section.joiner.join(kept)
+        report[section.name] = {"tokens": used, "kept": len(kept), "dropped": len(section.units) - len(kept)}
+    dropped = {name: r["dropped"] for name, r in report.items() if r["dropped"]}
+    if dropped:
+        print(f"Prompt budget of {budget} tokens: dropped {dropped}")
+    return template.format(**fitted), report
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from gherkin import feature_steps
+from tracing import span
+
+# Selenium code of completed agent runs, one entry per agent step, stored per
+# (URL, scenario) together with the Gherkin step each action belongs to. A later
+# run of the same scenario executes the steps directly in the browser; an edited
+# scenario replays the actions of its unchanged leading steps. Either way the
+# agent only takes over from the first step that changed or no longer works.
+RECORDINGS_PATH = os.getenv("SDET_RECORDINGS", os.path.join(os.path.expanduser("~"), ".sdet_genie", "recordings.sqlite3"))
+REPLAY_ENABLED = os.getenv("SDET_REPLAY", "1") != "0"
+STOPWORDS = {"a", "an", "the", "i", "to", "on", "in", "of", "and", "is", "be", "should", "given", "when", "then",
+             "but", "driver", "find", "element", "by", "self"}
+
+def scenario_hash(test_case):
+    # Indentation and blank lines do not change what the scenario does
+    text = "\n".join(line.strip() for line in test_case.strip().splitlines() if line.strip())
+    return hashlib.sha256(re.sub(r"[ \t]+", " ", text).encode("utf-8")).hexdigest()[:32]
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower())) - STOPWORDS
+
+def align_actions(actions, steps, start=0):
+    # Maps each agent action (instruction and code text) to the index of the
+    # Gherkin step it carried out. Actions never go back to an earlier step;
+    # within that, the total word overlap is maximised and ties go to the later
+    # step, so an action is never fast-forwarded past a step it may belong to.
+    if not actions:
+        return []
+    if start >= len(steps):
+        return [max(len(steps) - 1, 0)] * len(actions)
+    words = [_words(step) for step in steps[start:]]
+    scores = []
+    for action in actions:
+        action_words = _words(action)
+        scores.append([len(action_words & w) / (len(action_words | w) or 1) for w in words])
+    best = [scores[0]]
+    for row in scores[1:]:
+        running, current = float("-inf"), []
+        for s, score in enumerate(row):
+            running = max(running, best[-1][s])
+            current.append(running + score)
+        best.append(current)
+    alignment, limit = [], len(words) - 1
+    for row in reversed(best):
+        limit = max(range(limit + 1), key=lambda s: (row[s], s))
+        alignment.append(start + limit)
+    return alignment[::-1]
+
+def replay_namespace(driver):
+    # What the agent's generated code expects to find in scope
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import Select, WebDriverWait
+
+    return {"driver": driver, "By": By, "Keys": Keys, "ActionChains": ActionChains, "Select": Select,
+            "WebDriverWait": WebDriverWait, "EC": EC, "time": time}
+
+def replay_steps(driver, steps):
+    # Returns how many steps ran and the error that stopped the replay, if any
+    namespace = replay_namespace(driver)
+    for i, code in enumerate(steps):
+        with span("replay.step", step=i) as current:
+            try:
+                exec(compile(code, f"<recorded step {i}>", "exec"), dict(namespace))
+            except Exception as e:
+                current.fail(e)
+                print(f"Replay stopped at step {i + 1} of {len(steps)}: {type(e).__name__}: {e}")
+                return i, e
+    return len(steps), None
+
+class RunRecorder:
+    def __init__(self, path=RECORDINGS_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS recordings ("
+                " url TEXT, scenario TEXT, steps TEXT, created REAL, replays INTEGER DEFAULT 0,"
+                " fallbacks INTEGER DEFAULT 0, last_replayed REAL, PRIMARY KEY (url, scenario))"
+            )
+            # Added for step-level diffs; recordings made before have no alignment
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(recordings)")}
+            for column in ("name", "gherkin", "alignment"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE recordings ADD COLUMN {column} TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS recordings_name ON recordings(url, name, created)")
+            # Generations used to be keyed by the file name, which unrelated features shared
+            self._conn.execute("DROP TABLE IF EXISTS generations")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS feature_generations ("
+                " url TEXT, feature TEXT, target TEXT, code TEXT, scenarios TEXT, created REAL,"
+                " PRIMARY KEY (url, feature, target))"
+            )
+
+    def _load(self, row):
+        if row is None:
+            return None
+        steps, gherkin, alignment = row
+        return {"steps": json.loads(steps), "gherkin": json.loads(gherkin) if gherkin else None,
+                "alignment": json.loads(alignment) if alignment else None}
+
+    def get(self, url, test_case):
+        with self._lock:
+            row = self._conn.execute("SELECT steps, gherkin, alignment FROM recordings WHERE url = ? AND scenario = ?",
+                                     (url.strip(), scenario_hash(test_case))).fetchone()
+        return self._load(row)
+
+    def previous(self, url, name):
+        # Latest recording of the scenario with this name, whatever its steps were then
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT steps, gherkin, alignment FROM recordings WHERE url = ? AND name = ?"
+                " ORDER BY created DESC LIMIT 1", (url.strip(), name)).fetchone()
+        return self._load(row)
+
+    def plan(self, url, test_case, name=None):
+        # What to replay before the agent takes over, or None to run the agent from the start.
+        # resume_at is the index of the first Gherkin step the recording does not cover.
+        steps = feature_steps(test_case)
+        recording = self.get(url, test_case)
+        if recording:
+            alignment = recording["alignment"] or [max(len(steps) - 1, 0)] * len(recording["steps"])
+            return {"steps": recording["steps"], "alignment": alignment, "gherkin": steps, "resume_at": len(steps),
+                    "exact": True}
+        recording = self.previous(url, name) if name else None
+        if not recording or not recording["gherkin"] or not recording["alignment"]:
+            return None
+        unchanged = 0
+        for old, new in zip(recording["gherkin"], steps):
+            if old != new:
+                break
+            unchanged += 1
+        # Alignments never decrease, so the actions of the unchanged steps are a prefix
+        prefix = [i for i, step in enumerate(recording["alignment"]) if step < unchanged]
+        if not prefix:
+            return None
+        return {"steps": recording["steps"][:len(prefix)], "alignment": recording["alignment"][:len(prefix)],
+                "gherkin": steps, "resume_at": unchanged, "exact": False}
+
+    def save(self, url, test_case, steps, alignment=None, name=None):
+        kept = [i for i, code in enumerate(steps) if code and code.strip()]
+        if not kept:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO recordings (url, scenario, steps, created, name, gherkin, alignment)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(url, scenario) DO UPDATE SET steps = excluded.steps,"
+                " created = excluded.created, name = excluded.name, gherkin = excluded.gherkin,"
+                " alignment = excluded.alignment",
+                (url.strip(), scenario_hash(test_case), json.dumps([steps[i] for i in kept]), time.time(), name,
+                 json.dumps(feature_steps(test_case)),
+                 json.dumps([alignment[i] for i in kept]) if alignment else None),
+            )
+
+    def mark_replayed(self, url, test_case, fallback=False):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE recordings SET replays = replays + 1, fallbacks = fallbacks + ?, last_replayed = ?"
+                " WHERE url = ? AND scenario = ?",
+                (int(fallback), time.time(), url.strip(), scenario_hash(test_case)),
+            )
+
+    def forget(self, url, test_case):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM recordings WHERE url = ? AND scenario = ?",
+                               (url.strip(), scenario_hash(test_case)))
+
+    def last_generation(self, url, feature, target):
+        # Code generated for this feature (gherkin.feature_key) last time, with the
+        # (name, hash) of each scenario it covered
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT code, scenarios FROM feature_generations WHERE url = ? AND feature = ? AND target = ?",
+                (url.strip(), feature, target)).fetchone()
+        return {"code": row[0], "scenarios": [tuple(s) for s in json.loads(row[1])]} if row else None
+
+    def save_generation(self, url, feature, target, code, scenarios):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feature_generations (url, feature, target, code, scenarios, created)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url.strip(), feature, target, code,
+                 json.dumps([(s.name, scenario_hash(s.text)) for s in scenarios]), time.time()),
+            )
+
+    def stats(self):
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*), SUM(replays), SUM(fallbacks) FROM recordings").fetchone()
+        return {"recordings": row[0], "replays": row[1] or 0, "fallbacks": row[2] or 0}
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+def get_run_recorder():
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = RunRecorder()
+        return _recorder
@@ -0,0 +1,144 @@
+import functools
+import inspect
+import os
+import threading
+import time
+
+TEXT_MODEL = "models/gemini-1.5-flash-latest"
+MULTIMODAL_MODEL = "models/gemini-1.5-pro-latest"
+EMBEDDING_MODEL = "models/text-embedding-004"
+
+# "stub" swaps the Gemini clients for the deterministic offline ones in stub_backend
+LLM_BACKEND = os.getenv("SDET_LLM_BACKEND", "gemini")
+
+# Heavy clients and process-wide side effects are created on first use only,
+# once per process, and timed so the startup cost can be reported.
+_timings = {}
+_lock = threading.RLock()
+
+def process_cached(name):
+    def decorator(factory):
+        instances = {}
+        signature = inspect.signature(factory)
+
+        @functools.wraps(factory)
+        def wrapper(*args, **kwargs):
+            # get_llm() and get_llm("models/...") with the default name share one instance
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            args = tuple(bound.arguments.values())
+            if args in instances:
+                return instances[args]
+            with _lock:
+                if args not in instances:
+                    start = time.perf_counter()
+                    instances[args] = factory(*args)
+                    label = name if not args else f"{name}({', '.join(map(str, args))})"
+                    _timings[label] = time.perf_counter() - start
+            return instances[args]
+        return wrapper
+    return decorator
+
+@process_cached("nltk")
+def ensure_nltk():
+    import nltk
+
+    # Set the NLTK data directory to a directory within your app's writable directory
+    nltk_data_dir = os.path.join(os.path.expanduser("~"), "nltk_data")
+    os.makedirs(nltk_data_dir, exist_ok=True)
+    if nltk_data_dir not in nltk.data.path:
+        nltk.data.path.append(nltk_data_dir)
+    # Only hit the network when the corpus is not already on disk
+    try:
+        nltk.data.find("corpora/stopwords")
+    except LookupError:
+        nltk.download("stopwords", download_dir=nltk_data_dir)
+    return nltk_data_dir
+
+@process_cached("display")
+def ensure_display():
+    from pyvirtualdisplay import Display
+
+    display = Display(visible=0, size=(1920, 1080))
+    display.start()
+    return display
+
+@process_cached("llm")
+def get_llm(model_name=TEXT_MODEL):
+    if LLM_BACKEND == "stub":
+        from stub_backend import StubLLM
+
+        return StubLLM(model_name=f"stub/{model_name}")
+    from llama_index.llms.gemini import Gemini
+
+    return Gemini(model_name=model_name, api_key=os.getenv("GOOGLE_API_KEY"))
+
+@process_cached("mm_llm")
+def get_mm_llm(model_name=MULTIMODAL_MODEL):
+    if LLM_BACKEND == "stub":
+        from stub_backend import StubMultiModal
+
+        return StubMultiModal(model_name=f"stub/{model_name}")
+    from llama_index.multi_modal_llms.gemini import GeminiMultiModal
+
+    return GeminiMultiModal(model_name=model_name, api_key=os.getenv("GOOGLE_API_KEY"))
+
+@process_cached("embedding")
+def get_embedding(model_name=EMBEDDING_MODEL):
+    from embedding_cache import CachedEmbedding
+
+    if LLM_BACKEND == "stub":
+        from stub_backend import StubEmbedding
+
+        return CachedEmbedding(StubEmbedding(model_name=f"stub/{model_name}"))
+    from llama_index.embeddings.gemini import GeminiEmbedding
+
+    # Page chunks barely change between agent steps and runs; only new ones reach the API
+    return CachedEmbedding(GeminiEmbedding(model_name=model_name, api_key=os.getenv("GOOGLE_API_KEY")))
+
+@process_cached("context")
+def get_context():
+    from lavague.core.context import Context
+
+    from governed_llm import GovernedLLM, GovernedMultiModal
+
+    ensure_nltk()
+    ensure_display()
+    # The agent's own calls go through the governor like the direct ones in llm_cache
+    return Context(llm=GovernedLLM(get_llm()), mm_llm=GovernedMultiModal(get_mm_llm()), embedding=get_embedding())
+
+@process_cached("world_model")
+def get_world_model():
+    from lavague.core import WorldModel
+
+    return WorldModel.from_context(get_context())
+
+# One ActionEngine per pooled browser, built the first time that browser runs an
+# agent; the engine holds its driver, so it is dropped when the pool quits that driver
+_action_engines = {}
+
+def _drop_action_engine(driver):
+    with _lock:
+        _action_engines.pop(driver, None)
+
+def get_action_engine(driver):
+    engine = _action_engines.get(driver)
+    if engine is not None:
+        return engine
+    with _lock:
+        if driver not in _action_engines:
+            from lavague.core import ActionEngine
+            from lavague.drivers.selenium import SeleniumDriver
+
+            from driver_pool import on_retire
+
+            on_retire(_drop_action_engine)
+            start = time.perf_counter()
+            _action_engines[driver] = ActionEngine.from_context(get_context(), SeleniumDriver(driver=driver))
+            _timings["action_engine"] = time.perf_counter() - start
+        return _action_engines[driver]
+
+def startup_report():
+    # Seconds spent building each lazily initialized component so far
+    with _lock:
+        return dict(_timings)
@@ -0,0 +1,138 @@
+import os
+import sqlite3
+import threading
+import time
+
+INDEX_PATH = os.getenv("SDET_SCREENSHOT_INDEX", os.path.join(os.path.expanduser("~"), ".sdet_genie", "screenshots.sqlite3"))
+SCREENSHOTS_ROOT = os.getenv("SDET_SCREENSHOTS_ROOT", "screenshots")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+class ScreenshotIndex:
+    # Screenshots are recorded as they are captured; a directory is only listed
+    # when it has never been indexed or was changed behind the index's back
+    # (its own mtime moved), which is a single stat in the common case.
+    def __init__(self, path=INDEX_PATH):
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS screenshots ("
+                " path TEXT PRIMARY KEY, directory TEXT, run_id TEXT, step INTEGER, mtime REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS screenshots_directory ON screenshots(directory, mtime)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS screenshots_step ON screenshots(run_id, step, mtime)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS directories (directory TEXT PRIMARY KEY, mtime_ns INTEGER)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS migrations (root TEXT PRIMARY KEY, migrated REAL)")
+
+    def record(self, path, run_id=None, step=None, mtime=None):
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        mtime = mtime if mtime is not None else os.path.getmtime(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO screenshots (path, directory, run_id, step, mtime) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime,"
+                " run_id = COALESCE(excluded.run_id, run_id), step = COALESCE(excluded.step, step)",
+                (path, directory, run_id, step, mtime),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO directories (directory, mtime_ns) VALUES (?, ?)",
+                (directory, os.stat(directory).st_mtime_ns),
+            )
+
+    def tag_directory(self, directory, run_id=None, step=None):
+        # Associates an agent step with the directory lavague wrote its screenshots to
+        directory = os.path.abspath(directory)
+        self._ensure_indexed(directory)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE screenshots SET run_id = COALESCE(?, run_id), step = COALESCE(?, step) WHERE directory = ?",
+                (run_id, step, directory),
+            )
+
+    def index_directory(self, directory, run_id=None, step=None):
+        # Only files the index has not seen yet are stat'ed
+        directory = os.path.abspath(directory)
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT path FROM screenshots WHERE directory = ?", (directory,))}
+        present = set()
+        rows = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    present.add(entry.path)
+                    if entry.path not in known:
+                        rows.append((entry.path, directory, run_id, step, entry.stat().st_mtime))
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM screenshots WHERE path = ?", [(p,) for p in known - present])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO screenshots (path, directory, run_id, step, mtime) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO directories (directory, mtime_ns) VALUES (?, ?)",
+                (directory, os.stat(directory).st_mtime_ns),
+            )
+        return len(rows)
+
+    def _ensure_indexed(self, directory):
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns FROM directories WHERE directory = ?", (directory,)).fetchone()
+        if row is None or row[0] != os.stat(directory).st_mtime_ns:
+            self.index_directory(directory)
+
+    def latest(self, directory):
+        directory = os.path.abspath(directory)
+        self._ensure_indexed(directory)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM screenshots WHERE directory = ? ORDER BY mtime DESC LIMIT 1", (directory,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def for_step(self, run_id, step):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM screenshots WHERE run_id = ? AND step = ? ORDER BY mtime DESC LIMIT 1",
+                (run_id, step),
+            ).fetchone()
+        return row[0] if row else None
+
+    def migrate(self, root=SCREENSHOTS_ROOT):
+        # One-time indexing of screenshot directories written before the index existed
+        root = os.path.abspath(root)
+        with self._lock:
+            done = self._conn.execute("SELECT 1 FROM migrations WHERE root = ?", (root,)).fetchone()
+        if done or not os.path.isdir(root):
+            return 0
+        indexed = 0
+        for directory, _, _ in os.walk(root):
+            indexed += self.index_directory(directory)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO migrations (root, migrated) VALUES (?, ?)", (root, time.time()))
+        print(f"Screenshot index: migrated {indexed} existing screenshot(s) under {root}")
+        return indexed
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_screenshot_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ScreenshotIndex()
+            _index.migrate()
+        return _index
+
+def record_agent_logs(logs):
+    # Tags each logged agent step's screenshot directory with its run id and step
+    index = get_screenshot_index()
+    for i, row in enumerate(logs.to_dict("records")):
+        directory = row.get("screenshots_path")
+        if isinstance(directory, str) and os.path.isdir(directory):
+            run_id = row.get("run_id")
+            step = row.get("step")
+            step = int(step) if isinstance(step, (int, float)) and step == step else i
+            index.tag_directory(directory, str(run_id) if run_id is not None else None, step)
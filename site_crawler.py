@@ -0,0 +1,186 @@
+"""Crawl a site and build one locator inventory for every page reached.
+
+Example:
+    python site_crawler.py https://example.com --depth 2 --max-pages 50 --browsers 4 --out inventory.csv
+
+Starting from the given URL, same-origin links are followed breadth first up
+to --depth clicks away or --max-pages pages. Pages are inspected concurrently,
+each browser session taking the next URL off a shared queue. Elements that
+repeat across pages (headers, navigation, footers) are merged by structural
+fingerprint, so the inventory holds each of them once with a page count.
+"""
+import argparse
+import hashlib
+import queue
+import sys
+import threading
+import time
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+from driver_pool import MAX_SESSIONS, get_driver_pool
+from element_export import EXPORT_FORMATS, INVENTORY_COLUMNS, export_elements
+from element_inspector import iter_elements
+from locator_store import get_locator_store
+from tracing import propagate, span
+
+CRAWL_DEPTH = 2
+CRAWL_MAX_PAGES = 50
+CRAWL_BROWSERS = min(4, MAX_SESSIONS)
+# Links to files the browser would download rather than render
+SKIP_EXTENSIONS = (".pdf", ".zip", ".gz", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".mp3", ".mp4",
+                   ".avi", ".mov", ".csv", ".xls", ".xlsx", ".doc", ".docx", ".exe", ".dmg")
+
+LINKS_JS = "return Array.from(document.querySelectorAll('a[href]'), function (a) { return a.href; });"
+
+def normalize_url(url, base=None):
+    # Absolute URL without its fragment, or None when it is not a crawlable page
+    url, _ = urldefrag(urljoin(base, url) if base else url)
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or parts.path.lower().endswith(SKIP_EXTENSIONS):
+        return None
+    return url
+
+def same_origin(url, origin):
+    return urlsplit(url)[:2] == origin
+
+def element_fingerprint(row):
+    # Position in the document rather than on screen, so the same nav element
+    # matches on every page even when the layout around it shifts
+    key = "|".join(str(row.get(name) or "") for name in ("tag", "id", "xpath", "frame", "shadow_host"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+class Inventory:
+    # Distinct elements seen across the crawl, in first-seen order
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def add_page(self, url, rows):
+        new = 0
+        with self._lock:
+            # An element repeated within one page still counts that page once
+            for fingerprint, row in {element_fingerprint(row): row for row in rows}.items():
+                entry = self._rows.get(fingerprint)
+                if entry is None:
+                    self._rows[fingerprint] = {**row, "fingerprint": fingerprint, "pages": 1, "url": url}
+                    new += 1
+                else:
+                    entry["pages"] += 1
+        return new
+
+    def rows(self):
+        with self._lock:
+            return list(self._rows.values())
+
+    def __len__(self):
+        return len(self._rows)
+
+def inspect_page(driver, url):
+    with span("crawl.page", url=url) as current:
+        driver.get(url)
+        store = get_locator_store()
+        store.resolve(url, driver)
+        rows = list(store.record_elements(url, iter_elements(driver, highlight=False), "crawler"))
+        links = driver.execute_script(LINKS_JS) or []
+        current.set(elements=len(rows), links=len(links))
+    return driver.current_url, rows, links
+
+def crawl(start_url, depth=CRAWL_DEPTH, max_pages=CRAWL_MAX_PAGES, browsers=CRAWL_BROWSERS, on_page=None):
+    # on_page(page, pages_done, pages_queued) is called from the worker threads
+    start_url = normalize_url(start_url)
+    if start_url is None:
+        raise ValueError("The crawl has to start from an http(s) URL")
+    origin = urlsplit(start_url)[:2]
+    inventory = Inventory()
+    pages = []
+    frontier = queue.Queue()
+    seen = {start_url}
+    state = {"pending": 1}
+    lock = threading.Lock()
+    browsers = max(1, min(browsers, MAX_SESSIONS, max_pages))
+    frontier.put((start_url, 0))
+
+    def worker():
+        # Each worker keeps its browser for the whole crawl instead of leasing one per page
+        with get_driver_pool().lease() as lease:
+            while True:
+                item = frontier.get()
+                if item is None:
+                    return
+                url, level = item
+                started = time.perf_counter()
+                page = {"url": url, "depth": level, "elements": 0, "new_elements": 0, "error": None}
+                links = []
+                try:
+                    final_url, rows, links = inspect_page(lease.driver, url)
+                    page.update(elements=len(rows), new_elements=inventory.add_page(url, rows))
+                    # Redirects off the site are inspected but not followed
+                    if not same_origin(final_url, origin):
+                        links = []
+                except Exception as e:
+                    page["error"] = f"{type(e).__name__}: {e}"
+                    print(f"Crawler: failed to inspect {url}: {page['error']}")
+                page["seconds"] = round(time.perf_counter() - started, 3)
+                with lock:
+                    if level < depth:
+                        for link in links:
+                            link = normalize_url(link, url)
+                            if link and link not in seen and same_origin(link, origin) and len(seen) < max_pages:
+                                seen.add(link)
+                                state["pending"] += 1
+                                frontier.put((link, level + 1))
+                    pages.append(page)
+                    state["pending"] -= 1
+                    done, queued = len(pages), state["pending"]
+                    if not queued:
+                        for _ in range(browsers):
+                            frontier.put(None)
+                if on_page:
+                    on_page(page, done, queued)
+
+    with span("crawl", url=start_url, depth=depth, max_pages=max_pages, browsers=browsers) as current:
+        threads = [threading.Thread(target=propagate(worker), name=f"crawler-{i}", daemon=True)
+                   for i in range(browsers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        current.set(pages=len(pages), elements=len(inventory))
+    print(f"Crawled {len(pages)} page(s) from {start_url}: {len(inventory)} distinct element(s)")
+    # Elements shared by the most pages (site chrome) first
+    return {
+        "pages": pages,
+        "inventory": sorted(inventory.rows(), key=lambda row: -row["pages"]),
+        "seconds": round(current.seconds, 3),
+    }
+
+def export_inventory(result, path, fmt=None):
+    return export_elements(result["inventory"], path, fmt, INVENTORY_COLUMNS)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl a site and export a deduplicated locator inventory.")
+    parser.add_argument("url", help="Page to start from; only links on the same origin are followed")
+    parser.add_argument("--depth", type=int, default=CRAWL_DEPTH, help="Clicks away from the start page")
+    parser.add_argument("--max-pages", type=int, default=CRAWL_MAX_PAGES)
+    parser.add_argument("--browsers", type=int, default=CRAWL_BROWSERS, help="Pages inspected at the same time")
+    parser.add_argument("--out", default="inventory.csv", help="Inventory file (.csv, .jsonl or .parquet)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Defaults to the extension of --out")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def progress(page, done, queued):
+        status = page["error"] or f"{page['elements']} elements, {page['new_elements']} new"
+        print(f"[{done} done, {queued} left] {page['url']} ({status})")
+
+    try:
+        result = crawl(args.url, args.depth, args.max_pages, args.browsers, on_page=progress)
+    finally:
+        get_driver_pool().shutdown()
+    count = export_inventory(result, args.out, args.format)
+    print(f"{count} element(s) written to {args.out} in {result['seconds']:.1f}s")
+    return 1 if all(page["error"] for page in result["pages"]) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import hashlib
+import os
+import re
+import threading
+import time
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.llms import (
+    ChatMessage,
+    ChatResponse,
+    CompletionResponse,
+    CustomLLM,
+    LLMMetadata,
+)
+from llama_index.core.multi_modal_llms import MultiModalLLM, MultiModalLLMMetadata
+
+from prompt_builder import count_tokens
+
+# Deterministic offline stand-ins for the Gemini clients, selected with
+# SDET_LLM_BACKEND=stub. Used by the benchmarks and for runs without an API key.
+STUB_LATENCY = float(os.getenv("SDET_STUB_LATENCY", "0.05"))
+STUB_CHUNK_LATENCY = float(os.getenv("SDET_STUB_CHUNK_LATENCY", "0.005"))
+STUB_EMBED_LATENCY = float(os.getenv("SDET_STUB_EMBED_LATENCY", "0.01"))
+STUB_EMBED_DIM = 256
+
+WORLD_MODEL_RESPONSE = """Thoughts:
+- The current page already shows the state the objective asks for.
+Next engine: COMPLETE
+Instruction: Objective reached."""
+
+PYTHON_RESPONSE = """```python
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+BASE_URL = '{url}'
+
+class GeneratedTest:
+    def __init__(self):
+        self.driver = webdriver.Chrome()
+
+    def test_scenario(self):
+        self.driver.get(BASE_URL)
+        assert self.driver.find_element(By.TAG_NAME, "body").is_displayed()
+        self.driver.quit()
+```"""
+
+JAVA_RESPONSE = """```java
+import org.openqa.selenium.By;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.testng.Assert;
+import org.testng.annotations.Test;
+
+public class GeneratedTest {
+    @Test
+    public void scenario() {
+        WebDriver driver = new ChromeDriver();
+        driver.get("{url}");
+        Assert.assertTrue(driver.findElement(By.tagName("body")).isDisplayed());
+        driver.quit();
+    }
+}
+```"""
+
+GHERKIN_RESPONSE = """```gherkin
+Feature: Generated feature
+  Scenario: Happy path
+    Given I am on the page
+    When I complete the form
+    Then I should see a confirmation
+
+  Scenario: Missing input
+    Given I am on the page
+    When I submit the form empty
+    Then I should see a validation error
+```"""
+
+SCENARIOS_RESPONSE = """Positive Tests:
+- Submit the form with valid values
+
+Negative Tests:
+- Submit the form with required fields empty
+
+Edge Cases and Usability Tests:
+- Submit values at the maximum field length"""
+
+def stub_response(prompt):
+    if "Next engine:" in prompt:
+        return WORLD_MODEL_RESPONSE
+    if "test script" in prompt or "test code below" in prompt:
+        response = JAVA_RESPONSE if "Java Selenium" in prompt else PYTHON_RESPONSE
+        match = re.search(r"Base url: (\S+)", prompt)
+        return response.replace("{url}", match.group(1) if match else "")
+    if "feature file" in prompt.lower():
+        return GHERKIN_RESPONSE
+    if "test ideas" in prompt.lower():
+        return SCENARIOS_RESPONSE
+    return "OK"
+
+_usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "embedding_calls": 0, "embedded_texts": 0}
+_usage_lock = threading.Lock()
+
+def _record(**counts):
+    with _usage_lock:
+        for name, value in counts.items():
+            _usage[name] += value
+
+def stub_usage():
+    with _usage_lock:
+        return dict(_usage)
+
+def reset_stub_usage():
+    with _usage_lock:
+        for name in _usage:
+            _usage[name] = 0
+
+def _respond(prompt):
+    time.sleep(STUB_LATENCY)
+    text = stub_response(prompt)
+    _record(calls=1, prompt_tokens=count_tokens(prompt), completion_tokens=count_tokens(text))
+    return text
+
+def _chunks(text):
+    for line in text.splitlines(keepends=True):
+        time.sleep(STUB_CHUNK_LATENCY)
+        yield line
+
+def _messages_prompt(messages):
+    return "\n".join(str(m.content) for m in messages)
+
+class StubLLM(CustomLLM):
+    model_name: str = "stub"
+
+    @property
+    def metadata(self):
+        return LLMMetadata(model_name=self.model_name, is_chat_model=False)
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        return CompletionResponse(text=_respond(prompt))
+
+    def stream_complete(self, prompt, formatted=False, **kwargs):
+        def gen():
+            text = ""
+            for delta in _chunks(_respond(prompt)):
+                text += delta
+                yield CompletionResponse(text=text, delta=delta)
+        return gen()
+
+    @classmethod
+    def class_name(cls):
+        return "StubLLM"
+
+class StubMultiModal(MultiModalLLM):
+    model_name: str = "stub-multimodal"
+
+    @property
+    def metadata(self):
+        return MultiModalLLMMetadata(model_name=self.model_name)
+
+    def complete(self, prompt, image_documents=(), **kwargs):
+        return CompletionResponse(text=_respond(prompt))
+
+    def stream_complete(self, prompt, image_documents=(), **kwargs):
+        def gen():
+            text = ""
+            for delta in _chunks(_respond(prompt)):
+                text += delta
+                yield CompletionResponse(text=text, delta=delta)
+        return gen()
+
+    def chat(self, messages, **kwargs):
+        return ChatResponse(message=ChatMessage(role="assistant", content=_respond(_messages_prompt(messages))))
+
+    def stream_chat(self, messages, **kwargs):
+        def gen():
+            text = ""
+            for delta in _chunks(_respond(_messages_prompt(messages))):
+                text += delta
+                yield ChatResponse(message=ChatMessage(role="assistant", content=text), delta=delta)
+        return gen()
+
+    async def acomplete(self, prompt, image_documents=(), **kwargs):
+        return self.complete(prompt, image_documents, **kwargs)
+
+    async def astream_complete(self, prompt, image_documents=(), **kwargs):
+        # Awaited for an async generator, like the llama_index clients
+        async def gen():
+            for response in self.stream_complete(prompt, image_documents, **kwargs):
+                yield response
+        return gen()
+
+    async def achat(self, messages, **kwargs):
+        return self.chat(messages, **kwargs)
+
+    async def astream_chat(self, messages, **kwargs):
+        async def gen():
+            for response in self.stream_chat(messages, **kwargs):
+                yield response
+        return gen()
+
+    @classmethod
+    def class_name(cls):
+        return "StubMultiModal"
+
+def stub_vector(text, dim=STUB_EMBED_DIM):
+    # Hashed bag of words, so chunks sharing words are close and retrieval stays meaningful
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        vector[int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+class StubEmbedding(BaseEmbedding):
+    model_name: str = "stub-embedding"
+
+    @classmethod
+    def class_name(cls):
+        return "StubEmbedding"
+
+    def _embed(self, texts):
+        time.sleep(STUB_EMBED_LATENCY)
+        _record(embedding_calls=1, embedded_texts=len(texts))
+        return [stub_vector(text) for text in texts]
+
+    def _get_query_embedding(self, query):
+        return self._embed([query])[0]
+
+    async def _aget_query_embedding(self, query):
+        return self._get_query_embedding(query)
+
+    def _get_text_embedding(self, text):
+        return self._embed([text])[0]
+
+    def _get_text_embeddings(self, texts):
+        return self._embed(texts)
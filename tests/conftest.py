@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+# Every store the modules open at import time goes to a scratch directory, and
+# the Gemini clients are swapped for the offline stubs with no simulated latency.
+_scratch = tempfile.mkdtemp(prefix="sdet-genie-tests-")
+os.environ.update({
+    "SDET_LLM_BACKEND": "stub",
+    "SDET_STUB_LATENCY": "0",
+    "SDET_STUB_CHUNK_LATENCY": "0",
+    "SDET_STUB_EMBED_LATENCY": "0",
+    "SDET_TRACE_FILE": "",
+    "SDET_LLM_CACHE_PATH": os.path.join(_scratch, "llm_cache.sqlite3"),
+    "SDET_RECORDINGS": os.path.join(_scratch, "recordings.sqlite3"),
+    "SDET_LOCATOR_STORE": os.path.join(_scratch, "locators.sqlite3"),
+    "SDET_SNAPSHOT_DIR": os.path.join(_scratch, "snapshots"),
+    "SDET_EMBEDDING_CACHE": os.path.join(_scratch, "embeddings"),
+    "SDET_EXAMPLES_INDEX": os.path.join(_scratch, "examples"),
+    "SDET_SCREENSHOT_INDEX": os.path.join(_scratch, "screenshots.sqlite3"),
+    "SDET_SCREENSHOTS_ROOT": os.path.join(_scratch, "screenshots"),
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,137 @@
+import ast
+
+import pytest
+
+from code_splice import SpliceError, splice_methods
+
+PREVIOUS = '''import pytest
+from selenium import webdriver
+
+
+class TestLogin:
+    def setup_method(self):
+        self.driver = webdriver.Chrome()
+
+    @pytest.mark.smoke
+    def test_valid_login(self):
+        self.driver.get("https://example.com")
+        assert "ok" in self.driver.title
+
+    def test_invalid_login(self):
+        assert False
+
+
+def helper():
+    pass
+'''
+
+
+def members(code):
+    cls = next(node for node in ast.parse(code).body if isinstance(node, ast.ClassDef))
+    return [node.name for node in cls.body if isinstance(node, ast.FunctionDef)]
+
+
+def test_replaces_and_adds_methods_and_imports():
+    update = '''from selenium.webdriver.common.by import By
+
+    def test_invalid_login(self):
+        self.driver.find_element(By.ID, "user").send_keys("bad")
+
+    def test_locked_account(self):
+        assert True
+'''
+    code, replaced, added = splice_methods(PREVIOUS, update, "python")
+    assert (replaced, added) == (["test_invalid_login"], ["test_locked_account"])
+    assert members(code) == ["setup_method", "test_valid_login", "test_invalid_login", "test_locked_account"]
+    assert "from selenium.webdriver.common.by import By" in code
+    assert "@pytest.mark.smoke" in code
+    assert "def helper():" in code
+
+
+def test_decorators_are_replaced_with_their_method():
+    update = '''    @pytest.mark.regression
+    def test_valid_login(self):
+        assert True
+'''
+    code, _, _ = splice_methods(PREVIOUS, update, "python")
+    assert "@pytest.mark.smoke" not in code
+    assert code.count("@pytest.mark.regression") == 1
+
+
+def test_multiline_strings_at_column_zero_are_kept_verbatim():
+    update = '''    def test_valid_login(self):
+        expected = """Welcome
+back,
+    user"""
+        assert expected
+'''
+    code, replaced, _ = splice_methods(PREVIOUS, update, "python")
+    assert replaced == ["test_valid_login"]
+    assert 'expected = """Welcome\nback,\n    user"""' in code
+    assert members(code) == ["setup_method", "test_valid_login", "test_invalid_login"]
+
+
+def test_import_lines_inside_strings_stay_in_the_method():
+    update = '''def test_invalid_login(self):
+    script = """
+import os
+"""
+    assert script
+'''
+    code, _, _ = splice_methods(PREVIOUS, update, "python")
+    assert '    script = """\nimport os\n"""' in code
+    assert "\nimport os\n" not in code.split("class TestLogin")[0]
+
+
+def test_module_level_functions_are_spliced_without_a_class():
+    previous = "from pytest_bdd import given\n\n\n@given('a user')\ndef a_user():\n    pass\n"
+    code, replaced, added = splice_methods(previous, "def a_user():\n    return 1\n\ndef another():\n    pass\n", "python")
+    assert (replaced, added) == (["a_user"], ["another"])
+    ast.parse(code)
+
+
+@pytest.mark.parametrize("update", ["x = 1", "def broken(:\n    pass"])
+def test_updates_without_methods_or_that_do_not_parse_are_rejected(update):
+    with pytest.raises(SpliceError):
+        splice_methods(PREVIOUS, update, "python")
+
+
+JAVA_PREVIOUS = '''import org.openqa.selenium.By;
+
+public class LoginTest {
+    private WebDriver driver;
+
+    @Test
+    public void validLogin() {
+        driver.get("{u}");
+        if (x) { y(); } else { z("}"); }
+    }
+
+    @Test
+    public void invalidLogin() throws Exception {
+        // } tricky
+        Assert.assertTrue(false);
+    }
+}
+'''
+
+
+def test_java_methods_are_matched_past_braces_in_strings_and_comments():
+    update = '''import org.testng.Assert;
+    @Test(priority = 2)
+    public void invalidLogin() {
+        Assert.assertTrue(driver.findElement(By.id("err")).isDisplayed());
+    }
+
+    @Test
+    public void lockedAccount() {
+        Assert.assertTrue(true);
+    }
+'''
+    code, replaced, added = splice_methods(JAVA_PREVIOUS, update, "java")
+    assert (replaced, added) == (["invalidLogin"], ["lockedAccount"])
+    assert "// } tricky" not in code
+    assert 'z("}");' in code
+    assert "import org.testng.Assert;" in code
+    assert code.rstrip().endswith("}")
+    assert code.index("lockedAccount") < code.rstrip().rindex("}")
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+import driver_pool
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def launches(monkeypatch):
+    launched = []
+
+    def launch_chrome(port, headless=True):
+        driver = FakeDriver()
+        launched.append(driver)
+        return driver
+
+    monkeypatch.setattr(driver_pool, "launch_chrome", launch_chrome)
+    monkeypatch.setattr(driver_pool, "reset_driver", lambda driver: None)
+    return launched
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        pool = DriverPool(**kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_warm_sessions_are_launched_and_reused(launches, make_pool):
+    pool = make_pool(size=1)
+    wait_for(lambda: pool.stats()["idle"] == 1)
+    with pool.lease() as lease:
+        first = lease.driver
+        assert pool.stats()["leased"] == 1
+    wait_for(lambda: pool.stats()["idle"] >= 1)
+    with pool.lease() as lease:
+        assert lease.driver is first
+
+
+def test_dropped_lease_returns_the_driver(launches, make_pool):
+    pool = make_pool(size=0)
+    lease = pool.lease(timeout=2)
+    del lease
+    assert pool.stats() == {"idle": 1, "leased": 0, "launching": 0}
+
+
+def test_waiters_beyond_max_sessions_time_out(launches, make_pool):
+    pool = make_pool(size=0, max_sessions=1)
+    lease = pool.lease(timeout=2)
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.2)
+    lease.release()
+
+
+def test_a_released_driver_goes_to_the_next_waiter(launches, make_pool):
+    pool = make_pool(size=0, max_sessions=1)
+    lease = pool.lease(timeout=2)
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=2)))
+    waiter.start()
+    time.sleep(0.1)
+    lease.release()
+    waiter.join(2)
+    assert got == [launches[0]]
+    assert len(launches) == 1
+
+
+def test_launch_failure_is_raised_to_the_waiter(monkeypatch, make_pool):
+    attempts = []
+
+    def launch_chrome(port, headless=True):
+        attempts.append(port)
+        raise OSError("chrome not found")
+
+    monkeypatch.setattr(driver_pool, "launch_chrome", launch_chrome)
+    pool = make_pool(size=0)
+    with pytest.raises(RuntimeError) as error:
+        pool.acquire(timeout=5)
+    assert isinstance(error.value.__cause__, OSError)
+    assert len(attempts) == 1
+
+
+def test_shutdown_quits_every_session_and_runs_retire_hooks(launches, make_pool, monkeypatch):
+    retired = []
+    monkeypatch.setattr(driver_pool, "_retire_hooks", [retired.append])
+    pool = make_pool(size=2)
+    wait_for(lambda: pool.stats()["idle"] == 2)
+    pool.shutdown()
+    assert all(driver.quit_called for driver in launches)
+    assert retired == launches
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.1)
+
+
+def test_stale_idle_sessions_beyond_the_warm_size_are_reaped(launches, make_pool):
+    pool = make_pool(size=1, idle_timeout=0)
+    leases = [pool.lease(timeout=2) for _ in range(2)]
+    for lease in leases:
+        lease.release()
+    wait_for(lambda: pool.stats()["launching"] == 0)
+    idle = pool.stats()["idle"]
+    assert idle > 1
+    pool.reap()
+    assert pool.stats()["idle"] == 1
+    assert sum(driver.quit_called for driver in launches) == idle - 1
@@ -0,0 +1,49 @@
+from gherkin import feature_key, feature_steps, split_feature
+
+FEATURE = '''```gherkin
+Feature: Login
+  Background:
+    Given I am on the login page
+
+  @smoke
+  Scenario: Valid login
+    When I sign in as "bob"
+    Then I see the dashboard
+
+  Scenario Outline: Invalid login
+    When I sign in as "<user>"
+    Then I see an error
+
+    Examples:
+      | user |
+      | eve  |
+```'''
+
+
+def test_scenarios_carry_the_feature_header_background_and_their_tags():
+    valid, invalid = split_feature(FEATURE)
+    assert (valid.name, invalid.name) == ("Valid login", "Invalid login")
+    assert valid.tags == ["  @smoke"]
+    assert invalid.tags == []
+    assert valid.steps == ['When I sign in as "bob"', "Then I see the dashboard"]
+    assert valid.text.splitlines()[:3] == ["Feature: Login", "  Background:", "    Given I am on the login page"]
+    assert "Examples:" in invalid.text
+    assert "Valid login" not in invalid.text
+
+
+def test_plain_steps_run_as_one_test_case():
+    (case,) = split_feature("Given I open the page\nThen I see the title")
+    assert case.name == "test case"
+    assert case.steps == ["Given I open the page", "Then I see the title"]
+
+
+def test_feature_steps_keep_background_first_and_normalize_spacing():
+    assert feature_steps(FEATURE)[:2] == ["Given I am on the login page", 'When I sign in as "bob"']
+
+
+def test_feature_key_survives_step_edits_but_not_other_features():
+    edited = FEATURE.replace("I see the dashboard", "I see a welcome banner")
+    assert feature_key(edited) == feature_key(FEATURE)
+    assert feature_key(FEATURE.replace("Feature: Login", "Feature: Signup")) != feature_key(FEATURE)
+    assert feature_key(FEATURE.replace("Valid login", "Good login")) != feature_key(FEATURE)
+    assert feature_key("Given a") != feature_key("Given b")
@@ -0,0 +1,40 @@
+from llama_index.core.llms import ChatMessage
+
+import governed_llm
+from governed_llm import GovernedLLM, GovernedMultiModal
+from llm_governor import IMAGE_TOKENS, LLMGovernor
+from stub_backend import StubLLM, StubMultiModal
+
+
+def test_text_calls_go_through_the_governor(monkeypatch):
+    governor = LLMGovernor({})
+    monkeypatch.setattr(governed_llm, "get_llm_governor", lambda: governor)
+    llm = GovernedLLM(StubLLM(model_name="stub/text"))
+    assert llm.model == "stub/text"
+    assert llm.complete("hello").text == "OK"
+    assert llm.chat([ChatMessage(role="user", content="hello")]).message.content == "OK"
+    stats = governor.stats()["models"]["stub/text"]
+    assert stats["calls"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_stream_holds_its_slot_until_it_ends(monkeypatch):
+    governor = LLMGovernor({})
+    monkeypatch.setattr(governed_llm, "get_llm_governor", lambda: governor)
+    llm = GovernedLLM(StubLLM(model_name="stub/text"))
+    chunks = llm.stream_complete("Generate the feature file")
+    next(chunks)
+    assert governor.stats()["models"]["stub/text"]["in_flight"] == 1
+    chunks.close()
+    assert governor.stats()["models"]["stub/text"]["in_flight"] == 0
+
+
+def test_images_are_charged_as_tokens(monkeypatch):
+    governor = LLMGovernor({})
+    monkeypatch.setattr(governed_llm, "get_llm_governor", lambda: governor)
+    mm_llm = GovernedMultiModal(StubMultiModal(model_name="stub/mm"))
+    plain = GovernedMultiModal(StubMultiModal(model_name="stub/plain"))
+    mm_llm.complete("hello", [object(), object()])
+    plain.complete("hello", [])
+    models = governor.stats()["models"]
+    assert models["stub/mm"]["tokens"] - models["stub/plain"]["tokens"] == 2 * IMAGE_TOKENS
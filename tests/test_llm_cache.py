@@ -0,0 +1,59 @@
+import pytest
+from llama_index.core.llms import ChatMessage
+
+import llm_cache
+from llm_cache import LLMCache, cache_key, cached_chat, cached_complete, stream_complete
+from stub_backend import StubLLM, StubMultiModal, reset_stub_usage, stub_usage
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(llm_cache, "get_llm_cache", lambda: cache)
+    reset_stub_usage()
+    return cache
+
+
+def test_key_ignores_rerun_noise_but_not_the_model_or_images():
+    assert cache_key("m", "line one  \r\nline two\n") == cache_key("m", "line one\nline two")
+    assert cache_key("m", "prompt") != cache_key("n", "prompt")
+    assert cache_key("m", "prompt", extra=["a"]) != cache_key("m", "prompt", extra=["b"])
+
+
+def test_second_completion_is_served_from_the_cache(cache):
+    llm = StubMultiModal(model_name="stub/cache")
+    assert cached_complete(llm, "hello cache") == "OK"
+    assert cached_complete(llm, "hello cache") == "OK"
+    assert stub_usage()["calls"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_force_regenerate_calls_the_model_again(cache):
+    llm = StubLLM(model_name="stub/chat")
+    messages = [ChatMessage(role="user", content="hello chat")]
+    cached_chat(llm, messages)
+    cached_chat(llm, messages, force_regenerate=True)
+    assert stub_usage()["calls"] == 2
+
+
+def test_only_finished_streams_are_cached(cache):
+    llm = StubMultiModal(model_name="stub/stream")
+    prompt = "Generate a Python Selenium test script"
+    chunks = stream_complete(llm, prompt)
+    next(chunks)
+    chunks.close()
+    assert cache.stats()["entries"] == 0
+    text = "".join(stream_complete(llm, prompt))
+    assert cache.stats()["entries"] == 1
+    assert "".join(stream_complete(llm, prompt)) == text
+
+
+def test_expired_and_oversized_entries_are_evicted(tmp_path):
+    cache = LLMCache(str(tmp_path / "small.sqlite3"), ttl=3600, max_bytes=10)
+    cache.put("a", "m", "12345678")
+    cache.put("b", "m", "12345678")
+    assert cache.get("a") is None
+    assert cache.get("b") == "12345678"
+    expired = LLMCache(str(tmp_path / "expired.sqlite3"), ttl=-1)
+    expired.put("a", "m", "x")
+    assert expired.get("a") is None
@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+
+import llm_governor
+from llm_governor import LLMGovernor, TokenBucket, is_rate_limited, llm_lane, parse_limits
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_governor, "backoff_delay", lambda attempt: 0.0)
+
+
+def test_parse_limits_fills_missing_values_with_none():
+    limits = parse_limits("models/a=2/32000/1, models/b=15, models/c=-/100")
+    assert limits == {"models/a": (2, 32000, 1), "models/b": (15, None, None), "models/c": (None, 100, None)}
+
+
+def test_token_bucket_waits_for_refill_and_lets_large_calls_go_into_debt():
+    bucket = TokenBucket(60)
+    assert bucket.wait_time(60, bucket.updated) == 0
+    bucket.take(60, bucket.updated)
+    assert bucket.wait_time(1, bucket.updated) == pytest.approx(1.0)
+    # Larger than the whole bucket: only waits for a full bucket
+    bucket.level = 60.0
+    assert bucket.wait_time(500, bucket.updated) == 0
+    bucket.take(500, bucket.updated)
+    assert bucket.level == -440
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(ResourceExhausted("quota"))
+    assert is_rate_limited(Exception("429 Too Many Requests"))
+    assert is_rate_limited(type("E", (Exception,), {"code": 503})())
+    assert not is_rate_limited(ValueError("bad prompt"))
+
+
+def test_call_counts_tokens_and_releases_the_slot():
+    governor = LLMGovernor({"m": (None, None, 1)})
+    assert governor.call("m", 10, lambda: "answer", lambda result: 5) == "answer"
+    stats = governor.stats()["models"]["m"]
+    assert stats["calls"] == 1
+    assert stats["tokens"] == 15
+    assert stats["in_flight"] == 0
+
+
+def test_rate_limited_calls_are_retried_and_cool_the_model_down():
+    governor = LLMGovernor({})
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ResourceExhausted("Resource has been exhausted")
+        return "ok"
+
+    assert governor.call("m", 1, flaky) == "ok"
+    stats = governor.stats()["models"]["m"]
+    assert len(attempts) == 3
+    assert stats["retries"] == 2
+    assert stats["throttled"] == 2
+    assert stats["in_flight"] == 0
+
+
+def test_other_errors_are_not_retried(monkeypatch):
+    governor = LLMGovernor({})
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        governor.call("m", 1, broken)
+    assert len(attempts) == 1
+    assert governor.stats()["models"]["m"]["in_flight"] == 0
+
+
+def test_retries_give_up_after_the_limit(monkeypatch):
+    monkeypatch.setattr(llm_governor, "RETRIES", 2)
+    governor = LLMGovernor({})
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise ResourceExhausted("429")
+
+    with pytest.raises(ResourceExhausted):
+        governor.call("m", 1, throttled)
+    assert len(attempts) == 3
+
+
+def test_concurrency_cap_holds_later_callers_until_release():
+    governor = LLMGovernor({"m": (None, None, 1)})
+    governor.start("m", 1, lambda: None)
+    started = threading.Event()
+    thread = threading.Thread(target=lambda: (governor.call("m", 1, lambda: None), started.set()))
+    thread.start()
+    assert not started.wait(0.2)
+    assert governor.stats()["models"]["m"]["queued"] == 1
+    governor.release("m")
+    assert started.wait(2)
+    thread.join()
+
+
+def test_interactive_lane_goes_ahead_of_batch():
+    governor = LLMGovernor({"m": (None, None, 1)})
+    governor.start("m", 1, lambda: None)
+    order = []
+
+    def caller(lane, name):
+        with llm_lane(lane):
+            governor.call("m", 1, lambda: order.append(name))
+
+    batch = threading.Thread(target=caller, args=("batch", "batch"))
+    batch.start()
+    while governor.stats()["models"]["m"]["queued"] < 1:
+        time.sleep(0.01)
+    interactive = threading.Thread(target=caller, args=("interactive", "interactive"))
+    interactive.start()
+    while governor.stats()["models"]["m"]["queued"] < 2:
+        time.sleep(0.01)
+    assert governor.stats()["models"]["m"]["queued_by_lane"] == {"interactive": 1, "batch": 1}
+    governor.release("m")
+    batch.join(2)
+    interactive.join(2)
+    assert order == ["interactive", "batch"]
+
+
+def test_unknown_lane_is_rejected():
+    with pytest.raises(ValueError):
+        with llm_lane("background"):
+            pass
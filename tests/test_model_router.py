@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+import model_router
+from model_router import MIN_SAMPLES, ModelRouter, parse_routes, route_name
+from llm_governor import IMAGE_TOKENS
+
+
+def test_route_name_counts_images_towards_the_prompt_size(monkeypatch):
+    monkeypatch.setattr(model_router, "LARGE_PROMPT_TOKENS", 1000)
+    assert route_name(10) == "text-small"
+    assert route_name(1000) == "text-large"
+    assert route_name(1000 - IMAGE_TOKENS, images=1) == "image-large"
+    assert route_name(10, images=1) == "image-small"
+
+
+def test_parse_routes():
+    assert parse_routes("image-small=models/a|models/b, text-large=models/c") == {
+        "image-small": ["models/a", "models/b"], "text-large": ["models/c"]}
+
+
+def test_models_missing_the_slo_move_to_the_back():
+    router = ModelRouter(routes={"text-small": ["slow", "fast", "new"]}, slo=1.0)
+    for _ in range(MIN_SAMPLES):
+        router._record("text-small", "slow", 5.0)
+        router._record("text-small", "fast", 0.5)
+    assert router.candidates("text-small") == ["fast", "new", "slow"]
+    # A looser SLO keeps the preferred order
+    assert router.candidates("text-small", slo=10) == ["slow", "fast", "new"]
+
+
+def test_a_call_past_the_timeout_falls_back_to_the_next_model():
+    router = ModelRouter(routes={}, slo=0.1, timeout=0.1)
+
+    def call(model):
+        if model == "slow":
+            time.sleep(0.5)
+        return model
+
+    assert router._run("text-small", ["slow", "fast"], call, None) == ("fast", "fast")
+    rows = {row["model"]: row for row in router.stats()}
+    assert rows["slow"]["timeouts"] == 1
+    assert rows["fast"]["calls"] == 1
+
+
+def test_errors_are_recorded_and_raised():
+    router = ModelRouter(routes={})
+
+    def call(model):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        router._run("text-small", ["only"], call, None)
+    assert router.stats()[0]["errors"] == 1
+
+
+def test_a_stream_without_text_in_time_falls_back_and_is_closed():
+    router = ModelRouter(routes={}, slo=0.1, timeout=0.1)
+    closed = []
+
+    def open_stream(model):
+        def chunks():
+            try:
+                if model == "slow":
+                    time.sleep(0.4)
+                for part in ("a", "b"):
+                    yield f"{model}:{part} "
+            finally:
+                closed.append(model)
+        return chunks()
+
+    assert "".join(router._stream("text-small", ["slow", "fast"], open_stream, None)) == "fast:a fast:b "
+    time.sleep(0.6)
+    assert sorted(closed) == ["fast", "slow"]
+    rows = {row["model"]: row for row in router.stats()}
+    assert rows["slow"]["timeouts"] == 1
+    # Its time to first text still counts once it arrives
+    assert rows["slow"]["p90_first_text_seconds"] >= 0.4
+    assert rows["fast"]["calls"] == 1
+
+
+def test_complete_routes_through_the_stub_backend():
+    router = ModelRouter(routes={"text-small": ["stub/router"]})
+    assert router.complete("hello router", force_regenerate=True) == "OK"
+    assert "".join(router.complete("hello stream", force_regenerate=True, stream=True)) == "OK"
+    assert router.stats()[0]["model"] == "stub/router"
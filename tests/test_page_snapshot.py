@@ -0,0 +1,100 @@
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import page_snapshot
+from page_snapshot import SNAPSHOT_DOM_JS, SNAPSHOT_RESOURCES_JS, capture_snapshot, has_snapshot, page_url, serve_snapshot
+
+CSS = b"body { background: url('https://cdn.example.com/bg.png'); }"
+
+
+class _Site(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body, content_type = {"/static/app.css": (CSS, "text/css"), "/bg.png": (b"PNG", "image/png")}[self.path]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class FakeDriver:
+    # Renders a page that loads a same-origin stylesheet and a cross-origin image
+    def __init__(self, origin):
+        self.origin = origin
+        self.current_url = None
+
+    def get(self, url):
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        if script == SNAPSHOT_DOM_JS:
+            return (f'<html><head><link rel="stylesheet" href="{self.origin}/static/app.css"></head>'
+                    f'<body><img src="{self.origin}/bg.png"><p>Hello</p></body></html>')
+        if script == SNAPSHOT_RESOURCES_JS:
+            return [f"{self.origin}/static/app.css", f"{self.origin}/bg.png"]
+        return "test-agent"
+
+    def get_cookies(self):
+        return []
+
+    def get_screenshot_as_png(self):
+        return b"PNG"
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.read()
+
+
+def test_captured_page_is_served_with_its_resources(site, tmp_path):
+    url = f"{site}/login?next=home"
+    capture_snapshot(url, FakeDriver(site), str(tmp_path))
+    assert has_snapshot(url, str(tmp_path))
+    local = serve_snapshot(url, str(tmp_path))
+    assert local.endswith("/login?next=home")
+    page = fetch(local).decode()
+    assert "<p>Hello</p>" in page
+    # Same-origin resources keep their path on the stand-in server
+    assert 'href="/static/app.css"' in page
+    base = local.split("/login")[0]
+    assert fetch(base + "/static/app.css") == CSS
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetch(base + "/missing.js")
+    assert error.value.code == 404
+
+
+def test_recapture_is_picked_up_by_the_running_server(site, tmp_path):
+    url = f"{site}/page"
+    capture_snapshot(url, FakeDriver(site), str(tmp_path))
+    first = serve_snapshot(url, str(tmp_path))
+    capture_snapshot(url, FakeDriver(site), str(tmp_path))
+    assert serve_snapshot(url, str(tmp_path)) == first
+    assert "<p>Hello</p>" in fetch(first).decode()
+
+
+def test_page_url_modes(site):
+    url = f"{site}/modes"
+    assert page_url(url, mode="off") == url
+    with pytest.raises(ValueError):
+        page_url(url, mode="sometimes")
+    with pytest.raises(FileNotFoundError):
+        page_url(url, mode="replay")
+    driver = FakeDriver(site)
+    assert page_url(url, driver, mode="capture") == url
+    assert page_url(url, mode="replay").startswith("http://127.0.0.1:")
+    assert has_snapshot(url, page_snapshot.SNAPSHOT_DIR)
@@ -0,0 +1,205 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+# Finished traces are appended to TRACE_FILE (empty disables export), either one
+# span per JSON line ("jsonl") or one OTLP/JSON ExportTraceServiceRequest per
+# line ("otlp"), which OpenTelemetry collectors read with the otlpjsonfile receiver.
+TRACE_FILE = os.getenv("SDET_TRACE_FILE", os.path.join(os.path.expanduser("~"), ".sdet_genie", "traces.jsonl"))
+TRACE_FORMAT = os.getenv("SDET_TRACE_FORMAT", "jsonl")
+SERVICE_NAME = "sdet-genie"
+
+_current = contextvars.ContextVar("sdet_span", default=None)
+_lock = threading.Lock()
+_export_lock = threading.Lock()
+_webdriver_commands = 0
+
+class Span:
+    # Counts (tokens, WebDriver commands, LLM calls) roll up into every ancestor,
+    # so each span reports the totals of everything that ran inside it.
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes)
+        self.counts = {}
+        self.children = []
+        self.status = "ok"
+        self.error = None
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        self.seconds = None
+        if parent:
+            with _lock:
+                parent.children.append(self)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, name, value=1):
+        with _lock:
+            span = self
+            while span is not None:
+                span.counts[name] = span.counts.get(name, 0) + value
+                span = span.parent
+
+    def fail(self, error):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self):
+        if self.seconds is not None:
+            return
+        self.seconds = time.perf_counter() - self._started
+        if self.parent is None:
+            export(self)
+
+    @property
+    def end_ns(self):
+        return self.start_ns + int((self.seconds or 0) * 1e9)
+
+    def walk(self, depth=0):
+        yield depth, self
+        for child in list(self.children):
+            yield from child.walk(depth + 1)
+
+    def breakdown(self):
+        # Rows for the UI: one per span, indented by nesting depth
+        total = self.seconds or 0
+        return [
+            {
+                "stage": "  " * depth + span.name,
+                "ms": round((span.seconds or 0) * 1000, 1),
+                "% of run": round((span.seconds or 0) / total * 100, 1) if total else None,
+                "prompt tokens": span.counts.get("prompt_tokens", 0),
+                "response tokens": span.counts.get("response_tokens", 0),
+                "WebDriver commands": span.counts.get("webdriver_commands", 0),
+                "status": span.status,
+            }
+            for depth, span in self.walk()
+        ]
+
+    def to_record(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round((self.seconds or 0) * 1000, 3),
+            "attributes": self.attributes,
+            "counts": self.counts,
+            "status": self.status,
+            "error": self.error,
+        }
+
+def current_span():
+    return _current.get()
+
+def start_span(name, **attributes):
+    # A child of the current span that is not made current; for work that
+    # outlives the caller's frame, like a stream consumed later. Call end().
+    return Span(name, current_span(), **attributes)
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    current = Span(name, current_span(), **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+def add(name, value=1):
+    # Adds to the current span's counts; a no-op outside of any span
+    current = current_span()
+    if current is not None:
+        current.add(name, value)
+
+def propagate(func):
+    # Runs func under the caller's current span (and its other context, like the
+    # LLM lane), e.g. in a ThreadPoolExecutor worker
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so each call gets a copy
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+def instrument_webdriver():
+    # Counts every WebDriver command (one browser round trip each) on the current span
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    with _lock:
+        if getattr(WebDriver.execute, "_sdet_traced", False):
+            return
+        original = WebDriver.execute
+
+        def execute(driver, driver_command, params=None):
+            global _webdriver_commands
+            with _lock:
+                _webdriver_commands += 1
+            add("webdriver_commands")
+            return original(driver, driver_command, params)
+
+        execute._sdet_traced = True
+        WebDriver.execute = execute
+
+def webdriver_command_count():
+    # Process-wide total, including commands issued outside any span
+    with _lock:
+        return _webdriver_commands
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def to_otlp(root):
+    spans = []
+    for _, s in root.walk():
+        attributes = {**s.attributes, **{f"sdet.{name}": value for name, value in s.counts.items()}}
+        record = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.status == "error" else {"code": 1},
+        }
+        if s.parent:
+            record["parentSpanId"] = s.parent.span_id
+        spans.append(record)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "sdet_genie.tracing"}, "spans": spans}],
+    }]}
+
+def export(root, path=None, fmt=None):
+    path = TRACE_FILE if path is None else path
+    if not path:
+        return
+    if (fmt or TRACE_FORMAT) == "otlp":
+        lines = [json.dumps(to_otlp(root))]
+    else:
+        lines = [json.dumps(s.to_record(), default=str) for _, s in root.walk()]
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with _export_lock, open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError as e:
+        print(f"Could not write trace to {path}: {e}")
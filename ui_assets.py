@@ -0,0 +1,26 @@
+import functools
+import json
+import os
+
+# Animations and the stylesheet ship with the app and are read from disk once
+# per process, so a Streamlit rerun never waits on the network.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+LOTTIE_DIR = os.path.join(APP_DIR, "assets", "lottie")
+# Served by Streamlit's static file serving (.streamlit/config.toml) at STYLESHEET_URL
+STYLESHEET = os.path.join(APP_DIR, "static", "sdet_genie.css")
+STYLESHEET_URL = "app/static/sdet_genie.css"
+
+@functools.lru_cache(maxsize=None)
+def load_lottie(name):
+    # Animation JSON from assets/lottie, or None when the app ships no such animation
+    path = os.path.join(LOTTIE_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        print(f"No bundled animation named {name!r} in {LOTTIE_DIR}")
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=None)
+def stylesheet():
+    with open(STYLESHEET, encoding="utf-8") as f:
+        return f.read()